@@ -1,17 +1,43 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Dict, Any
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, WebSocket
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, List, Optional, Union
 import pandas as pd
+import time
 
-from CryptoTrader.services.prediction_service import predict
-from CryptoTrader.services.training_service import train_model
-from CryptoTrader.services.backtest_service import run_backtest
-from CryptoTrader.services.signals_service import compute_signals
+from CryptoTrader.services.prediction_service import predict, predict_many
+from CryptoTrader.services.model_cache import compact_cache, model_cache
+from CryptoTrader.trading.frame_cache import frame_cache
+from CryptoTrader.services.training_service import (
+    train_model, training_status, model_versions, rollback_model)
+from CryptoTrader.services.backtest_service import (
+    run_backtest, run_backtest_history, run_portfolio_backtest, run_portfolio_history,
+    run_strategy_backtests, run_walk_forward)
+from CryptoTrader.services.signals_service import compute_signals, compute_strategy_signals
+from CryptoTrader.trading.strategies import get_strategies
+from CryptoTrader.services.signal_stream import get_hub
+from CryptoTrader.services.chart_service import live_chart
+from CryptoTrader.metrics import metrics
+from CryptoTrader.profiler import profile_for, profiler_enabled
+from CryptoTrader.services.columnar import (
+    UnsupportedMediaType, decode_frame, encode_frame, is_binary, is_json, negotiate)
 
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # Collectors start with the server when STREAM_SYMBOLS is set, otherwise
+    # on the first /ws/signals or /signals/stream subscriber.
+    if os.environ.get("STREAM_SYMBOLS"):
+        await get_hub().start()
+    yield
+    await get_hub().stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware for frontend integration
 app.add_middleware(
@@ -22,30 +48,306 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    # Route template, not the raw path, so /chart/{symbol} stays one series.
+    route = request.scope.get("route")
+    metrics.observe("http_request_seconds", time.perf_counter() - t0,
+                    route=getattr(route, "path", "unmatched"), method=request.method,
+                    status=str(response.status_code))
+    return response
+
 # Define the request model correctly
 class PredictionRequest(BaseModel):
     symbol: str
     data: Dict[str, Any]
 
+class BatchPredictionRequest(BaseModel):
+    symbols: Dict[str, Dict[str, Any]]
+
+class StrategyBatchRequest(BaseModel):
+    symbols: Dict[str, Dict[str, Any]]
+    strategies: Optional[List[str]] = None
+
+class PortfolioRequest(BaseModel):
+    symbols: Dict[str, Dict[str, Any]]
+    strategy: str = "ema_rsi"
+    initial_balance: float = 1000.0
+    sizing: str = "equal_slots"
+    size: Optional[float] = None
+    fee: Union[float, Dict[str, float]] = 0.00075
+    slippage: Union[float, Dict[str, float]] = 0.0005
+    use_confidence: bool = False
+
+def _strategy_names(strategies: Optional[str]):
+    # "a,b" query parameter -> ["a", "b"]; None means every registered strategy.
+    return [s.strip() for s in strategies.split(",") if s.strip()] if strategies else None
+
 @app.get("/")
 def root():
     return {"message": "Crypto Trader API is running"}
 
-@app.post("/predict")
-def get_prediction(request: PredictionRequest):
-    df = pd.DataFrame(request.data)
-    return predict(request.symbol, df)
+async def read_frame(request: Request, symbol: Optional[str] = None):
+    """(symbol, DataFrame) from either a JSON PredictionRequest body or a
+    columnar binary body (see services.columnar) with ?symbol=... ."""
+    content_type = request.headers.get("content-type")
+    if is_binary(content_type):
+        try:
+            return symbol, decode_frame(await request.body(), content_type)
+        except UnsupportedMediaType as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid columnar payload: {e}")
+    if not is_json(content_type):
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+    try:
+        payload = PredictionRequest.model_validate(await request.json())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    return payload.symbol, pd.DataFrame(payload.data)
+
+_BODY_DOC = {"requestBody": {"content": {
+    "application/json": {"schema": {"$ref": "#/components/schemas/PredictionRequest"}},
+    "application/x-npz": {"schema": {"type": "string", "format": "binary"}},
+    "application/vnd.apache.arrow.stream": {"schema": {"type": "string", "format": "binary"}},
+}, "required": True}}
+
+@app.post("/predict", openapi_extra=_BODY_DOC)
+def get_prediction(frame=Depends(read_frame)):
+    symbol, df = frame
+    if not symbol:
+        raise HTTPException(status_code=422, detail="symbol is required")
+    return predict(symbol, df)
+
+@app.post("/predict/batch")
+def get_batch_prediction(request: BatchPredictionRequest):
+    frames = {symbol: pd.DataFrame(data) for symbol, data in request.symbols.items()}
+    return predict_many(frames)
+
+@app.get("/models/cache")
+def model_cache_stats():
+    return dict(model_cache.stats(), compact=compact_cache.stats())
+
+@app.get("/features/cache")
+def frame_cache_stats():
+    return frame_cache.stats()
+
+@app.get("/models/{symbol}/versions")
+def get_model_versions(symbol: str):
+    return model_versions(symbol)
+
+@app.post("/models/{symbol}/rollback")
+def post_model_rollback(symbol: str, version: int):
+    return rollback_model(symbol, version)
 
 @app.post("/train")
-def train(symbol: str, interval: str = "1m"):
-    return train_model(symbol, interval)
-
-@app.post("/backtest")
-def backtest(request: PredictionRequest):
-    df = pd.DataFrame(request.data)
-    return run_backtest(df)
-
-@app.post("/signals")
-def signals(request: PredictionRequest):
-    df = pd.DataFrame(request.data)
-    return compute_signals(df)
\ No newline at end of file
+def train(symbol: str, interval: str = "1m", priority: int = 10, incremental: bool = False):
+    return train_model(symbol, interval, priority=priority, incremental=incremental)
+
+@app.get("/train/{job_id}")
+def train_status(job_id: str):
+    status = training_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return status
+
+@app.get("/strategies")
+def list_strategies():
+    return [s.describe() for s in get_strategies()]
+
+@app.post("/backtest", openapi_extra=_BODY_DOC)
+def backtest(request: Request, frame=Depends(read_frame), strategies: Optional[str] = None):
+    symbol, df = frame
+    if strategies is not None:
+        return run_strategy_backtests({symbol or "": df}, _strategy_names(strategies))
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type is None:
+        return run_backtest(df)
+    result = run_backtest(df, as_arrays=True)
+    body = encode_frame({"equity_curve": result["equity_curve"]}, media_type,
+                        metadata={"final_value": result["final_value"], "trades": result["trades"]})
+    return Response(content=body, media_type=media_type)
+
+@app.post("/backtest/batch")
+def backtest_batch(request: StrategyBatchRequest):
+    frames = {symbol: pd.DataFrame(data) for symbol, data in request.symbols.items()}
+    return run_strategy_backtests(frames, request.strategies)
+
+@app.post("/backtest/portfolio")
+def backtest_portfolio(request: PortfolioRequest):
+    # Candles are aligned across symbols on an optional "time" column (epoch
+    # seconds); without it rows are aligned by position.
+    frames = {}
+    for symbol, data in request.symbols.items():
+        df = pd.DataFrame(data)
+        if "time" in df.columns:
+            df = df.set_index(pd.to_datetime(df.pop("time"), unit="s"))
+        frames[symbol] = df
+    return run_portfolio_backtest(frames, strategy=request.strategy, initial_balance=request.initial_balance,
+                                  sizing=request.sizing, size=request.size, fee=request.fee,
+                                  slippage=request.slippage, use_confidence=request.use_confidence)
+
+@app.post("/backtest/portfolio/history")
+def backtest_portfolio_history(symbols: str, interval: str = "1m", start: Optional[int] = None,
+                               end: Optional[int] = None, sync: bool = True, strategy: str = "ema_rsi",
+                               initial_balance: float = 1000.0, sizing: str = "equal_slots",
+                               size: Optional[float] = None):
+    return run_portfolio_history([s.strip().upper() for s in symbols.split(",") if s.strip()], interval,
+                                 start=start, end=end, sync=sync, strategy=strategy,
+                                 initial_balance=initial_balance, sizing=sizing, size=size)
+
+@app.post("/backtest/history")
+def backtest_history(symbol: str, interval: str = "1m", start: Optional[int] = None,
+                     end: Optional[int] = None, sync: bool = True, streaming: bool = False,
+                     chunk_size: int = 100_000):
+    return run_backtest_history(symbol, interval, start=start, end=end, sync=sync,
+                                streaming=streaming, chunk_size=chunk_size)
+
+@app.post("/backtest/walk-forward")
+def backtest_walk_forward(symbol: str, interval: str = "1m", start: Optional[int] = None,
+                          end: Optional[int] = None, sync: bool = True, train_size: int = 1500,
+                          test_size: int = 100, step: Optional[int] = None, n_estimators: int = 200):
+    return run_walk_forward(symbol, interval, start=start, end=end, sync=sync, train_size=train_size,
+                            test_size=test_size, step=step, n_estimators=n_estimators)
+
+@app.post("/signals", openapi_extra=_BODY_DOC)
+def signals(request: Request, frame=Depends(read_frame), strategies: Optional[str] = None):
+    symbol, df = frame
+    if strategies is not None:
+        return compute_strategy_signals({symbol or "": df}, _strategy_names(strategies))
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type is None:
+        return compute_signals(df)
+    return Response(content=encode_frame(compute_signals(df, as_frame=True), media_type),
+                    media_type=media_type)
+
+@app.post("/signals/batch")
+def signals_batch(request: StrategyBatchRequest):
+    frames = {symbol: pd.DataFrame(data) for symbol, data in request.symbols.items()}
+    return compute_strategy_signals(frames, request.strategies)
+
+def _stream_symbols(symbols: str):
+    names = [s.strip().upper() for s in symbols.split(",") if s.strip()]
+    if not names:
+        raise HTTPException(status_code=422, detail="symbols is required")
+    return names
+
+async def _track(names):
+    # Starts collecting ``names`` on the shared stream; unknown or disallowed symbols are refused first.
+    try:
+        return await get_hub().track(names)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def _send_rows(websocket: WebSocket, queue):
+    while True:
+        await websocket.send_text(await queue.get())
+
+async def _until_disconnect(websocket: WebSocket):
+    # Clients send nothing, but reading is the only way to notice they left
+    # while their symbols are quiet.
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+@app.websocket("/ws/signals")
+async def signals_ws(websocket: WebSocket, symbols: str):
+    # Pushes the recent rows, then every changed indicator/signal row.
+    try:
+        names = await _track(_stream_symbols(symbols))
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+    await websocket.accept()
+    hub = get_hub()
+    queue = await hub.subscribe(names)
+    tasks = [asyncio.create_task(_send_rows(websocket, queue)), asyncio.create_task(_until_disconnect(websocket))]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hub.unsubscribe(queue, names)
+        # Not awaited: when the client leaves, the server may already be
+        # cancelling this handler, and a second wait here races that cancel.
+        for task in tasks:
+            task.cancel()
+
+@app.get("/signals/stream")
+async def signals_sse(request: Request, symbols: str):
+    # Server-Sent Events version of /ws/signals.
+    names = await _track(_stream_symbols(symbols))
+    hub = get_hub()
+    queue = await hub.subscribe(names)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            hub.unsubscribe(queue, names)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.get("/signals/stream/stats")
+def signals_stream_stats():
+    return get_hub().stats()
+
+@app.get("/chart/{symbol}")
+async def chart(symbol: str, since: Optional[int] = None, bucket: Optional[int] = None,
+                max_points: int = 1500, history: int = 0, interval: Optional[str] = None):
+    # Full downsampled chart, or with since/bucket only the buckets that changed.
+    hub = get_hub()
+    if interval is not None and interval != hub.interval:
+        # The hub streams one interval (STREAM_INTERVAL); never show another as if it were this one.
+        raise HTTPException(status_code=409, detail=f"Chart stream runs at {hub.interval}, not {interval}; "
+                                                    f"start the API with STREAM_INTERVAL={interval}")
+    await _track([symbol])
+    return await asyncio.to_thread(live_chart, hub.collector, symbol, since=since, bucket=bucket,
+                                   max_points=max_points, history=history)
+
+_CHART_PAGE = os.path.join(os.path.dirname(__file__), "static", "live_chart.html")
+
+@app.get("/chart/{symbol}/view", response_class=HTMLResponse)
+def chart_view(symbol: str):
+    # Plotly.js page that polls /chart/{symbol} (query: interval, max_points, history, refresh_ms).
+    with open(_CHART_PAGE, encoding="utf-8") as f:
+        return f.read()
+
+def _cache_and_stream_metrics():
+    # Counters that already live in the caches and the signal hub, read at scrape time.
+    caches = {"model": model_cache.stats(), "compact": compact_cache.stats(), "frame": frame_cache.stats()}
+    hub = get_hub().stats()
+    return [
+        ("cache_hits_total", "counter", "Cache hits", [({"cache": k}, v["hits"]) for k, v in caches.items()]),
+        ("cache_misses_total", "counter", "Cache misses", [({"cache": k}, v["misses"]) for k, v in caches.items()]),
+        ("cache_bytes", "gauge", "Bytes held by each cache", [({"cache": k}, v["bytes"]) for k, v in caches.items()]),
+        ("stream_rows_published_total", "counter", "Signal rows published by the hub", [({}, hub["published"])]),
+        ("stream_rows_dropped_total", "counter", "Rows dropped for slow subscribers", [({}, hub["dropped"])]),
+        ("stream_subscribers", "gauge", "Open stream subscriptions",
+         [({"symbol": s}, n) for s, n in hub["subscribers"].items()]),
+    ]
+
+metrics.describe("http_request_seconds", "API request latency by route")
+metrics.collectors.append(_cache_and_stream_metrics)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profile")
+async def debug_profile(seconds: float = 5.0, interval_ms: float = 5.0):
+    # Opt-in (PROFILER_ENABLED=1): samples every thread, returns folded stacks for flame graphs.
+    if not profiler_enabled():
+        raise HTTPException(status_code=404, detail="Profiler disabled; set PROFILER_ENABLED=1")
+    seconds = min(max(seconds, 0.0), 60.0)
+    interval = max(interval_ms, 1.0) / 1000.0  # a zero interval would busy-spin the sampler
+    profiler = await asyncio.to_thread(profile_for, seconds, interval)
+    return PlainTextResponse(profiler.collapsed())
@@ -0,0 +1,242 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds. Wide enough for a 20 us message parse and a multi-second retrain.
+DEFAULT_BOUNDS = (0.00002, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                  0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_symbol = contextvars.ContextVar('metrics_symbol', default='')
+_active = contextvars.ContextVar('metrics_active_stages', default=frozenset())
+
+class Histogram:
+    """Fixed-bucket histogram: one bisect and a few additions per observation."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding rank q."""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return float('nan')
+        rank, seen = q * total, 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.bounds[-1]
+
+def _label_value(value):
+    # Exposition format escapes: backslash, double quote and line feed.
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_label_value(v)}"' for k, v in labels)
+    return "{" + inner + "}"
+
+class Metrics:
+    """Process-wide counters and histograms with Prometheus text exposition.
+
+    Series are keyed by (name, sorted labels) and created on first use.
+    ``collectors`` are callables returning (name, type, help, [(labels, value)])
+    tuples at scrape time, for numbers that already live elsewhere (cache
+    and stream stats). When ``enabled`` is False, observe/inc return at once.
+
+    Only symbols in ``symbols`` (collected ones and those with a model) get
+    their own ``symbol`` label; anything else is counted as "other", so
+    request input cannot grow the number of series.
+    """
+
+    def __init__(self, prefix="cryptotrader", enabled=True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self.help = {}
+        self.histograms = {}  # name -> {labels: Histogram}
+        self.counters = {}  # name -> {labels: value}
+        self.collectors = []
+        self.symbols = set()
+        self._lock = threading.Lock()
+
+    def allow_symbols(self, *symbols):
+        self.symbols.update(s.upper() for s in symbols)
+
+    def symbol_name(self, symbol):
+        return symbol if symbol in self.symbols else "other"
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def histogram(self, name, **labels):
+        """The series for (name, labels); hot paths keep it instead of calling observe()."""
+        key = tuple(sorted(labels.items()))
+        series = self.histograms.get(name)
+        hist = series.get(key) if series is not None else None
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(name, {}).setdefault(key, Histogram())
+        return hist
+
+    def observe(self, name, value, **labels):
+        if self.enabled:
+            self.histogram(name, **labels).observe(value)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe_stage(self, stage, seconds, symbol=None):
+        symbol = _symbol.get() if symbol is None else symbol
+        if symbol:
+            self.observe("stage_seconds", seconds, stage=stage, symbol=self.symbol_name(symbol))
+        else:
+            self.observe("stage_seconds", seconds, stage=stage)
+
+    @contextmanager
+    def timer(self, stage, symbol=None):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - t0, symbol)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            histograms = {n: dict(s) for n, s in self.histograms.items()}
+            counters = {n: dict(s) for n, s in self.counters.items()}
+        for name, series in sorted(histograms.items()):
+            full = f"{self.prefix}_{name}"
+            lines += [f"# HELP {full} {self.help.get(name, name)}", f"# TYPE {full} histogram"]
+            for labels, hist in sorted(series.items()):
+                with hist._lock:
+                    counts, total, count = list(hist.counts), hist.sum, hist.count
+                cumulative = 0
+                for bound, c in zip(list(hist.bounds) + ["+Inf"], counts):
+                    cumulative += c
+                    lines.append(f"{full}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{full}_sum{_label_text(labels)} {total}")
+                lines.append(f"{full}_count{_label_text(labels)} {count}")
+        for name, series in sorted(counters.items()):
+            full = f"{self.prefix}_{name}"
+            lines += [f"# HELP {full} {self.help.get(name, name)}", f"# TYPE {full} counter"]
+            lines += [f"{full}{_label_text(labels)} {value}" for labels, value in sorted(series.items())]
+        for collect in self.collectors:
+            try:
+                for name, kind, text, samples in collect():
+                    full = f"{self.prefix}_{name}"
+                    lines += [f"# HELP {full} {text}", f"# TYPE {full} {kind}"]
+                    lines += [f"{full}{_label_text(tuple(sorted(labels.items())))} {value}"
+                              for labels, value in samples]
+            except Exception as e:
+                print("Metrics collector error:", e)
+        return "\n".join(lines) + "\n"
+
+    def summary(self, name="stage_seconds"):
+        """Rows of {labels..., count, mean_ms, p50_ms, p99_ms} for a histogram, for dashboards."""
+        with self._lock:
+            series = dict(self.histograms.get(name, {}))
+        rows = []
+        for labels, hist in sorted(series.items()):
+            row = dict(labels)
+            row.update(count=hist.count, mean_ms=hist.sum / hist.count * 1000 if hist.count else 0.0,
+                       p50_ms=hist.quantile(0.5) * 1000, p99_ms=hist.quantile(0.99) * 1000)
+            rows.append(row)
+        return rows
+
+# METRICS_ENABLED=0 turns every timer and counter into an early return.
+metrics = Metrics(enabled=os.environ.get("METRICS_ENABLED", "1") != "0")
+metrics.describe("stage_seconds", "Time spent per pipeline stage")
+metrics.describe("stage_errors_total", "Pipeline stage calls that raised")
+metrics.describe("message_lag_seconds", "Exchange event time to candle stored")
+metrics.describe("signal_lag_seconds", "Exchange event time to signal published")
+
+@contextmanager
+def symbol_label(symbol):
+    """Label stages timed inside the block with ``symbol``."""
+    token = _symbol.set(symbol.upper() if symbol else '')
+    try:
+        yield
+    finally:
+        _symbol.reset(token)
+
+def timed(stage):
+    """Decorator recording the call's wall time under ``stage``.
+
+    Nested calls of the same stage (cache wrappers calling themselves) are
+    recorded once, by the outermost call.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            active = _active.get()
+            if not metrics.enabled or stage in active:
+                return fn(*args, **kwargs)
+            token = _active.set(active | {stage})
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                metrics.inc("stage_errors_total", stage=stage)
+                raise
+            finally:
+                metrics.observe_stage(stage, time.perf_counter() - t0)
+                _active.reset(token)
+        return wrapper
+    return decorate
+
+_message_series = {}
+
+def record_message(symbol, parse_seconds, ingest_seconds, event_ms):
+    """Per-message parse/ingest times and exchange lag, through cached series.
+
+    This runs for every kline update, so it skips the label handling of
+    observe(); the message count is the parse_message histogram's count.
+    """
+    if not metrics.enabled:
+        return
+    series = _message_series.get(symbol)
+    if series is None:
+        label = metrics.symbol_name(symbol)
+        series = (metrics.histogram("stage_seconds", stage="parse_message", symbol=label),
+                  metrics.histogram("stage_seconds", stage="ingest", symbol=label),
+                  metrics.histogram("message_lag_seconds", symbol=label))
+        if label == symbol:
+            _message_series[symbol] = series
+    series[0].observe(parse_seconds)
+    series[1].observe(ingest_seconds)
+    if event_ms:
+        series[2].observe(max(0.0, time.time() - event_ms / 1000.0))
+
+def observe_lag(name, event_ms, symbol, **labels):
+    # Exchange event time (ms since epoch) to now; skipped for backfilled candles.
+    if event_ms and metrics.enabled:
+        metrics.observe(name, max(0.0, time.time() - event_ms / 1000.0),
+                        symbol=metrics.symbol_name(symbol), **labels)
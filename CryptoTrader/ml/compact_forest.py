@@ -0,0 +1,154 @@
+import json
+import numpy as np
+
+MAGIC = b"CTFOREST1\n"
+_ALIGN = 64
+_ARRAYS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'proba', 'roots')
+
+class CompactForest:
+    """Array form of a fitted RandomForestClassifier / ExtraTreesClassifier.
+
+    All trees are flattened into one set of node arrays (children hold
+    global node ids, leaves point at themselves), so a batch of rows walks
+    every tree at once with a handful of numpy ops per depth level. Leaf
+    probabilities are stored already normalised the way sklearn's trees
+    normalise them, and the per-tree sum runs in tree order, so
+    predict/predict_proba match the sklearn model bit for bit.
+
+    The file written by ``save`` is a small JSON header followed by the raw
+    arrays; ``load`` memory-maps it, so processes serving the same model
+    share one copy in the page cache.
+    """
+
+    def __init__(self, arrays, classes, n_features, max_depth, feature_names=None):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.missing_left = arrays['missing_left']
+        self.proba = arrays['proba']
+        self.roots = arrays['roots']
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object) if feature_names is not None else None
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        if not hasattr(forest, 'estimators_') or getattr(forest, 'n_outputs_', 1) != 1:
+            raise TypeError(f"Cannot export {type(forest).__name__}: expected a fitted single-output forest classifier")
+        parts = {name: [] for name in _ARRAYS[:-1]}
+        roots, offset, max_depth = [], 0, 0
+        for est in forest.estimators_:
+            tree = est.tree_
+            leaf = tree.children_left == -1
+            ids = np.arange(tree.node_count)
+            parts['feature'].append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            parts['threshold'].append(np.where(leaf, np.inf, tree.threshold).astype(np.float64))
+            parts['left'].append(np.where(leaf, ids, tree.children_left).astype(np.int32) + offset)
+            parts['right'].append(np.where(leaf, ids, tree.children_right).astype(np.int32) + offset)
+            mgl = getattr(tree, 'missing_go_to_left', None)
+            parts['missing_left'].append(np.ones(tree.node_count, np.uint8) if mgl is None
+                                         else np.where(leaf, 1, mgl).astype(np.uint8))
+            # DecisionTreeClassifier.predict_proba: value rows divided by their sum.
+            value = tree.value[:, 0, :forest.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)
+            normalizer[normalizer == 0.0] = 1.0
+            parts['proba'].append(value / normalizer[:, None])
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        arrays = {name: np.concatenate(chunks) for name, chunks in parts.items()}
+        arrays['roots'] = np.asarray(roots, dtype=np.int32)
+        return cls(arrays, forest.classes_, forest.n_features_in_, max_depth,
+                   getattr(forest, 'feature_names_in_', None))
+
+    def _leaves(self, X):
+        X = np.asarray(X, dtype=np.float32)  # sklearn trees compare float32 inputs
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_trees, n_rows = len(self.roots), len(X)
+        flat_x = X.ravel()
+        has_nan = np.isnan(flat_x).any()
+        node = np.repeat(self.roots, n_rows)
+        base = np.tile(np.arange(n_rows) * X.shape[1], n_trees)
+        out, pos = node, np.arange(len(node))
+        for depth in range(self.max_depth):
+            x = flat_x[base + self.feature[node]]
+            thr = self.threshold[node]
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.missing_left[node] == 1, x <= thr)
+            else:
+                go_left = x <= thr
+            node = np.where(go_left, self.left[node], self.right[node])
+            if depth % 8 == 7:
+                # Drop (tree, row) pairs that already sit on a leaf.
+                out[pos] = node
+                active = self.left[node] != node
+                if not active.any():
+                    break
+                node, base, pos = node[active], base[active], pos[active]
+        out[pos] = node
+        return out.reshape(n_trees, n_rows)
+
+    def predict_proba(self, X):
+        # Sum over the tree axis accumulates tree by tree, like the forest's
+        # own loop, before dividing by the number of trees.
+        return self.proba[self._leaves(X)].sum(axis=0) / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in _ARRAYS)
+
+    def save(self, fh):
+        """Write to an open binary file (see model_registry._atomic_write)."""
+        layout, offset = {}, 0
+        for name in _ARRAYS:
+            arr = np.ascontiguousarray(getattr(self, name))
+            offset = -(-offset // _ALIGN) * _ALIGN
+            layout[name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+            offset += arr.nbytes
+        header = json.dumps({
+            'arrays': layout,
+            'classes': self.classes_.tolist(),
+            'n_features': int(self.n_features_in_),
+            'max_depth': int(self.max_depth),
+            'feature_names': None if self.feature_names_in_ is None else list(self.feature_names_in_),
+        }).encode()
+        start = -(-(len(MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+        fh.write(MAGIC + len(header).to_bytes(8, 'little') + header)
+        fh.write(b"\0" * (start - len(MAGIC) - 8 - len(header)))
+        written = 0
+        for name in _ARRAYS:
+            arr = np.ascontiguousarray(getattr(self, name))
+            pad = layout[name]['offset'] - written
+            fh.write(b"\0" * pad + arr.tobytes())
+            written += pad + arr.nbytes
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(path, 'rb') as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a compact forest file")
+            size = int.from_bytes(fh.read(8), 'little')
+            header = json.loads(fh.read(size))
+        start = -(-(len(MAGIC) + 8 + size) // _ALIGN) * _ALIGN
+        buf = np.memmap(path, dtype=np.uint8, mode='r') if mmap else np.fromfile(path, dtype=np.uint8)
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape']))
+            arrays[name] = np.frombuffer(buf, dtype=dtype, count=count,
+                                         offset=start + spec['offset']).reshape(spec['shape'])
+        return cls(arrays, header['classes'], header['n_features'], header['max_depth'],
+                   header['feature_names'])
+
+def export_forest(forest, path):
+    """Write ``forest`` to ``path`` in the compact format; returns the CompactForest."""
+    from CryptoTrader.ml.model_registry import _atomic_write
+    compact = CompactForest.from_sklearn(forest)
+    _atomic_write(path, compact.save)
+    return compact
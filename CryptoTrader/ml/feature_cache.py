@@ -0,0 +1,58 @@
+import os
+import joblib
+import pandas as pd
+from CryptoTrader.trading.indicators import add_indicators_chunk
+from CryptoTrader.trading.websocket_stream import interval_seconds
+
+class TrainingFeatureCache:
+    """Per-(symbol, interval) indicator rows kept between retrains.
+
+    Only candles newer than the cached ones are run through
+    add_indicators_chunk, continuing from the saved EMA/window state, so a
+    retrain after 30 new candles computes 30 feature rows instead of 1500.
+    Targets are derived at training time because the newest row's target
+    depends on a candle that has not arrived yet.
+    """
+
+    def __init__(self, cache_dir="models", max_rows=20_000):
+        self.cache_dir = cache_dir
+        self.max_rows = max_rows
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.cache_dir, symbol.upper(), f"features_{interval}.pkl")
+
+    def load(self, symbol, interval):
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception:
+            return None
+
+    def update(self, symbol, interval, store, initial_rows=1500):
+        """Extend the cached indicator frame with newly stored candles and return it."""
+        cached = self.load(symbol, interval)
+        if cached is None:
+            candles = store.read(symbol, interval, limit=initial_rows)
+            if candles.empty:
+                return add_indicators_chunk(candles)[0], 0
+            frame, state = add_indicators_chunk(candles)
+        else:
+            start = cached['last_time'] + interval_seconds(interval)
+            candles = store.read(symbol, interval, start=start)
+            if candles.empty:
+                return cached['frame'], 0
+            new, state = add_indicators_chunk(candles, cached['state'])
+            frame = pd.concat([cached['frame'], new]).iloc[-self.max_rows:]
+        last_time = int(candles.index[-1].timestamp())
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump({'frame': frame, 'state': state, 'last_time': last_time}, path)
+        return frame, len(candles)
+
+def training_rows(frame, feature_cols):
+    # Same X/y as build_features on the same indicator rows.
+    future_close = frame['close'].shift(-1)
+    rows = frame.assign(target=(future_close > frame['close']).astype(int))[future_close.notna()]
+    return rows[feature_cols].fillna(0), rows['target'].astype(int)
@@ -0,0 +1,164 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import joblib
+from CryptoTrader.file_lock import file_lock
+from CryptoTrader.ml.compact_forest import export_forest
+
+_VERSION_RE = re.compile(r"^v(\d{6})\.pkl(\.z)?$")
+
+def _atomic_write(path, write):
+    # Write through a temp file in the same directory, then rename over ``path``.
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            write(fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+class ModelRegistry:
+    """Versioned model files with atomic publishing.
+
+    Layout under ``model_dir``::
+
+        model_BTCUSDT.pkl            current version (what load_model reads)
+        model_BTCUSDT.forest         compact export of the current forest
+        BTCUSDT/v000007.pkl          newest version, uncompressed
+        BTCUSDT/v000006.pkl.z        older versions, zlib-compressed
+        BTCUSDT/v000007.json         metadata for each version
+
+    Every file is written to a temp file and renamed into place, so readers
+    only ever see a complete pickle. ``keep`` versions are retained.
+    Publishing and rollback hold ``.publish.lock`` in ``model_dir``, so
+    training workers in separate processes get distinct versions.
+    """
+
+    def __init__(self, model_dir="models", keep=5, compress=3):
+        self.model_dir = model_dir
+        self.keep = keep
+        self.compress = compress
+        self._lock = threading.Lock()
+
+    def _publish_lock(self):
+        return file_lock(os.path.join(self.model_dir, ".publish.lock"))
+
+    def current_path(self, symbol):
+        return os.path.join(self.model_dir, f"model_{symbol.upper()}.pkl")
+
+    def compact_path(self, symbol):
+        return os.path.join(self.model_dir, f"model_{symbol.upper()}.forest")
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.model_dir, symbol.upper())
+
+    def versions(self, symbol):
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        found = {}
+        for name in os.listdir(directory):
+            m = _VERSION_RE.match(name)
+            if m:
+                found[int(m.group(1))] = os.path.join(directory, name)
+        return sorted(found.items())
+
+    def metadata(self, symbol, version=None):
+        versions = self.versions(symbol)
+        if not versions:
+            return None
+        version = version or versions[-1][0]
+        path = os.path.join(self._symbol_dir(symbol), f"v{version:06d}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as fh:
+            return json.load(fh)
+
+    def history(self, symbol):
+        return [self.metadata(symbol, v) for v, _ in self.versions(symbol)]
+
+    def publish(self, symbol, model, metadata=None):
+        """Store ``model`` as a new version and make it current. Returns the metadata."""
+        symbol = symbol.upper()
+        with self._lock, self._publish_lock():
+            directory = self._symbol_dir(symbol)
+            os.makedirs(directory, exist_ok=True)
+            versions = self.versions(symbol)
+            version = versions[-1][0] + 1 if versions else 1
+            path = os.path.join(directory, f"v{version:06d}.pkl")
+            _atomic_write(path, lambda fh: joblib.dump(model, fh))
+            meta = dict(metadata or {}, symbol=symbol, version=version, published_at=time.time(),
+                        size_bytes=os.path.getsize(path))
+            _atomic_write(os.path.join(directory, f"v{version:06d}.json"),
+                          lambda fh: fh.write(json.dumps(meta, indent=2, default=str).encode()))
+            self._set_current(symbol, path)
+            self._export(symbol, model)
+            self._compact(symbol, versions)
+        return meta
+
+    def _set_current(self, symbol, version_path):
+        current = self.current_path(symbol)
+        if version_path.endswith(".z"):
+            _atomic_write(current, lambda fh: joblib.dump(joblib.load(version_path), fh))
+            return
+        # A unique temp name: os.link needs a free path, and a fixed one could be another writer's.
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(current) or ".")
+        os.close(fd)
+        os.remove(tmp)
+        try:
+            try:
+                os.link(version_path, tmp)
+            except OSError:
+                shutil.copyfile(version_path, tmp)
+            os.replace(tmp, current)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _export(self, symbol, model):
+        # Written after the pickle, so a .forest newer than the .pkl is current.
+        try:
+            export_forest(model, self.compact_path(symbol))
+        except TypeError:
+            if os.path.exists(self.compact_path(symbol)):
+                os.remove(self.compact_path(symbol))
+
+    def _compact(self, symbol, previous):
+        # Compress the versions that are no longer newest and drop the oldest.
+        for version, path in previous:
+            if not path.endswith(".z"):
+                model = joblib.load(path)
+                _atomic_write(path + ".z", lambda fh: joblib.dump(model, fh, compress=("zlib", self.compress)))
+                os.remove(path)
+        versions = self.versions(symbol)
+        for version, path in versions[:-self.keep] if self.keep else []:
+            os.remove(path)
+            meta = os.path.join(self._symbol_dir(symbol), f"v{version:06d}.json")
+            if os.path.exists(meta):
+                os.remove(meta)
+
+    def load(self, symbol, version=None):
+        versions = dict(self.versions(symbol))
+        if version is None:
+            return joblib.load(self.current_path(symbol)) if os.path.exists(self.current_path(symbol)) else None
+        return joblib.load(versions[version]) if version in versions else None
+
+    def rollback(self, symbol, version):
+        """Make an older stored version current again."""
+        versions = dict(self.versions(symbol))
+        if version not in versions:
+            raise KeyError(f"{symbol} has no version {version}")
+        with self._lock, self._publish_lock():
+            self._set_current(symbol.upper(), versions[version])
+            self._export(symbol.upper(), joblib.load(versions[version]))
+        return self.metadata(symbol, version)
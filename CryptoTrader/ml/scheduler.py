@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+log = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+
+def _train_job(symbol, interval, model_dir, n_jobs, store_root, incremental=False):
+    # Runs in a worker process; the store is rebuilt there because it holds locks.
+    from CryptoTrader.ml.train_and_predict_auto import train_model_for_symbol
+    from CryptoTrader.trading.candle_store import CandleStore
+    store = CandleStore(store_root) if store_root else None
+    return train_model_for_symbol(symbol, interval, model_dir, store=store, n_jobs=n_jobs,
+                                  incremental=incremental)
+
+class TrainingScheduler:
+    """Bounded process pool for model training.
+
+    Requests for a (symbol, interval) that is already queued or running are
+    coalesced into that job (raising its priority and adding the callback)
+    instead of starting another one. Queued jobs start in priority order
+    (lower first) and each worker gets ``total_cores // max_workers`` cores
+    for the forest, so concurrent jobs never oversubscribe the machine.
+    """
+
+    def __init__(self, max_workers=None, total_cores=None, keep_finished=500):
+        self.total_cores = total_cores or os.cpu_count() or 1
+        self.max_workers = max_workers or max(1, min(4, self.total_cores // 2))
+        self.cores_per_job = max(1, self.total_cores // self.max_workers)
+        self.keep_finished = keep_finished
+        self.jobs = {}
+        self._active = {}  # (symbol, interval) -> job id while queued/running
+        self._callbacks = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._cond = threading.Condition()
+        self._pool = None
+        self._dispatcher = None
+
+    def _ensure_started(self):
+        if self._pool is None:
+            self._pool = self._new_pool()
+            self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+            self._dispatcher.start()
+
+    def _new_pool(self):
+        # spawn keeps worker start-up safe inside threaded hosts (Streamlit, uvicorn).
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, symbol, interval="1m", model_dir="models", priority=10, callback=None, store_root=None,
+               incremental=False):
+        """Queue a training job and return its id (an existing one if coalesced)."""
+        key = (symbol.upper(), interval)
+        with self._cond:
+            self._ensure_started()
+            job_id = self._active.get(key)
+            if job_id is not None:
+                job = self.jobs[job_id]
+                job["coalesced"] += 1
+                if job["status"] == QUEUED and not incremental:
+                    # A queued warm-start is upgraded when someone asks for a full refit.
+                    job["incremental"] = False
+                if job["status"] == QUEUED and priority < job["priority"]:
+                    job["priority"] = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), job_id))
+            else:
+                job_id = uuid.uuid4().hex[:12]
+                self.jobs[job_id] = {
+                    "job_id": job_id, "symbol": key[0], "interval": interval, "model_dir": model_dir,
+                    "store_root": store_root, "priority": priority, "status": QUEUED, "coalesced": 0,
+                    "incremental": incremental, "n_jobs": self.cores_per_job, "submitted_at": time.time(),
+                    "started_at": None, "finished_at": None, "path": None, "error": None,
+                }
+                self._active[key] = job_id
+                heapq.heappush(self._heap, (priority, next(self._seq), job_id))
+                self._cond.notify()
+            if callback is not None:
+                self._callbacks.setdefault(job_id, []).append(callback)
+        return job_id
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not (self._heap and self._running < self.max_workers):
+                    self._cond.wait()
+                priority, _, job_id = heapq.heappop(self._heap)
+                job = self.jobs[job_id]
+                # Skip stale heap entries left behind by a priority bump.
+                if job["status"] != QUEUED or priority != job["priority"]:
+                    continue
+                job["status"] = RUNNING
+                job["started_at"] = time.time()
+                self._running += 1
+            try:
+                future = self._submit(job)
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+                self._finish(job_id, future)
+                continue
+            future.add_done_callback(lambda f, job_id=job_id: self._finish(job_id, f))
+
+    def _submit(self, job):
+        args = (_train_job, job["symbol"], job["interval"], job["model_dir"], job["n_jobs"],
+                job["store_root"], job["incremental"])
+        try:
+            return self._pool.submit(*args)
+        except BrokenProcessPool as e:
+            # A worker killed mid-job (e.g. by the OOM killer) breaks the whole pool, and
+            # the next submit raises whichever job it carries: retry that job on a fresh pool.
+            log.warning("training pool broken, replacing it: %s", e)
+            self._replace_pool()
+            return self._pool.submit(*args)
+
+    def _replace_pool(self):
+        with self._cond:
+            old, self._pool = self._pool, self._new_pool()
+        old.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, job_id, future):
+        try:
+            path, err = future.result()
+        except Exception as e:
+            path, err = None, str(e)
+        with self._cond:
+            job = self.jobs[job_id]
+            job.update(status=DONE if path else ERROR, path=path, error=err, finished_at=time.time())
+            self._active.pop((job["symbol"], job["interval"]), None)
+            callbacks = self._callbacks.pop(job_id, [])
+            self._running -= 1
+            self._prune()
+            self._cond.notify()
+        for cb in callbacks:
+            try:
+                cb(job["symbol"], path, err)
+            except Exception as e:
+                print("training callback error:", e)
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j["status"] in (DONE, ERROR)]
+        for job in sorted(finished, key=lambda j: j["finished_at"])[:-self.keep_finished or None]:
+            del self.jobs[job["job_id"]]
+
+    def status(self, job_id):
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            info = dict(job)
+        if info["status"] == QUEUED:
+            info["queue_position"] = self._queue_position(job_id)
+        return info
+
+    def _queue_position(self, job_id):
+        with self._cond:
+            queued = sorted((j["priority"], j["submitted_at"], j["job_id"]) for j in self.jobs.values()
+                            if j["status"] == QUEUED)
+        ids = [q[2] for q in queued]
+        return ids.index(job_id) if job_id in ids else None
+
+    def list_jobs(self):
+        with self._cond:
+            return [dict(j) for j in self.jobs.values()]
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TrainingScheduler()
+        return _scheduler
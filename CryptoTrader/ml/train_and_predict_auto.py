@@ -1,7 +1,15 @@
-import threading, os, joblib, time
+import os, joblib, time
+import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.metrics import timed
+from CryptoTrader.trading.indicators import add_indicators, ema
+from CryptoTrader.trading.candle_store import CandleStore
+from CryptoTrader.trading.frame_cache import frame_cache
+from CryptoTrader.ml.model_registry import ModelRegistry
+from CryptoTrader.ml.feature_cache import TrainingFeatureCache, training_rows
+
+FEATURE_COLS = ['close','ema_short','ema_long','rsi','atr','ret_1','ret_3','vol_rolling','sma50']
 
 BINANCE_REST = "https://api.binance.com/api/v3/klines"
 
@@ -17,36 +25,163 @@ def fetch_history(symbol='BTCUSDT', interval='1m', limit=1500):
     df = df[['open','high','low','close','volume']].astype(float)
     return df
 
-def build_features(df):
-    df = add_indicators(df)
+@timed("build_features")
+def build_features(df, cache=None):
+    if cache is not None:
+        return cache.get_or_compute('features', df, {'features': FEATURE_COLS},
+                                    lambda: _features_from_indicators(add_indicators(df, cache=cache)))
+    return _features_from_indicators(add_indicators(df))
+
+def _features_from_indicators(df):
     df['future_close'] = df['close'].shift(-1)
     df['target'] = (df['future_close'] > df['close']).astype(int)
     df = df.dropna()
-    feature_cols = ['close','ema_short','ema_long','rsi','atr','ret_1','ret_3','vol_rolling','sma50']
-    X = df[feature_cols].fillna(0)
+    X = df[FEATURE_COLS].fillna(0)
     y = df['target'].astype(int)
     return X, y, df
 
-def train_model_for_symbol(symbol, interval='1m', model_dir='models'):
+def build_latest_features(df, short=9, long=21, rsi_period=14, cache=None):
+    """Feature row for the newest candle only, for online inference.
+
+    Unlike build_features this keeps the last candle (no target is needed).
+    EMAs run over the full close history so they match the training
+    features exactly; the windowed features only read the last 50 bars.
+    Returns an empty frame when the candle would not survive add_indicators'
+    dropna. With ``cache``, an indicator frame already computed for the same
+    candles (by /signals, /backtest or the dashboard) is read instead; the
+    row is not cached, as building it costs less than a full frame.
+    """
+    if cache is not None and len(df):
+        ind = cache.peek('indicators', df, {'short': short, 'long': long, 'rsi_period': rsi_period})
+        if ind is not None:
+            if len(ind) and ind.index[-1] == df.index[-1]:
+                return ind[FEATURE_COLS].iloc[-1:]
+            return pd.DataFrame(columns=FEATURE_COLS)
+    need = max(50, rsi_period + 1, 15, 20, 4)
+    if len(df) < need or df.iloc[-1].isna().any():
+        return pd.DataFrame(columns=FEATURE_COLS)
+    close_s = df['close'].astype(float)
+    close = close_s.to_numpy()[-need:]
+    high = df['high'].to_numpy(dtype=float)[-need:]
+    low = df['low'].to_numpy(dtype=float)[-need:]
+    volume = df['volume'].to_numpy(dtype=float)[-need:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.diff(close[-(rsi_period + 1):])
+        rs = np.clip(delta, 0, None).mean() / (-np.clip(delta, None, 0)).mean()
+        prev_close = close[-15:-1]
+        tr = np.maximum.reduce([high[-14:] - low[-14:],
+                                np.abs(high[-14:] - prev_close),
+                                np.abs(low[-14:] - prev_close)])
+        row = {
+            'close': close[-1],
+            'ema_short': ema(close_s, span=short).iloc[-1],
+            'ema_long': ema(close_s, span=long).iloc[-1],
+            'rsi': 100 - (100 / (1 + rs)),
+            'atr': tr.mean(),
+            'ret_1': close[-1] / close[-2] - 1,
+            'ret_3': close[-1] / close[-4] - 1,
+            'vol_rolling': volume[-20:].mean(),
+            'sma50': close[-50:].mean(),
+        }
+    X = pd.DataFrame([row], index=df.index[-1:], columns=FEATURE_COLS)
+    return X.dropna()
+
+def load_history(symbol='BTCUSDT', interval='1m', limit=1500, store=None):
+    # Incrementally sync the local candle store and read the newest candles from disk.
+    store = store or CandleStore()
+    try:
+        store.sync(symbol, interval, initial_limit=limit)
+    except Exception as e:
+        # Fall back to what is already on disk when the exchange is unreachable.
+        if store.last_time(symbol, interval) is None:
+            raise
+        print("Candle store sync failed, training on stored history:", e)
+    return store.read(symbol, interval, limit=limit)
+
+def train_model_for_symbol(symbol, interval='1m', model_dir='models', store=None, n_jobs=-1,
+                           incremental=False, n_estimators=200, window=1500, recent_rows=300):
     os.makedirs(model_dir, exist_ok=True)
     try:
-        df = fetch_history(symbol, interval, limit=1500)
-        X, y, df_full = build_features(df)
+        if incremental:
+            return _train_incremental(symbol, interval, model_dir, store, n_jobs,
+                                      n_estimators, window, recent_rows)
+        df = load_history(symbol, interval, limit=window, store=store)
+        X, y, df_full = build_features(df, cache=frame_cache)
         if len(X) < 200:
             return None, 'not_enough_data'
-        clf = RandomForestClassifier(n_estimators=200, n_jobs=-1, random_state=42)
+        clf = RandomForestClassifier(n_estimators=n_estimators, n_jobs=n_jobs, random_state=42)
+        t0 = time.time()
         clf.fit(X, y)
-        path = os.path.join(model_dir, f"model_{symbol.upper()}.pkl")
-        joblib.dump(clf, path)
-        return path, None
+        return _publish(symbol, interval, model_dir, clf, X, y, time.time() - t0, {"mode": "full"})
     except Exception as e:
         return None, str(e)
 
-def train_in_background(symbol, interval='1m', model_dir='models', callback=None):
-    def _job():
-        path, err = train_model_for_symbol(symbol, interval, model_dir)
-        if callback:
-            callback(symbol, path, err)
-    t = threading.Thread(target=_job, daemon=True)
-    t.start()
-    return t
+def _publish(symbol, interval, model_dir, clf, X, y, seconds, extra):
+    registry = ModelRegistry(model_dir)
+    registry.publish(symbol, clf, dict({
+        "interval": interval,
+        "train_start": X.index[0],
+        "train_end": X.index[-1],
+        "n_samples": len(X),
+        "features": FEATURE_COLS,
+        "metrics": {"train_accuracy": float(clf.score(X, y)), "positive_rate": float(y.mean())},
+        "train_seconds": seconds,
+    }, **extra))
+    return registry.current_path(symbol), None
+
+def _train_incremental(symbol, interval, model_dir, store, n_jobs, n_estimators, window, recent_rows):
+    """Rolling-forest retrain: grow trees on recent rows, evict the oldest.
+
+    The number of new trees follows the share of the window that is new
+    (30 new candles of 1500 -> 4 of 200 trees). Feature rows come from the
+    TrainingFeatureCache, so only new candles go through the indicators.
+    Falls back to a full fit without a compatible previous model.
+    """
+    store = store or CandleStore()
+    try:
+        store.sync(symbol, interval, initial_limit=window)
+    except Exception as e:
+        if store.last_time(symbol, interval) is None:
+            raise
+        print("Candle store sync failed, training on stored history:", e)
+    frame, _ = TrainingFeatureCache(model_dir).update(symbol, interval, store, initial_rows=window)
+    X, y = training_rows(frame.iloc[-window:], FEATURE_COLS)
+    if len(X) < 200:
+        return None, 'not_enough_data'
+
+    registry = ModelRegistry(model_dir)
+    meta = registry.metadata(symbol) or {}
+    prev = registry.load(symbol)
+    usable = (isinstance(prev, RandomForestClassifier) and meta.get("features") == FEATURE_COLS
+              and meta.get("interval") == interval and len(getattr(prev, 'estimators_', [])) == n_estimators)
+    t0 = time.time()
+    if not usable:
+        clf = RandomForestClassifier(n_estimators=n_estimators, n_jobs=n_jobs, random_state=42)
+        clf.fit(X, y)
+        return _publish(symbol, interval, model_dir, clf, X, y, time.time() - t0, {"mode": "full"})
+
+    train_end = pd.Timestamp(meta["train_end"])
+    new_rows = int((X.index > train_end).sum())
+    if new_rows == 0:
+        return registry.current_path(symbol), None
+    n_new = max(1, min(n_estimators, int(np.ceil(n_estimators * new_rows / window))))
+    X_recent, y_recent = X.iloc[-max(recent_rows, new_rows):], y.iloc[-max(recent_rows, new_rows):]
+    if y_recent.nunique() < len(prev.classes_):
+        X_recent, y_recent = X, y
+    prev.set_params(warm_start=True, n_estimators=n_estimators + n_new, n_jobs=n_jobs)
+    prev.fit(X_recent, y_recent)
+    prev.estimators_ = prev.estimators_[n_new:]
+    prev.set_params(warm_start=False, n_estimators=len(prev.estimators_))
+    return _publish(symbol, interval, model_dir, prev, X, y, time.time() - t0,
+                    {"mode": "incremental", "trees_replaced": n_new, "new_rows": new_rows,
+                     "recent_rows": len(X_recent)})
+
+def train_in_background(symbol, interval='1m', model_dir='models', callback=None, store=None, priority=10,
+                        incremental=False):
+    # Goes through the shared scheduler: repeated calls for a symbol that is
+    # already queued or training join that job instead of starting another.
+    from CryptoTrader.ml.scheduler import get_scheduler
+    return get_scheduler().submit(symbol, interval, model_dir=model_dir, priority=priority,
+                                  callback=callback, store_root=store.root if store is not None else None,
+                                  incremental=incremental)
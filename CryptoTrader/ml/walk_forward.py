@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from CryptoTrader.ml.train_and_predict_auto import FEATURE_COLS, build_features
+from CryptoTrader.trading.backtester import _max_drawdown, backtest
+from CryptoTrader.trading.frame_cache import frame_cache
+
+FOLD_COLUMNS = ['fold', 'train_start', 'train_end', 'test_start', 'test_end', 'accuracy',
+                'final_value', 'return_pct', 'buy_hold_pct', 'trades', 'max_drawdown']
+
+# The target of row i is close[i + 1] > close[i], so the last training label
+# reads the first test bar's close; purging that row keeps the test bars unseen.
+PURGE_ROWS = 1
+
+_wf_data = None
+
+def _init_wf_worker(X, y, close, index):
+    global _wf_data
+    _wf_data = (X, y, close, index)
+
+def make_folds(n_rows, train_size=1500, test_size=100, step=None):
+    """(train_lo, train_hi, test_hi) row bounds of every full fold."""
+    step = step or test_size
+    return [(lo, lo + train_size, lo + train_size + test_size)
+            for lo in range(0, n_rows - train_size - test_size + 1, step)]
+
+def _fold_task(args):
+    fold, (lo, mid, hi), n_estimators, initial_balance, fee, slippage = args
+    X, y, close, index = _wf_data
+    clf = RandomForestClassifier(n_estimators=n_estimators, n_jobs=1, random_state=42)
+    clf.fit(X[lo:mid - PURGE_ROWS], y[lo:mid - PURGE_ROWS])
+    pred = clf.predict(X[mid:hi])
+    test = pd.DataFrame({'close': close[mid:hi],
+                         'Recommendation': np.where(pred == 1, "Buy", "Sell")}, index=index[mid:hi])
+    final_value, trades, equity = backtest(test, initial_balance, fee, slippage)
+    return {
+        'fold': fold, 'train_start': index[lo], 'train_end': index[mid - 1 - PURGE_ROWS],
+        'test_start': index[mid], 'test_end': index[hi - 1],
+        'accuracy': float((pred == y[mid:hi]).mean()),
+        'final_value': final_value,
+        'return_pct': (final_value / initial_balance - 1) * 100 if initial_balance else 0.0,
+        'buy_hold_pct': (close[hi - 1] / close[mid] - 1) * 100,
+        'trades': len(trades),
+        'max_drawdown': _max_drawdown(equity.to_numpy()),
+    }
+
+def walk_forward(df, train_size=1500, test_size=100, step=None, n_estimators=200,
+                 initial_balance=1000.0, fee=0.00075, slippage=0.0005, max_workers=None):
+    """Out-of-sample evaluation of the build_features + RandomForest pipeline.
+
+    Features are built once over the whole history and shared with the
+    workers; each fold fits on ``train_size`` rows (less the ``PURGE_ROWS``
+    next to the test window), predicts the next ``test_size`` and backtests
+    those predictions as Buy/Sell Recommendations. Windows advance by ``step`` (default ``test_size``).
+    Returns one row per fold.
+    """
+    X, y, feat = build_features(df, cache=frame_cache)
+    folds = make_folds(len(X), train_size, test_size, step)
+    if not folds:
+        return pd.DataFrame(columns=FOLD_COLUMNS)
+    data = (np.ascontiguousarray(X[FEATURE_COLS].to_numpy(dtype=np.float64)), y.to_numpy(),
+            feat['close'].to_numpy(dtype=float), X.index)
+    tasks = [(k, bounds, n_estimators, initial_balance, fee, slippage) for k, bounds in enumerate(folds)]
+
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+    if max_workers <= 1:
+        _init_wf_worker(*data)
+        rows = [_fold_task(t) for t in tasks]
+    else:
+        # spawn, as in the training scheduler: /backtest/walk-forward runs inside uvicorn's threads.
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_wf_worker, initargs=data,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            rows = list(pool.map(_fold_task, tasks, chunksize=max(1, len(tasks) // (max_workers * 4))))
+    return pd.DataFrame(rows, columns=FOLD_COLUMNS)
+
+def summarize_folds(folds):
+    if folds.empty:
+        return {"folds": 0}
+    growth = (folds['return_pct'] / 100 + 1).prod()
+    return {
+        "folds": len(folds),
+        "mean_accuracy": float(folds['accuracy'].mean()),
+        "mean_return_pct": float(folds['return_pct'].mean()),
+        "compounded_return_pct": float((growth - 1) * 100),
+        "mean_buy_hold_pct": float(folds['buy_hold_pct'].mean()),
+        "win_rate": float((folds['return_pct'] > 0).mean()),
+        "max_drawdown": float(folds['max_drawdown'].max()),
+    }
@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+class SamplingProfiler:
+    """Wall-clock sampler of every thread's Python stack.
+
+    A daemon thread reads ``sys._current_frames()`` every ``interval``
+    seconds and counts each stack, so nothing is added to the code being
+    profiled. ``collapsed()`` returns the counts in the folded format that
+    flamegraph.pl and speedscope read. Off unless started.
+    """
+
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stack(self, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.stacks[self._stack(frame)] += 1
+            self.samples += 1
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top(self, n=20):
+        """(frame, samples) for the frames most often on top of a stack."""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+def profile_for(seconds, interval=0.005):
+    """Sample all threads for ``seconds`` and return the profiler."""
+    profiler = SamplingProfiler(interval=interval).start()
+    time.sleep(seconds)
+    return profiler.stop()
+
+def profiler_enabled():
+    # The /debug/profile endpoint and the dashboard button need PROFILER_ENABLED=1.
+    return os.environ.get("PROFILER_ENABLED") == "1"
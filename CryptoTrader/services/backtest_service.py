@@ -1,13 +1,123 @@
-from CryptoTrader.trading.backtester import backtest
+import os
+from CryptoTrader.trading.backtester import _max_drawdown, backtest, backtest_arrays, backtest_stream, signal_codes
 from CryptoTrader.trading.indicators import add_indicators
 from CryptoTrader.trading.strategy import add_signals
+from CryptoTrader.trading.candle_store import CandleStore
+from CryptoTrader.trading.frame_cache import frame_cache
+from CryptoTrader.trading.strategies import get_strategies, run_strategies
+from CryptoTrader.trading.portfolio import portfolio_backtest
+from CryptoTrader.ml.walk_forward import summarize_folds, walk_forward
 
-def run_backtest(df):
-    df_ind = add_indicators(df)
-    df_sig = add_signals(df_ind)
+def run_backtest(df, as_arrays=False):
+    df_ind = add_indicators(df, cache=frame_cache)
+    df_sig = add_signals(df_ind, cache=frame_cache)
     final_val, trades, equity = backtest(df_sig)
     return {
         "final_value": final_val,
         "trades": len(trades),
-        "equity_curve": equity.tolist()
+        "equity_curve": equity.to_numpy() if as_arrays else equity.tolist()
     }
+
+def run_strategy_backtests(frames, strategies=None, initial_balance=1000.0):
+    # Every requested strategy on every symbol; summaries only.
+    try:
+        get_strategies(strategies)
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+    results = {}
+    for symbol, df in frames.items():
+        try:
+            out = run_strategies(df, strategies, cache=frame_cache)
+        except (KeyError, ValueError) as e:
+            results[symbol] = {"error": f"Invalid candles: {e}"}
+            continue
+        results[symbol] = {}
+        for name, sig in out.items():
+            if sig.empty:
+                results[symbol][name] = {"error": "Not enough candles"}
+                continue
+            final_val, trades, equity = backtest_arrays(sig['close'].to_numpy(dtype=float), signal_codes(sig),
+                                                        initial_balance=initial_balance)
+            results[symbol][name] = {
+                "final_value": final_val,
+                "return_pct": (final_val / initial_balance - 1) * 100 if initial_balance else 0.0,
+                "trades": len(trades),
+                "max_drawdown": _max_drawdown(equity),
+            }
+    return results
+
+def run_portfolio_backtest(frames, strategy="ema_rsi", initial_balance=1000.0, sizing="equal_slots",
+                           size=None, fee=0.00075, slippage=0.0005, use_confidence=False, as_arrays=False):
+    # One cash balance across all symbols; signals come from a registered strategy.
+    try:
+        get_strategies([strategy])
+        signals = {symbol: run_strategies(df, [strategy], cache=frame_cache)[strategy]
+                   for symbol, df in frames.items()}
+        final_val, trades, equity = portfolio_backtest(
+            signals, initial_balance=initial_balance, sizing=sizing, size=size,
+            fee=fee, slippage=slippage, use_confidence=use_confidence)
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+    except ValueError as e:
+        return {"error": str(e)}
+    by_symbol = {symbol: 0 for symbol in frames}
+    for _, symbol, _, _, _ in trades:
+        by_symbol[symbol] += 1
+    return {
+        "final_value": final_val,
+        "return_pct": (final_val / initial_balance - 1) * 100 if initial_balance else 0.0,
+        "trades": len(trades),
+        "trades_by_symbol": by_symbol,
+        "max_drawdown": _max_drawdown(equity.to_numpy()),
+        "equity_curve": equity.to_numpy() if as_arrays else equity.tolist(),
+    }
+
+def run_portfolio_history(symbols, interval="1m", start=None, end=None, sync=True, store=None, **kwargs):
+    # Portfolio backtest over the local candle store (times in epoch seconds).
+    store = store or CandleStore()
+    frames = {}
+    for symbol in symbols:
+        if sync:
+            store.sync(symbol, interval)
+        df = store.read(symbol, interval, start=start, end=end)
+        if df.empty:
+            return {"error": f"No stored candles for {symbol} {interval}"}
+        frames[symbol] = df
+    return run_portfolio_backtest(frames, **kwargs)
+
+def run_backtest_history(symbol, interval="1m", start=None, end=None, sync=True, store=None,
+                         as_arrays=False, streaming=False, chunk_size=100_000):
+    # Backtest straight from the local candle store (times in epoch seconds).
+    # streaming=True walks the memory-mapped history chunk by chunk and
+    # reports only the summary, so multi-year ranges stay in bounded memory.
+    store = store or CandleStore()
+    if sync:
+        store.sync(symbol, interval)
+    if streaming:
+        chunks = store.iter_chunks(symbol, interval, start=start, end=end, chunk_size=chunk_size)
+        try:
+            final_val, trades, _ = backtest_stream(chunks, equity_file=os.devnull)
+        except ValueError:
+            return {"error": f"No stored candles for {symbol} {interval}"}
+        return {"final_value": final_val, "trades": len(trades)}
+    df = store.read(symbol, interval, start=start, end=end)
+    if df.empty:
+        return {"error": f"No stored candles for {symbol} {interval}"}
+    return run_backtest(df, as_arrays=as_arrays)
+
+def run_walk_forward(symbol, interval="1m", start=None, end=None, sync=True, store=None,
+                     train_size=1500, test_size=100, step=None, n_estimators=200, max_workers=None):
+    # Out-of-sample folds of the ML model over stored history.
+    store = store or CandleStore()
+    if sync:
+        store.sync(symbol, interval)
+    df = store.read(symbol, interval, start=start, end=end)
+    if df.empty:
+        return {"error": f"No stored candles for {symbol} {interval}"}
+    folds = walk_forward(df, train_size=train_size, test_size=test_size, step=step,
+                         n_estimators=n_estimators, max_workers=max_workers)
+    if folds.empty:
+        return {"error": f"Not enough candles for a {train_size}+{test_size} fold"}
+    for col in ('train_start', 'train_end', 'test_start', 'test_end'):
+        folds[col] = folds[col].astype(str)
+    return {"summary": summarize_folds(folds), "folds": folds.to_dict(orient="records")}
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from CryptoTrader.trading.candle_store import CandleStore
+from CryptoTrader.trading.downsample import bucket_width, ohlc_buckets
+from CryptoTrader.trading.frame_cache import frame_cache
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.strategy import add_signals
+
+CHART_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'ema_short', 'ema_long', 'rsi', 'Recommendation']
+
+def _significant(values, digits):
+    # Display precision only: shortest float reprs make the JSON roughly half the size.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.floor(np.log10(np.abs(values)))
+    scale = 10.0 ** (digits - 1 - np.where(np.isfinite(magnitude), magnitude, 0))
+    return np.round(values * scale) / scale
+
+def _json_column(values, digits):
+    # JSON has no NaN; warm-up indicator values go out as null.
+    if values.dtype.kind == 'f':
+        return np.where(np.isnan(values), None, _significant(values, digits)).tolist()
+    return values.tolist()
+
+def chart_payload(df, step, since=None, bucket=None, max_points=1500, digits=8):
+    """Chart data for an indicator frame, in at most ``max_points`` OHLC buckets.
+
+    Without ``since`` the whole frame is sent and the bucket width is picked
+    to fit ``max_points``. With ``since`` and the ``bucket`` of an earlier
+    response, only the buckets from the one holding ``since`` onwards are
+    sent: the client replaces its points from ``from`` on with them. Signals
+    are computed for the rows being sent only. Floats are rounded to
+    ``digits`` significant digits.
+    """
+    if df.empty:
+        return {"error": "No candles to chart"}
+    times = df.index.values.astype('datetime64[s]').astype('int64')
+    if bucket is None:
+        bucket = bucket_width(times[-1] - times[0] + step, step, max_points)
+    if since is not None:
+        df = df.iloc[np.searchsorted(times, since // bucket * bucket):]
+    df = add_signals(df[[c for c in CHART_COLUMNS if c in df.columns and c != 'Recommendation']])
+    df = df[[c for c in CHART_COLUMNS if c in df.columns]]
+    if bucket > step:
+        df = ohlc_buckets(df, bucket)
+    out_times = df.index.values.astype('datetime64[s]').astype('int64')
+    payload = {"bucket": int(bucket), "from": int(out_times[0]) if len(out_times) else since,
+               "time": out_times.tolist()}
+    payload.update({col: _json_column(df[col].to_numpy(), digits) for col in df.columns})
+    return payload
+
+def live_chart(collector, symbol, since=None, bucket=None, max_points=1500, history=0, store=None):
+    """chart_payload for a symbol of an AsyncKlineCollector.
+
+    ``history`` prepends up to that many older candles from the candle store
+    on full requests, so long ranges can be shown beyond the live buffer.
+    """
+    symbol = symbol.upper()
+    ind = collector.get_indicator_dataframe(symbol)
+    if ind.empty:
+        return {"error": f"No candles for {symbol} yet"}
+    if history and since is None:
+        store = store or CandleStore()
+        first = int(ind.index[:1].values.astype('datetime64[s]').astype('int64')[0])
+        older = store.read(symbol, collector.interval, end=first - 1, limit=history)
+        if not older.empty:
+            candles = pd.concat([older, collector.get_dataframe(symbol)[older.columns]])
+            ind = add_indicators(candles[~candles.index.duplicated(keep='last')], cache=frame_cache)
+    return chart_payload(ind, collector.step, since=since, bucket=bucket, max_points=max_points)
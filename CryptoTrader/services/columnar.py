@@ -0,0 +1,97 @@
+import io
+import zipfile
+import numpy as np
+import pandas as pd
+
+JSON_MEDIA_TYPE = "application/json"
+NPZ_MEDIA_TYPE = "application/x-npz"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_MEDIA_TYPES = (NPZ_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+class UnsupportedMediaType(ValueError):
+    pass
+
+def _media_type(header):
+    return (header or "").split(";", 1)[0].strip().lower()
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError:
+        raise UnsupportedMediaType("pyarrow is required for Arrow IPC payloads")
+    return pa
+
+def is_binary(content_type):
+    return _media_type(content_type) in BINARY_MEDIA_TYPES
+
+def is_json(content_type):
+    # A missing Content-Type is read as JSON, as before columnar bodies existed.
+    media_type = _media_type(content_type)
+    return not media_type or media_type == JSON_MEDIA_TYPE or media_type.endswith("+json")
+
+def decode_frame(body, content_type):
+    """Decode a columnar request body into a DataFrame.
+
+    ``application/x-npz`` is an uncompressed ``np.savez`` archive with one
+    array per column; ``application/vnd.apache.arrow.stream`` is an Arrow
+    IPC stream. Both decode column-wise, with no Python object per value.
+    Malformed bodies raise ValueError.
+    """
+    media_type = _media_type(content_type)
+    if media_type == NPZ_MEDIA_TYPE:
+        try:
+            npz = np.load(io.BytesIO(body), allow_pickle=False)
+            if not isinstance(npz, np.lib.npyio.NpzFile):
+                raise ValueError("expected an npz archive, got a single array")
+            with npz:
+                return pd.DataFrame({name: npz[name] for name in npz.files}, copy=False)
+        except (zipfile.BadZipFile, EOFError, OSError, KeyError) as e:
+            raise ValueError(str(e) or type(e).__name__) from e
+    if media_type == ARROW_MEDIA_TYPE:
+        pa = _require_pyarrow()
+        try:
+            with pa.ipc.open_stream(body) as reader:
+                return reader.read_all().to_pandas()
+        except (pa.ArrowInvalid, OSError) as e:
+            raise ValueError(str(e)) from e
+    raise UnsupportedMediaType(f"Unsupported content type: {content_type}")
+
+def encode_frame(columns, media_type, metadata=None):
+    """Encode a mapping of column -> array (or a DataFrame) as ``media_type``.
+
+    ``metadata`` holds scalars such as final_value; npz stores them as
+    0-d arrays, Arrow as schema metadata.
+    """
+    if isinstance(columns, pd.DataFrame):
+        columns = {str(c): columns[c].to_numpy() for c in columns.columns}
+    columns = {name: _plain_array(values) for name, values in columns.items()}
+    metadata = metadata or {}
+    media_type = _media_type(media_type)
+    if media_type == NPZ_MEDIA_TYPE:
+        buf = io.BytesIO()
+        np.savez(buf, **columns, **{k: np.asarray(v) for k, v in metadata.items()})
+        return buf.getvalue()
+    if media_type == ARROW_MEDIA_TYPE:
+        pa = _require_pyarrow()
+        table = pa.table(columns).replace_schema_metadata({k: str(v) for k, v in metadata.items()})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise UnsupportedMediaType(f"Unsupported content type: {media_type}")
+
+def _plain_array(values):
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        # Strings (e.g. Recommendation) as fixed-width unicode so npz needs no pickle.
+        arr = arr.astype(str)
+    return arr
+
+def negotiate(accept):
+    """Pick a binary response type from an Accept header, or None for JSON."""
+    for part in (accept or "").split(","):
+        media_type = _media_type(part)
+        if media_type in BINARY_MEDIA_TYPES:
+            return media_type
+    return None
@@ -0,0 +1,219 @@
+import functools
+import os
+import threading
+import time
+from CryptoTrader.metrics import metrics, observe_lag, symbol_label
+from CryptoTrader.ml.train_and_predict_auto import FEATURE_COLS, train_in_background
+from CryptoTrader.services.prediction_service import _predict_rows, load_model
+from CryptoTrader.trading.async_stream import AsyncKlineCollector
+from CryptoTrader.trading.backtester import backtest
+from CryptoTrader.trading.strategy import add_signals
+from CryptoTrader.trading.websocket_stream import BINANCE_REST_KLINES, BINANCE_WS_BASE
+
+class LiveEngine:
+    """Collectors and per-symbol computed snapshots shared by every viewer.
+
+    One AsyncKlineCollector per interval feeds all symbols at that interval.
+    Its candle listener only marks the (symbol, interval) dirty; a single
+    worker thread then rebuilds that snapshot (signals, ML prediction, quick
+    backtest). Updates that arrive while a snapshot is being computed are
+    coalesced into one more pass, so the work follows the candle rate and
+    not the number of dashboards reading the result.
+
+    Viewers can only add symbols and intervals: a running stream is never
+    restarted on their behalf, so one session's settings cannot wipe what
+    the others see. The first ``start`` for an interval fixes its buffer
+    size; ``stop`` is an operator action.
+
+    A snapshot is a dict that is replaced, never modified, so readers can
+    keep using the one they got without locking. Model training goes
+    through the shared scheduler and its status is kept here, per (symbol,
+    interval). Each interval has its own models: 1m ones in ``model_dir``,
+    where /predict reads them, others in ``model_dir/<interval>``.
+    """
+
+    def __init__(self, candle_store=None, plot_rows=300, backtest_rows=200, model_dir="models",
+                 ws_base=BINANCE_WS_BASE, rest_url=BINANCE_REST_KLINES):
+        self.candle_store = candle_store
+        self.ws_base = ws_base
+        self.rest_url = rest_url
+        self.plot_rows = plot_rows
+        self.backtest_rows = backtest_rows
+        self.model_dir = model_dir
+        self.streams = {}  # interval -> AsyncKlineCollector
+        self.models = {}  # (symbol, interval) -> training status
+        self._snapshots = {}  # (symbol, interval) -> snapshot
+        self._dirty = set()
+        self._event_ms = {}  # (symbol, interval) -> exchange time of the newest update
+        self._wake = threading.Condition()
+        self._streams_lock = threading.Lock()
+        self._worker = None
+        self.updates = 0
+        self.computes = 0
+        self.compute_seconds = 0.0
+
+    def start(self, symbols, interval="1m", maxlen=1200):
+        """Collect ``symbols`` at ``interval`` and return that stream.
+
+        Adds to a running stream for the interval; ``maxlen`` only applies
+        when this call creates it.
+        """
+        symbols = [s.upper() for s in symbols]
+        with self._streams_lock:
+            stream = self.streams.get(interval)
+            if stream is None:
+                stream = AsyncKlineCollector(symbols, interval=interval, maxlen=maxlen, ws_base=self.ws_base,
+                                             rest_url=self.rest_url, candle_store=self.candle_store)
+                stream.listeners.append(functools.partial(self._on_candle, interval))
+                stream.start()
+                self.streams[interval] = stream
+            else:
+                stream.add_symbols(symbols)
+        self._start_worker()
+        self._mark((s, interval) for s in symbols)
+        return stream
+
+    def stop(self, interval=None):
+        """Stop one interval's stream, or all of them, and drop their snapshots."""
+        with self._streams_lock:
+            intervals = [interval] if interval is not None else list(self.streams)
+            stopped = [self.streams.pop(i) for i in intervals if i in self.streams]
+        for stream in stopped:
+            stream.stop()
+        with self._wake:
+            for key in [k for k in self._snapshots if k[1] in intervals]:
+                del self._snapshots[key]
+            self._dirty = {k for k in self._dirty if k[1] not in intervals}
+
+    @property
+    def running(self):
+        return bool(self.streams)
+
+    def collecting(self, symbol, interval="1m"):
+        stream = self.streams.get(interval)
+        return stream is not None and symbol.upper() in stream.collectors
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def _mark(self, keys):
+        with self._wake:
+            self._dirty.update(keys)
+            self._wake.notify()
+
+    def _on_candle(self, interval, symbol, candle, values, event_ms):
+        self.updates += 1
+        if event_ms:
+            self._event_ms[(symbol, interval)] = event_ms
+        self._mark(((symbol, interval),))
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._dirty:
+                    self._wake.wait()
+                keys, self._dirty = self._dirty, set()
+            for symbol, interval in keys:
+                try:
+                    with symbol_label(symbol), metrics.timer("snapshot"):
+                        self._compute(symbol, interval)
+                except Exception as e:
+                    print("Snapshot error for", symbol, interval, ":", e)
+
+    def _compute(self, symbol, interval):
+        stream = self.streams.get(interval)
+        if stream is None or symbol not in stream.collectors:
+            return
+        t0 = time.perf_counter()
+        df_ind = stream.get_indicator_dataframe(symbol)
+        if df_ind.empty:
+            return
+        df_sig = add_signals(df_ind)
+        status = dict(self.models.get((symbol, interval), {"status": "not_started"}))
+        ml = {"text": status["status"], "prediction": None, "probability": None}
+        try:
+            model = load_model(symbol, self.interval_model_dir(interval))
+            if model is not None:
+                # The collector's incremental indicators already hold the newest candle's features.
+                preds, probas = _predict_rows(model, df_ind[FEATURE_COLS].tail(1))
+                ml["prediction"] = "Buy" if int(preds[0]) == 1 else "Sell"
+                ml["probability"] = float(probas[0]) if probas[0] is not None else None
+                ml["text"] = (f"{ml['prediction']} (p={ml['probability']:.2f})" if ml["probability"] is not None
+                              else ml["prediction"])
+        except Exception as e:
+            ml["text"] = f"prediction error: {e}"
+        final_value, trades, equity = backtest(df_sig.tail(self.backtest_rows))
+        previous = self._snapshots.get((symbol, interval))
+        snapshot = {
+            "symbol": symbol,
+            "interval": interval,
+            "version": previous["version"] + 1 if previous else 1,
+            "updated": time.time(),
+            "frame": df_sig.tail(self.plot_rows),
+            "last": df_sig.iloc[-1],
+            "ml": ml,
+            "model": status,
+            "backtest": {"final_value": final_value, "trades": len(trades), "equity": equity},
+        }
+        if self.streams.get(interval) is not stream:
+            return  # stopped meanwhile
+        self._snapshots[(symbol, interval)] = snapshot
+        observe_lag("signal_lag_seconds", self._event_ms.get((symbol, interval)), symbol, path="engine")
+        self.computes += 1
+        self.compute_seconds += time.perf_counter() - t0
+
+    def snapshot(self, symbol, interval="1m"):
+        """Latest snapshot for ``symbol`` at ``interval`` or None before its first computed candle."""
+        return self._snapshots.get((symbol.upper(), interval))
+
+    def interval_model_dir(self, interval):
+        return self.model_dir if interval == "1m" else os.path.join(self.model_dir, interval)
+
+    def ensure_model(self, symbol, interval="1m", retrain_minutes=0):
+        """Train ``symbol`` at ``interval`` once, then incrementally every ``retrain_minutes`` (0 = never)."""
+        symbol = symbol.upper()
+        with self._wake:
+            status = self.models.setdefault((symbol, interval), {"status": "not_started", "last_trained": None,
+                                                     "last_trained_ts": 0})
+            if status["status"] == "not_started":
+                status["status"], priority, incremental = "training", 0, False
+            elif (retrain_minutes > 0 and status["status"] not in ("training", "retraining")
+                  and time.time() - status["last_trained_ts"] > retrain_minutes * 60):
+                status["status"], priority, incremental = "retraining", 5, True
+            else:
+                return
+        train_in_background(symbol, interval=interval, model_dir=self.interval_model_dir(interval),
+                            callback=functools.partial(self._on_trained, interval),
+                            store=self.candle_store, priority=priority, incremental=incremental)
+
+    def _on_trained(self, interval, symbol, path, err):
+        with self._wake:
+            self.models[(symbol, interval)] = {
+                "status": "ready" if path else f"error: {err}",
+                "last_trained": path if path else None,
+                "last_trained_ts": time.time(),
+            }
+        self._mark(((symbol, interval),))
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "streams": {i: {"symbols": sorted(s.collectors), "maxlen": s.maxlen} for i, s in list(self.streams.items())},
+            "snapshots": {f"{s}@{i}": snap["version"] for (s, i), snap in list(self._snapshots.items())},
+            "updates": self.updates,
+            "computes": self.computes,
+            "compute_seconds_total": self.compute_seconds,
+        }
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine(candle_store=None):
+    """Process-wide engine; ``candle_store`` is used when it is first created."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = LiveEngine(candle_store=candle_store)
+        return _engine
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+import joblib
+from CryptoTrader.ml.compact_forest import CompactForest
+
+class ModelCache:
+    """Process-wide LRU cache of unpickled models keyed by file path.
+
+    A cached model is reused while the file's (mtime, size) is unchanged.
+    With ``verify_hash`` a changed stat triggers a SHA-256 check first, so a
+    touched-but-identical file does not cause a reload. Entries are evicted
+    least-recently-used once ``max_models`` or ``max_bytes`` (file size as
+    a proxy for memory) is exceeded. While a changed file is being reloaded,
+    other callers keep getting the previous model instead of waiting.
+    """
+
+    def __init__(self, max_models=32, max_bytes=2 * 1024 ** 3, verify_hash=False, loader=joblib.load):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.verify_hash = verify_hash
+        self.loader = loader
+        self._entries = OrderedDict()  # path -> dict(model, stat, size, sha256)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self.last_load_seconds = 0.0
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _sha256(path):
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _lookup(self, path, stat):
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if entry['stat'] != stat:
+            if not (self.verify_hash and entry['sha256'] == self._sha256(path)):
+                return None
+            entry['stat'] = stat
+        self._entries.move_to_end(path)
+        self.hits += 1
+        return entry['model']
+
+    def get(self, path):
+        """Return the model stored at ``path`` or None if the file is missing."""
+        try:
+            stat = self._stat(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            model = self._lookup(path, stat)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(path, threading.Lock())
+            stale = self._entries.get(path)
+        if stale is None:
+            load_lock.acquire()
+        elif not load_lock.acquire(blocking=False):
+            # Another thread is loading the new version: keep serving the old one.
+            with self._lock:
+                self.stale_hits += 1
+            return stale['model']
+        try:
+            # Another thread may have loaded it while we waited.
+            with self._lock:
+                model = self._lookup(path, stat)
+                if model is not None:
+                    return model
+                self.misses += 1
+            t0 = time.perf_counter()
+            model = self.loader(path)
+            elapsed = time.perf_counter() - t0
+            digest = self._sha256(path) if self.verify_hash else None
+            with self._lock:
+                self.load_seconds += elapsed
+                self.last_load_seconds = elapsed
+                self._drop(path)
+                self._entries[path] = {'model': model, 'stat': stat, 'size': stat[1], 'sha256': digest}
+                self._bytes += stat[1]
+                self._evict()
+        finally:
+            load_lock.release()
+        return model
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._bytes -= entry['size']
+
+    def _evict(self):
+        while len(self._entries) > 1 and (len(self._entries) > self.max_models or self._bytes > self.max_bytes):
+            path, entry = self._entries.popitem(last=False)
+            self._bytes -= entry['size']
+            self.evictions += 1
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._drop(path)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'models': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'load_seconds_total': self.load_seconds,
+                'last_load_seconds': self.last_load_seconds,
+            }
+
+model_cache = ModelCache()
+# Compact forests are memory-mapped, so many more of them fit.
+compact_cache = ModelCache(max_models=1024, loader=CompactForest.load)
@@ -1,27 +1,93 @@
 import os
-import joblib
+import time
+import numpy as np
 import pandas as pd
-from CryptoTrader.ml.train_and_predict_auto import build_features
+from CryptoTrader.metrics import metrics, symbol_label, timed
+from CryptoTrader.ml.train_and_predict_auto import build_latest_features
+from CryptoTrader.services.model_cache import compact_cache, model_cache
+from CryptoTrader.trading.frame_cache import frame_cache
 
-def load_model(symbol: str):
-    path = os.path.join("models", f"model_{symbol.upper()}.pkl")
-    if not os.path.exists(path):
-        return None
-    return joblib.load(path)
+def model_path(symbol: str, model_dir: str = "models"):
+    return os.path.join(model_dir, f"model_{symbol.upper()}.pkl")
+
+def compact_model_path(symbol: str, model_dir: str = "models"):
+    return os.path.join(model_dir, f"model_{symbol.upper()}.forest")
+
+@timed("load_model")
+def load_model(symbol: str, model_dir: str = "models"):
+    # Served from the process-wide caches; reloaded only when the file changes.
+    # The compact export (see ml.compact_forest) is used when it is at least
+    # as new as the pickle, i.e. it was exported from the current version.
+    path, compact = model_path(symbol, model_dir), compact_model_path(symbol, model_dir)
+    try:
+        if os.stat(compact).st_mtime_ns >= os.stat(path).st_mtime_ns:
+            model = compact_cache.get(compact)
+            if model is not None:
+                return model
+    except (OSError, ValueError):
+        pass
+    return model_cache.get(path)
 
 def predict(symbol: str, df: pd.DataFrame):
-    model = load_model(symbol)
-    if model is None:
-        return {"error": f"No trained model found for {symbol}"}
+    with symbol_label(symbol):
+        model = load_model(symbol)
+        if model is None:
+            return {"error": f"No trained model found for {symbol}"}
+        metrics.allow_symbols(symbol)
 
-    X, y, df_feats = build_features(df)
-    if X.empty:
-        return {"error": "Not enough data to build features"}
+        X = build_latest_features(df, cache=frame_cache)
+        if X.empty:
+            return {"error": "Not enough data to build features"}
 
-    pred = model.predict(X.tail(1))[0]
-    proba = model.predict_proba(X.tail(1))[0][1] if hasattr(model, 'predict_proba') else None
+        preds, probas = _predict_rows(model, X)
+    pred, proba = preds[0], probas[0]
     return {
         "symbol": symbol,
         "prediction": "Buy" if int(pred) == 1 else "Sell",
         "probability": float(proba) if proba is not None else None
     }
+
+@timed("predict_proba")
+def _predict_rows(model, X):
+    # One predict_proba call yields both outputs; the label is the argmax
+    # class, which is what RandomForestClassifier.predict returns.
+    if hasattr(model, 'predict_proba'):
+        proba = model.predict_proba(X)
+        preds = model.classes_[np.argmax(proba, axis=1)]
+        pos = list(model.classes_).index(1) if 1 in model.classes_ else None
+        return preds, (proba[:, pos] if pos is not None else [None] * len(X))
+    return model.predict(X), [None] * len(X)
+
+def predict_many(frames: dict):
+    """Predict the latest candle for many symbols at once.
+
+    ``frames`` maps symbol -> OHLCV DataFrame. Only the newest feature row
+    is built per symbol and rows are grouped so each distinct model runs
+    one predict_proba call.
+    """
+    t_start = time.perf_counter()
+    results, groups = {}, {}
+    for symbol, df in frames.items():
+        t0 = time.perf_counter()
+        model = load_model(symbol)
+        if model is None:
+            results[symbol] = {"error": f"No trained model found for {symbol}"}
+            continue
+        X = build_latest_features(df, cache=frame_cache)
+        if X.empty:
+            results[symbol] = {"error": "Not enough data to build features"}
+            continue
+        results[symbol] = {"symbol": symbol, "timing_ms": {"features": (time.perf_counter() - t0) * 1000}}
+        groups.setdefault(id(model), (model, []))[1].append((symbol, X))
+
+    for model, rows in groups.values():
+        t0 = time.perf_counter()
+        preds, probas = _predict_rows(model, pd.concat([x for _, x in rows]))
+        per_row = (time.perf_counter() - t0) * 1000 / len(rows)
+        for (symbol, _), pred, proba in zip(rows, preds, probas):
+            res = results[symbol]
+            res["prediction"] = "Buy" if int(pred) == 1 else "Sell"
+            res["probability"] = float(proba) if proba is not None else None
+            res["timing_ms"]["inference"] = per_row
+            res["timing_ms"]["total"] = res["timing_ms"]["features"] + per_row
+    return {"results": results, "total_ms": (time.perf_counter() - t_start) * 1000}
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import math
+import os
+import re
+from collections import deque
+import numpy as np
+import requests
+from CryptoTrader.metrics import observe_lag
+from CryptoTrader.trading.async_stream import AsyncKlineCollector
+from CryptoTrader.trading.strategy import add_signals, rule_signals_from_arrays
+from CryptoTrader.trading.websocket_stream import BINANCE_REST_KLINES, BINANCE_WS_BASE
+
+_SYMBOL_RE = re.compile(r"^[A-Z0-9]{2,20}$")
+
+def _clean(value):
+    # JSON has no NaN; warm-up indicator values go out as null.
+    if isinstance(value, (float, np.floating)):
+        return None if math.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+class SignalHub:
+    """Live indicator/signal rows pushed to many subscribers.
+
+    Owns an AsyncKlineCollector running on the server's event loop. Each
+    stored candle update is turned into one row (candle, indicators and
+    the rule signal), serialised to JSON once and put on every subscriber
+    queue for that symbol, so the cost per update does not grow with the
+    number of clients. Queues are bounded: a slow client loses the oldest
+    pending rows, never the newest. ``seq`` numbers rows per symbol so
+    clients can tell when that happened. A new subscriber first gets the
+    symbol's recent rows, then a ``snapshot_end`` message carrying the
+    ``seq`` the live rows continue from.
+
+    Symbols come from request paths and query strings, and each new one
+    costs a REST seed and a reconnect of the shared socket, so ``track``
+    only adds names that are in ``allowed`` (when given) and listed by the
+    exchange, up to ``max_symbols`` in total.
+    """
+
+    def __init__(self, symbols=(), interval="1m", maxlen=1200, ws_base=BINANCE_WS_BASE,
+                 rest_url=BINANCE_REST_KLINES, queue_size=256, snapshot_rows=50, allowed=None, max_symbols=50):
+        self.interval = interval
+        self.allowed = {s.upper() for s in allowed} | {s.upper() for s in symbols} if allowed else None
+        self.max_symbols = max_symbols
+        self.queue_size = queue_size
+        self.snapshot_rows = snapshot_rows
+        self.collector = AsyncKlineCollector([s.upper() for s in symbols], interval, maxlen,
+                                             ws_base=ws_base, rest_url=rest_url)
+        self.collector.listeners.append(self._on_candle)
+        self._subscribers = {}  # symbol -> set of queues
+        self._recent = {}  # symbol -> deque of (time, message)
+        self._seq = {}
+        self._task = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        if self._task is None:
+            # add_symbols() from worker threads reconnects through this loop.
+            self.collector._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self.collector.run())
+
+    async def stop(self):
+        if self._task is not None:
+            await self.collector.aclose()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _row_message(self, symbol, candle, values, event_ms):
+        rec, conf, risk = rule_signals_from_arrays([values['ema_short']], [values['ema_long']],
+                                                   [values['rsi']], [candle['close']])
+        seq = self._seq[symbol] = self._seq.get(symbol, 0) + 1
+        row = {"type": "row", "symbol": symbol, "seq": seq, "event_time": event_ms}
+        row.update({k: _clean(v) for k, v in candle.items()})
+        row.update({k: _clean(v) for k, v in values.items()})
+        row.update(Recommendation=rec[0], Confidence=float(conf[0]), Risk=float(risk[0]))
+        return json.dumps(row)
+
+    def _on_candle(self, symbol, candle, values, event_ms):
+        if not self._subscribers.get(symbol) and symbol not in self._recent:
+            return
+        message = self._row_message(symbol, candle, values, event_ms)
+        observe_lag("signal_lag_seconds", event_ms, symbol, path="stream")
+        recent = self._recent.setdefault(symbol, deque(maxlen=self.snapshot_rows))
+        if recent and recent[-1][0] == candle['time']:
+            recent.pop()  # in-progress candle replaced
+        recent.append((candle['time'], message))
+        self.published += 1
+        for queue in self._subscribers.get(symbol, ()):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(message)
+            self.delivered += 1
+
+    def _snapshot(self, symbol):
+        # Built once per symbol from the collector's indicator frame; after
+        # that the live rows keep it current.
+        if symbol not in self._recent:
+            df = add_signals(self.collector.get_indicator_dataframe(symbol)).tail(self.snapshot_rows)
+            times = df.index.values.astype('datetime64[s]').astype('int64')
+            recent = self._recent[symbol] = deque(maxlen=self.snapshot_rows)
+            for t, record in zip(times.tolist(), df.to_dict(orient="records")):
+                row = {"type": "row", "symbol": symbol, "seq": 0, "event_time": None, "time": t}
+                row.update({k: _clean(v) for k, v in record.items()})
+                recent.append((t, json.dumps(row)))
+        return [message for _, message in self._recent[symbol]]
+
+    def _listed(self, symbol):
+        # One-candle REST request: Binance answers 400 "Invalid symbol." for unknown names.
+        try:
+            resp = requests.get(self.collector.rest_url, params={"symbol": symbol, "interval": self.interval,
+                                                                 "limit": 1}, timeout=10)
+        except requests.RequestException as e:
+            raise ValueError(f"Cannot check symbol {symbol}: {e}")
+        return resp.status_code == 200 and bool(resp.json())
+
+    async def track(self, symbols):
+        """Make sure ``symbols`` are collected and the collector is running.
+
+        Raises ValueError, before anything is added, if a new symbol is
+        malformed, not allowed or not listed, or the limit would be passed.
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        new = [s for s in symbols if s not in self.collector.collectors]
+        if new:
+            bad = [s for s in new if not _SYMBOL_RE.match(s) or (self.allowed is not None and s not in self.allowed)]
+            if bad:
+                raise ValueError(f"Symbols not allowed: {', '.join(bad)}")
+            if len(self.collector.collectors) + len(new) > self.max_symbols:
+                raise ValueError(f"At most {self.max_symbols} symbols can be streamed")
+            unknown = [s for s in new if not await asyncio.to_thread(self._listed, s)]
+            if unknown:
+                raise ValueError(f"Unknown symbols: {', '.join(unknown)}")
+            await asyncio.to_thread(self.collector.add_symbols, new)
+        await self.start()
+        return symbols
+
+    async def subscribe(self, symbols):
+        """Queue of JSON messages for ``symbols``, pre-filled with their recent
+        rows and a ``snapshot_end`` marker per symbol."""
+        symbols = await self.track(symbols)
+        queue = asyncio.Queue(maxsize=self.queue_size + (self.snapshot_rows + 1) * len(symbols))
+        for symbol in symbols:
+            for message in self._snapshot(symbol):
+                queue.put_nowait(message)
+            queue.put_nowait(json.dumps({"type": "snapshot_end", "symbol": symbol,
+                                         "seq": self._seq.get(symbol, 0)}))
+            self._subscribers.setdefault(symbol, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue, symbols):
+        for symbol in symbols:
+            self._subscribers.get(symbol.upper(), set()).discard(queue)
+
+    def stats(self):
+        return {
+            "symbols": sorted(self.collector.collectors),
+            "subscribers": {s: len(q) for s, q in self._subscribers.items()},
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "reconnects": self.collector.reconnects,
+        }
+
+_hub = None
+
+def get_hub():
+    """Process-wide hub, configured from STREAM_SYMBOLS / STREAM_INTERVAL /
+    STREAM_WS_BASE / STREAM_REST_URL (defaults: Binance, 1m). Clients may
+    add other symbols listed by the exchange, or only those in
+    STREAM_ALLOWED_SYMBOLS when it is set, up to STREAM_MAX_SYMBOLS (50)."""
+    global _hub
+    if _hub is None:
+        def names(var):
+            return [s.strip() for s in os.environ.get(var, "").split(",") if s.strip()]
+        _hub = SignalHub(names("STREAM_SYMBOLS"), interval=os.environ.get("STREAM_INTERVAL", "1m"),
+                         ws_base=os.environ.get("STREAM_WS_BASE", BINANCE_WS_BASE),
+                         rest_url=os.environ.get("STREAM_REST_URL", BINANCE_REST_KLINES),
+                         allowed=names("STREAM_ALLOWED_SYMBOLS") or None,
+                         max_symbols=int(os.environ.get("STREAM_MAX_SYMBOLS", "50")))
+    return _hub
@@ -1,7 +1,27 @@
 from CryptoTrader.trading.indicators import add_indicators
 from CryptoTrader.trading.strategy import add_signals
+from CryptoTrader.trading.frame_cache import frame_cache
+from CryptoTrader.trading.strategies import get_strategies, run_strategies
 
-def compute_signals(df):
-    df_ind = add_indicators(df)
-    df_sig = add_signals(df_ind)
-    return df_sig.tail(50).to_dict(orient="records")
+def compute_signals(df, as_frame=False):
+    df_ind = add_indicators(df, cache=frame_cache)
+    df_sig = add_signals(df_ind, cache=frame_cache)
+    tail = df_sig.tail(50)
+    return tail if as_frame else tail.to_dict(orient="records")
+
+def compute_strategy_signals(frames, strategies=None, tail=50):
+    # frames: symbol -> OHLCV DataFrame. Indicators shared by several
+    # strategies are computed once per symbol.
+    try:
+        get_strategies(strategies)
+    except KeyError as e:
+        return {"error": str(e.args[0])}
+    results = {}
+    for symbol, df in frames.items():
+        try:
+            out = run_strategies(df, strategies, cache=frame_cache)
+        except (KeyError, ValueError) as e:
+            results[symbol] = {"error": f"Invalid candles: {e}"}
+            continue
+        results[symbol] = {name: sig.tail(tail).to_dict(orient="records") for name, sig in out.items()}
+    return results
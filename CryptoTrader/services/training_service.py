@@ -1,9 +1,24 @@
-from CryptoTrader.ml.train_and_predict_auto import train_in_background
+from CryptoTrader.ml.scheduler import get_scheduler
+from CryptoTrader.ml.model_registry import ModelRegistry
 
-def train_model(symbol: str, interval: str = "1m"):
-    result = {"symbol": symbol, "status": "training_started"}
+def train_model(symbol: str, interval: str = "1m", priority: int = 10, incremental: bool = False):
+    result = {"symbol": symbol, "status": "queued"}
     try:
-        train_in_background(symbol, interval=interval, callback=lambda s, p, e: None)
+        job_id = get_scheduler().submit(symbol, interval, priority=priority, incremental=incremental)
+        result.update(get_scheduler().status(job_id))
     except Exception as e:
         result["status"] = f"error: {e}"
     return result
+
+def training_status(job_id: str):
+    # None for unknown (or pruned) job ids.
+    return get_scheduler().status(job_id)
+
+def model_versions(symbol: str, model_dir: str = "models"):
+    return {"symbol": symbol.upper(), "versions": ModelRegistry(model_dir).history(symbol)}
+
+def rollback_model(symbol: str, version: int, model_dir: str = "models"):
+    try:
+        return ModelRegistry(model_dir).rollback(symbol, version)
+    except KeyError as e:
+        return {"error": str(e)}
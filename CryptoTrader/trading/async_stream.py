@@ -0,0 +1,205 @@
+import asyncio, json, random, threading, time
+import pandas as pd
+import requests
+import websockets
+from CryptoTrader.metrics import record_message
+from CryptoTrader.trading.websocket_stream import (
+    BINANCE_REST_KLINES, BINANCE_WS_BASE, REST_PAGE_LIMIT, KlineCollector, interval_seconds, parse_kline)
+
+class AsyncKlineCollector:
+    """asyncio combined-stream collector that survives disconnects.
+
+    Reconnects with exponential backoff and, when the first candle after a
+    reconnect does not follow the last stored one, fetches only the missing
+    candles over REST (paged by 1000) before ingesting the new message, so
+    the buffers and incremental indicators stay gap-free and in order.
+    Per-symbol buffers are unstarted ``KlineCollector`` objects, as in
+    ``MultiKlineCollector``. Callables in ``listeners`` are called on the
+    event loop as ``listener(symbol, candle, values, event_ms)`` for every
+    live or backfilled candle update that was stored.
+    """
+
+    def __init__(self, symbols=("BTCUSDT",), interval="1m", maxlen=1200,
+                 ws_base=BINANCE_WS_BASE, rest_url=BINANCE_REST_KLINES,
+                 backoff_initial=1.0, backoff_max=60.0, candle_store=None):
+        self.interval = interval
+        self.step = interval_seconds(interval)
+        self.maxlen = maxlen
+        self.ws_base = ws_base
+        self.rest_url = rest_url
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.candle_store = candle_store
+        self.collectors = {s.upper(): KlineCollector(s, interval, maxlen, ws_base=ws_base, rest_url=rest_url,
+                                                     candle_store=candle_store)
+                           for s in symbols}
+        self.listeners = []
+        self.running = False
+        self.reconnects = 0
+        self.backfilled = 0
+        self._ws = None
+        self._loop = None
+        self._thread = None
+        self._stopping = None
+
+    @property
+    def url(self):
+        streams = "/".join(f"{s.lower()}@kline_{self.interval}" for s in self.collectors)
+        return f"{self.ws_base}/stream?streams={streams}"
+
+    def _fetch_klines(self, symbol, start_time, end_time):
+        candles = []
+        start_ms = start_time * 1000
+        end_ms = end_time * 1000
+        while start_ms <= end_ms:
+            limit = min(REST_PAGE_LIMIT, (end_ms - start_ms) // (self.step * 1000) + 1)
+            params = {"symbol": symbol, "interval": self.interval, "startTime": start_ms,
+                      "endTime": end_ms, "limit": int(limit)}
+            resp = requests.get(self.rest_url, params=params, timeout=10)
+            resp.raise_for_status()
+            rows = resp.json()
+            for row in rows:
+                candles.append({"time": int(row[0])//1000, "open": float(row[1]), "high": float(row[2]),
+                                "low": float(row[3]), "close": float(row[4]), "volume": float(row[5]),
+                                "is_closed": True})
+            if len(rows) < limit:
+                break
+            start_ms = int(rows[-1][0]) + self.step * 1000
+        return candles
+
+    async def _backfill(self, symbol, coll, start_time, end_time):
+        try:
+            candles = await asyncio.to_thread(self._fetch_klines, symbol, start_time, end_time)
+        except Exception as e:
+            print("Backfill failed:", symbol, e)
+            return
+        for candle in candles:
+            self._store(symbol, coll, candle, None)
+        self.backfilled += len(candles)
+
+    def _store(self, symbol, coll, candle, event_ms, parse_seconds=None):
+        t0 = time.perf_counter()
+        values = coll._ingest(candle)
+        if parse_seconds is not None:  # live message, not a backfilled candle
+            record_message(symbol, parse_seconds, time.perf_counter() - t0, event_ms)
+        if values is None:
+            return
+        for listener in self.listeners:
+            try:
+                listener(symbol, candle, values, event_ms)
+            except Exception as e:
+                print("Candle listener error:", e)
+
+    async def _handle(self, message):
+        t0 = time.perf_counter()
+        msg = json.loads(message)
+        data = msg.get("data", msg)
+        k = data.get("k") if isinstance(data, dict) else None
+        if not k:
+            return
+        symbol = (data.get("s") or k.get("s", "")).upper()
+        coll = self.collectors.get(symbol)
+        if coll is None:
+            return
+        candle = parse_kline(k)
+        parse_seconds = time.perf_counter() - t0
+        last = coll.candles[-1] if coll.candles else None
+        if last is not None and candle["time"] > last["time"]:
+            # Refetch from the last stored candle if it never saw its closing
+            # update, otherwise from the first missing one.
+            start = last["time"] if not last["is_closed"] else last["time"] + self.step
+            if start < candle["time"]:
+                await self._backfill(symbol, coll, start, candle["time"] - self.step)
+        self._store(symbol, coll, candle, data.get("E"), parse_seconds)
+
+    async def _seed(self):
+        for coll in self.collectors.values():
+            if not coll.candles:
+                await asyncio.to_thread(coll._seed_from_rest, self.maxlen)
+
+    async def run(self, seed=True):
+        self.running = True
+        self._stopping = asyncio.Event()
+        if seed:
+            await self._seed()
+        backoff = self.backoff_initial
+        while not self._stopping.is_set():
+            try:
+                async with websockets.connect(self.url, max_queue=None) as ws:
+                    self._ws = ws
+                    print("WebSocket opened for", len(self.collectors), "symbols", self.interval)
+                    async for message in ws:
+                        backoff = self.backoff_initial
+                        try:
+                            await self._handle(message)
+                        except Exception as e:
+                            print("on_message error:", e)
+            except (OSError, websockets.WebSocketException) as e:
+                print("WebSocket error:", e)
+            finally:
+                self._ws = None
+            if self._stopping.is_set():
+                break
+            self.reconnects += 1
+            delay = backoff * (1 + random.random() * 0.1)
+            backoff = min(backoff * 2, self.backoff_max)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        self.running = False
+
+    def add_symbols(self, symbols, seed=True):
+        new = [s.upper() for s in symbols if s.upper() not in self.collectors]
+        for sym in new:
+            coll = KlineCollector(sym, self.interval, self.maxlen, ws_base=self.ws_base, rest_url=self.rest_url,
+                                  candle_store=self.candle_store)
+            if seed:
+                coll._seed_from_rest(limit=self.maxlen)
+            self.collectors[sym] = coll
+        if new and self._ws is not None and self._loop is not None:
+            # Reconnect so the stream URL picks up the new symbols.
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        return new
+
+    async def aclose(self):
+        if self._stopping is not None:
+            self._stopping.set()
+        if self._ws is not None:
+            await self._ws.close()
+
+    def start(self, seed=True):
+        # Run the event loop in a background thread for synchronous callers such as Streamlit.
+        if self.running:
+            return
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def _run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.call_soon(started.set)
+            self._loop.run_until_complete(self.run(seed=seed))
+            # Let a pending aclose() finish before the loop goes away.
+            pending = asyncio.all_tasks(self._loop)
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.aclose(), self._loop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.running = False
+
+    def get_dataframe(self, symbol):
+        coll = self.collectors.get(symbol.upper())
+        return coll.get_dataframe() if coll is not None else pd.DataFrame()
+
+    def get_indicator_dataframe(self, symbol):
+        coll = self.collectors.get(symbol.upper())
+        return coll.get_indicator_dataframe() if coll is not None else pd.DataFrame()
@@ -1,6 +1,142 @@
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+from CryptoTrader.metrics import timed
 
+BUY, HOLD, SELL = 1, 0, -1
+
+def signal_codes(df):
+    if 'Recommendation' not in df.columns:
+        return np.zeros(len(df), dtype=np.int8)
+    rec = df['Recommendation'].to_numpy(dtype=object)
+    return np.where(rec == "Buy", BUY, np.where(rec == "Sell", SELL, HOLD)).astype(np.int8)
+
+def _transitions(codes, holding=False):
+    # Bars where the signal flips between Buy and Sell, starting from flat
+    # (or from an open position when ``holding``).
+    nz = np.flatnonzero(codes)
+    if len(nz) == 0:
+        return nz
+    c = codes[nz]
+    prev = np.concatenate(([BUY if holding else SELL], c[:-1]))
+    return nz[c != prev]
+
+def _simulate(close, codes, bars, balance, position, fee, slippage):
+    balance = float(balance)
+    position = float(position)
+    trades = []
+    for i in bars:
+        price = float(close[i])
+        code = codes[i]
+        if code == BUY and position == 0:
+            qty = (balance * (1 - fee)) / (price * (1 + slippage))
+            position = qty
+            balance = 0.0
+            trades.append((i, 'BUY', price, qty))
+        elif code == SELL and position > 0:
+            proceeds = position * price * (1 - fee) * (1 - slippage)
+            trades.append((i, 'SELL', price, position))
+            balance = proceeds
+            position = 0.0
+    return trades, balance, position
+
+def _run_kernel(close, codes, balance, position, fee, slippage):
+    """Simulate one block of bars from a (balance, position) state.
+
+    Returns (trades, equity, balance, position) so consecutive blocks can
+    be chained, e.g. by backtest_stream.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    codes = np.ascontiguousarray(codes, dtype=np.int8)
+    start_balance, start_position = float(balance), float(position)
+    trades, balance, position = _simulate(close, codes, _transitions(codes, start_position > 0),
+                                          start_balance, start_position, fee, slippage)
+    # Skipping repeated signals assumes every buy opens a positive position;
+    # zero/NaN/negative fills fall back to visiting every signal bar.
+    if any(t[1] == 'BUY' and not t[3] > 0 for t in trades) or start_position < 0:
+        trades, balance, position = _simulate(close, codes, np.flatnonzero(codes),
+                                              start_balance, start_position, fee, slippage)
+
+    balances = np.empty(len(trades) + 1)
+    positions = np.empty(len(trades) + 1)
+    balances[0], positions[0] = start_balance, start_position
+    for k, (i, side, price, qty) in enumerate(trades, start=1):
+        if side == 'BUY':
+            balances[k], positions[k] = 0.0, qty
+        else:
+            balances[k], positions[k] = qty * price * (1 - fee) * (1 - slippage), 0.0
+    bars = np.fromiter((t[0] for t in trades), dtype=np.int64, count=len(trades))
+    # Equity is marked before the bar's own trade, so only earlier trades count.
+    state = np.searchsorted(bars, np.arange(len(close)), side='left')
+    equity = balances[state] + positions[state] * close
+    return trades, equity, balance, position
+
+def backtest_arrays(close, codes, initial_balance=1000.0, fee=0.00075, slippage=0.0005):
+    """Array kernel behind backtest().
+
+    Returns (final_value, trades, equity) where trades hold bar positions
+    instead of index labels and equity is a float64 array.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    trades, equity, balance, position = _run_kernel(close, codes, initial_balance, 0.0, fee, slippage)
+    final_value = balance + position * close[-1]
+    return float(final_value), trades, equity
+
+@timed("backtest")
 def backtest(df, initial_balance=1000.0, fee=0.00075, slippage=0.0005):
+    final_value, trades, equity = backtest_arrays(
+        df['close'].to_numpy(dtype=float), signal_codes(df),
+        initial_balance=initial_balance, fee=fee, slippage=slippage)
+    trades = [(df.index[i], side, price, qty) for i, side, price, qty in trades]
+    equity_series = pd.Series(equity, index=df.index)
+    return final_value, trades, equity_series
+
+def backtest_stream(chunks, initial_balance=1000.0, fee=0.00075, slippage=0.0005,
+                    equity_file=None, short=9, long=21, rsi_period=14):
+    """Backtest an iterable of consecutive OHLCV chunks in bounded memory.
+
+    Indicator warm-up and the (balance, position) state are carried from
+    chunk to chunk, so the result matches add_indicators + add_signals +
+    backtest on the concatenated history. Peak memory follows the chunk
+    size; pass ``equity_file`` to append the equity curve there as raw
+    float64 instead of returning it.
+    """
+    from CryptoTrader.trading.indicators import add_indicators_chunk
+    from CryptoTrader.trading.strategy import add_signals
+    balance, position = float(initial_balance), 0.0
+    ind_state, last_close = None, None
+    trades, equity_parts = [], []
+    out = open(equity_file, 'wb') if equity_file else None
+    try:
+        for chunk in chunks:
+            df_ind, ind_state = add_indicators_chunk(chunk, ind_state, short=short, long=long,
+                                                     rsi_period=rsi_period)
+            if df_ind.empty:
+                continue
+            df_sig = add_signals(df_ind)
+            close = df_sig['close'].to_numpy(dtype=float)
+            block_trades, equity, balance, position = _run_kernel(
+                close, signal_codes(df_sig), balance, position, fee, slippage)
+            trades.extend((df_sig.index[i], side, price, qty) for i, side, price, qty in block_trades)
+            if out is not None:
+                out.write(equity.tobytes())
+            else:
+                equity_parts.append(pd.Series(equity, index=df_sig.index))
+            last_close = close[-1]
+    finally:
+        if out is not None:
+            out.close()
+    if last_close is None:
+        raise ValueError("No bars left after indicator warm-up")
+    final_value = balance + position * last_close
+    equity_series = None if out is not None else pd.concat(equity_parts)
+    return float(final_value), trades, equity_series
+
+def backtest_rowwise(df, initial_balance=1000.0, fee=0.00075, slippage=0.0005):
+    # Reference implementation kept for parity checks and benchmarks.
     balance = float(initial_balance)
     position = 0.0
     trades = []
@@ -23,3 +159,78 @@ def backtest(df, initial_balance=1000.0, fee=0.00075, slippage=0.0005):
     final_value = balance + position * prices.iloc[-1]
     equity_series = pd.Series(equity, index=df.index)
     return float(final_value), trades, equity_series
+
+# ----------------- Parameter sweep -----------------
+
+SWEEP_DEFAULTS = {
+    'short': [9],
+    'long': [21],
+    'rsi_period': [14],
+    'fee': [0.00075],
+    'slippage': [0.0005],
+}
+INDICATOR_PARAMS = ('short', 'long', 'rsi_period')
+
+_sweep_df = None
+
+def _init_sweep_worker(df):
+    global _sweep_df
+    _sweep_df = df
+
+def _max_drawdown(equity):
+    if len(equity) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    return float(np.nanmax(dd))
+
+def _sweep_task(args):
+    from CryptoTrader.trading.indicators import add_indicators
+    from CryptoTrader.trading.strategy import add_signals
+    ind_params, cost_params, initial_balance = args
+    df_sig = add_signals(add_indicators(_sweep_df, **ind_params))
+    if df_sig.empty:
+        return []
+    close = df_sig['close'].to_numpy(dtype=float)
+    codes = signal_codes(df_sig)
+    rows = []
+    for fee, slippage in cost_params:
+        final_value, trades, equity = backtest_arrays(close, codes, initial_balance, fee, slippage)
+        rows.append(dict(ind_params, fee=fee, slippage=slippage,
+                         final_value=final_value,
+                         return_pct=(final_value / initial_balance - 1) * 100 if initial_balance else 0.0,
+                         trades=len(trades),
+                         max_drawdown=_max_drawdown(equity)))
+    return rows
+
+def sweep(df, grid=None, initial_balance=1000.0, max_workers=None, rank_by='final_value'):
+    """Backtest every combination in ``grid`` and return a ranked table.
+
+    ``grid`` maps any of short/long/rsi_period/fee/slippage to a list of
+    values; missing keys use the add_indicators/backtest defaults.
+    Indicators and signals are computed once per (short, long, rsi_period)
+    and shared by all fee/slippage combinations of that task.
+    """
+    grid = dict(SWEEP_DEFAULTS, **(grid or {}))
+    unknown = set(grid) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    cost_params = list(itertools.product(grid['fee'], grid['slippage']))
+    tasks = [(dict(zip(INDICATOR_PARAMS, combo)), cost_params, initial_balance)
+             for combo in itertools.product(*(grid[k] for k in INDICATOR_PARAMS))]
+
+    if max_workers is None:
+        max_workers = min(len(tasks), os.cpu_count() or 1)
+    if max_workers <= 1:
+        _init_sweep_worker(df)
+        results = [_sweep_task(t) for t in tasks]
+    else:
+        # spawn, like walk_forward and the training scheduler: sweeps also run inside threaded hosts.
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=(df,),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(_sweep_task, tasks))
+
+    table = pd.DataFrame([row for rows in results for row in rows],
+                         columns=list(SWEEP_DEFAULTS) + ['final_value', 'return_pct', 'trades', 'max_drawdown'])
+    return table.sort_values(rank_by, ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,289 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import requests
+from CryptoTrader.file_lock import file_lock
+from CryptoTrader.trading.websocket_stream import BINANCE_REST_KLINES, REST_PAGE_LIMIT, interval_seconds
+
+STORE_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+_DTYPES = {'time': np.int64}
+
+def rest_rows_to_arrays(rows, now_ms=None):
+    """Binance kline rows -> column arrays, keeping closed candles only."""
+    if now_ms is not None:
+        rows = [r for r in rows if int(r[6]) < now_ms]
+    if not rows:
+        return {f: np.empty(0, dtype=_DTYPES.get(f, np.float64)) for f in STORE_FIELDS}
+    raw = np.array([r[:6] for r in rows], dtype=object)
+    cols = {'time': raw[:, 0].astype(np.int64) // 1000}
+    for j, f in enumerate(STORE_FIELDS[1:], start=1):
+        cols[f] = raw[:, j].astype(np.float64)
+    return cols
+
+def _partition(t):
+    return datetime.fromtimestamp(int(t), tz=timezone.utc).strftime('%Y-%m')
+
+class CandleStore:
+    """On-disk candle history per (symbol, interval).
+
+    Layout: ``root/SYMBOL/interval/YYYY-MM/<field>.bin``, one raw
+    little-endian column file per field and month. New candles are appended
+    to the column files; reads memory-map them and slice by time, so a range
+    read touches only the months and rows it needs. Writing candles older
+    than a partition's last one (deep backfill) rewrites that month through
+    a temp directory and an atomic rename. Writes to one series hold a lock
+    file in its directory, so several processes can sync the same store;
+    reads hold it shared while they open the month files, so they never see
+    a month that is being swapped.
+    """
+
+    def __init__(self, root=os.path.join('data', 'candles'), rest_url=BINANCE_REST_KLINES):
+        self.root = root
+        self.rest_url = rest_url
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @contextmanager
+    def _lock(self, symbol, interval):
+        # The thread lock queues this process's writers; the file lock excludes
+        # other processes (Streamlit reruns, training workers) on the same series.
+        with self._locks_guard:
+            lock = self._locks.setdefault((symbol.upper(), interval), threading.Lock())
+        with lock, file_lock(os.path.join(self._dir(symbol, interval), '.lock')):
+            yield
+
+    @contextmanager
+    def _read_lock(self, symbol, interval):
+        # Nothing to wait for before the first write; this also keeps reads
+        # from creating directories for series that do not exist.
+        path = self._dir(symbol, interval)
+        if not os.path.isdir(path):
+            yield
+            return
+        with file_lock(os.path.join(path, '.lock'), shared=True):
+            yield
+
+    def _dir(self, symbol, interval, partition=None):
+        path = os.path.join(self.root, symbol.upper(), interval)
+        return os.path.join(path, partition) if partition else path
+
+    def partitions(self, symbol, interval):
+        path = self._dir(symbol, interval)
+        if not os.path.isdir(path):
+            return []
+        # Skips the lock file and the .tmp/.old directories of an interrupted rewrite.
+        return sorted(p for p in os.listdir(path) if not p.startswith('.') and '.' not in p)
+
+    def _open_partition(self, path):
+        cols = {}
+        for f in STORE_FIELDS:
+            fp = os.path.join(path, f + '.bin')
+            dtype = _DTYPES.get(f, np.float64)
+            if not os.path.exists(fp) or os.path.getsize(fp) == 0:
+                return {f: np.empty(0, dtype=_DTYPES.get(f, np.float64)) for f in STORE_FIELDS}
+            cols[f] = np.memmap(fp, dtype=dtype, mode='r')
+        # An interrupted append can leave columns of different length.
+        n = min(len(c) for c in cols.values())
+        return {f: c[:n] for f, c in cols.items()}
+
+    def _append(self, path, cols):
+        os.makedirs(path, exist_ok=True)
+        for f in STORE_FIELDS:
+            with open(os.path.join(path, f + '.bin'), 'ab') as fh:
+                fh.write(np.ascontiguousarray(cols[f], dtype=_DTYPES.get(f, np.float64)).tobytes())
+
+    def _rewrite(self, path, cols):
+        tmp = path + '.tmp'
+        os.makedirs(tmp, exist_ok=True)
+        for f in STORE_FIELDS:
+            with open(os.path.join(tmp, f + '.bin'), 'wb') as fh:
+                fh.write(np.ascontiguousarray(cols[f], dtype=_DTYPES.get(f, np.float64)).tobytes())
+        old = path + '.old'
+        if os.path.isdir(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        if os.path.isdir(old):
+            for name in os.listdir(old):
+                os.remove(os.path.join(old, name))
+            os.rmdir(old)
+
+    def write(self, symbol, interval, cols):
+        """Store column arrays (time in seconds). Returns the number of new candles."""
+        times = np.asarray(cols['time'], dtype=np.int64)
+        if len(times) == 0:
+            return 0
+        order = np.argsort(times, kind='stable')
+        cols = {f: np.asarray(cols[f])[order] for f in STORE_FIELDS}
+        parts = np.array([_partition(t) for t in cols['time'][[0, -1]]])
+        if parts[0] == parts[1]:
+            groups = {parts[0]: slice(None)}
+        else:
+            labels = np.array([_partition(t) for t in cols['time']])
+            groups = {p: labels == p for p in np.unique(labels)}
+        added = 0
+        with self._lock(symbol, interval):
+            for part, sel in groups.items():
+                path = self._dir(symbol, interval, part)
+                new = {f: cols[f][sel] for f in STORE_FIELDS}
+                old = self._open_partition(path)
+                if len(old['time']) == 0 or new['time'][0] > old['time'][-1]:
+                    keep = np.concatenate(([True], np.diff(new['time']) > 0))
+                    new = {f: c[keep] for f, c in new.items()}
+                    self._append(path, new)
+                    added += len(new['time'])
+                    continue
+                merged_t = np.concatenate([old['time'], new['time']])
+                # Stable sort keeps stored candles ahead of incoming duplicates.
+                order = np.argsort(merged_t, kind='stable')
+                merged = {f: np.concatenate([old[f], new[f]])[order] for f in STORE_FIELDS}
+                keep = np.concatenate(([True], np.diff(merged['time']) > 0))
+                merged = {f: c[keep] for f, c in merged.items()}
+                added += len(merged['time']) - len(old['time'])
+                del old
+                self._rewrite(path, merged)
+        return added
+
+    def first_time(self, symbol, interval):
+        with self._read_lock(symbol, interval):
+            for part in self.partitions(symbol, interval):
+                t = self._open_partition(self._dir(symbol, interval, part))['time']
+                if len(t):
+                    return int(t[0])
+        return None
+
+    def last_time(self, symbol, interval):
+        with self._read_lock(symbol, interval):
+            for part in reversed(self.partitions(symbol, interval)):
+                t = self._open_partition(self._dir(symbol, interval, part))['time']
+                if len(t):
+                    return int(t[-1])
+        return None
+
+    def _open_range(self, symbol, interval, start, end):
+        # [(cols, lo, hi)] for the months overlapping [start, end]. The memmaps
+        # stay valid after the lock is released: a rewrite replaces files
+        # instead of changing them, and appends do not touch mapped bytes.
+        first_part = _partition(start) if start is not None else None
+        last_part = _partition(end) if end is not None else None
+        opened = []
+        with self._read_lock(symbol, interval):
+            for part in self.partitions(symbol, interval):
+                if (first_part and part < first_part) or (last_part and part > last_part):
+                    continue
+                cols = self._open_partition(self._dir(symbol, interval, part))
+                t = cols['time']
+                lo = np.searchsorted(t, start, 'left') if start is not None else 0
+                hi = np.searchsorted(t, end, 'right') if end is not None else len(t)
+                opened.append((cols, lo, hi))
+        return opened
+
+    def read_arrays(self, symbol, interval, start=None, end=None):
+        """Column arrays for start <= time <= end (seconds); memmap views when one month is read."""
+        chunks = [{f: c[lo:hi] for f, c in cols.items()}
+                  for cols, lo, hi in self._open_range(symbol, interval, start, end) if hi > lo]
+        if not chunks:
+            return {f: np.empty(0, dtype=_DTYPES.get(f, np.float64)) for f in STORE_FIELDS}
+        if len(chunks) == 1:
+            return chunks[0]
+        return {f: np.concatenate([c[f] for c in chunks]) for f in STORE_FIELDS}
+
+    def iter_chunks(self, symbol, interval, start=None, end=None, chunk_size=100_000):
+        """Yield consecutive OHLCV DataFrames of at most ``chunk_size`` rows.
+
+        Each chunk is copied out of the memory-mapped columns, so only one
+        chunk is resident at a time regardless of the range length.
+        """
+        opened = self._open_range(symbol, interval, start, end)
+        while opened:
+            cols, lo, hi = opened.pop(0)
+            t = cols['time']
+            for a in range(lo, hi, chunk_size):
+                b = min(a + chunk_size, hi)
+                index = pd.DatetimeIndex(np.array(t[a:b]).astype('datetime64[s]'), name='dt')
+                yield pd.DataFrame({f: np.array(cols[f][a:b]) for f in STORE_FIELDS[1:]}, index=index)
+            del cols, t
+
+    def read(self, symbol, interval, start=None, end=None, limit=None):
+        """OHLCV DataFrame indexed by ``dt``, like KlineCollector.get_dataframe()."""
+        if limit is not None and start is None:
+            cols = self._read_tail(symbol, interval, end, limit)
+        else:
+            cols = self.read_arrays(symbol, interval, start, end)
+            if limit is not None:
+                cols = {f: c[-limit:] for f, c in cols.items()}
+        index = pd.DatetimeIndex(np.asarray(cols['time']).astype('datetime64[s]'), name='dt')
+        return pd.DataFrame({f: np.asarray(cols[f]) for f in STORE_FIELDS[1:]}, index=index)
+
+    def _read_tail(self, symbol, interval, end, limit):
+        # Walk back through partitions until ``limit`` rows are collected.
+        chunks, n = [], 0
+        with self._read_lock(symbol, interval):
+            for part in reversed(self.partitions(symbol, interval)):
+                if end is not None and part > _partition(end):
+                    continue
+                cols = self._open_partition(self._dir(symbol, interval, part))
+                if end is not None:
+                    hi = np.searchsorted(cols['time'], end, 'right')
+                    cols = {f: c[:hi] for f, c in cols.items()}
+                take = min(limit - n, len(cols['time']))
+                if take:
+                    chunks.append({f: c[len(c) - take:] for f, c in cols.items()})
+                    n += take
+                if n >= limit:
+                    break
+        if not chunks:
+            return {f: np.empty(0, dtype=_DTYPES.get(f, np.float64)) for f in STORE_FIELDS}
+        chunks.reverse()
+        return {f: np.concatenate([c[f] for c in chunks]) for f in STORE_FIELDS}
+
+    def _fetch(self, symbol, interval, start_ms, end_ms=None):
+        params = {'symbol': symbol.upper(), 'interval': interval, 'limit': REST_PAGE_LIMIT}
+        if start_ms is not None:
+            params['startTime'] = int(start_ms)
+        if end_ms is not None:
+            params['endTime'] = int(end_ms)
+        resp = requests.get(self.rest_url, params=params, timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _download(self, symbol, interval, start_ms, end_ms=None, max_pages=None):
+        step_ms = interval_seconds(interval) * 1000
+        added, pages = 0, 0
+        while max_pages is None or pages < max_pages:
+            rows = self._fetch(symbol, interval, start_ms, end_ms)
+            pages += 1
+            if not rows:
+                break
+            added += self.write(symbol, interval, rest_rows_to_arrays(rows, now_ms=int(time.time() * 1000)))
+            start_ms = int(rows[-1][0]) + step_ms
+            if len(rows) < REST_PAGE_LIMIT or (end_ms is not None and start_ms > end_ms):
+                break
+        return added
+
+    def sync(self, symbol, interval, initial_limit=1500, max_pages=None):
+        """Append closed candles newer than the last stored one.
+
+        An empty store starts ``initial_limit`` candles back from now.
+        Returns the number of candles added.
+        """
+        step = interval_seconds(interval)
+        last = self.last_time(symbol, interval)
+        if last is not None:
+            return self._download(symbol, interval, (last + step) * 1000, max_pages=max_pages)
+        # Empty store: take the newest page (exchange clock), then page backwards.
+        added = self.write(symbol, interval, rest_rows_to_arrays(
+            self._fetch(symbol, interval, None), now_ms=int(time.time() * 1000)))
+        first = self.first_time(symbol, interval)
+        if first is not None and added < initial_limit:
+            added += self.backfill(symbol, interval, first - (initial_limit - added) * step)
+        return added
+
+    def backfill(self, symbol, interval, start, max_pages=None):
+        """Fill history from ``start`` (seconds) up to the first stored candle."""
+        first = self.first_time(symbol, interval)
+        end_ms = (first - 1) * 1000 if first is not None else None
+        return self._download(symbol, interval, int(start) * 1000, end_ms, max_pages=max_pages)
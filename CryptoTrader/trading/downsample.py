@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+def bucket_width(span, step, max_points):
+    """Smallest multiple of ``step`` seconds that fits ``span`` seconds in ``max_points`` buckets."""
+    candles = max(1, int(np.ceil(span / step)))
+    return int(step * max(1, int(np.ceil(candles / max(1, max_points)))))
+
+def ohlc_buckets(df, width):
+    """Aggregate candle rows into buckets of ``width`` seconds.
+
+    Buckets are aligned to multiples of ``width`` since the epoch, so
+    appending candles only ever changes the last bucket. open/close are the
+    first/last of the bucket, high/low its extremes, volume the sum; every
+    other column (indicators, signals) keeps the bucket's last value. The
+    index is the bucket start.
+    """
+    if df.empty:
+        return df
+    times = df.index.values.astype('datetime64[s]').astype('int64')
+    keys = times // width * width
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col == 'open':
+            columns[col] = values[starts]
+        elif col == 'high':
+            columns[col] = np.maximum.reduceat(values.astype(float), starts)
+        elif col == 'low':
+            columns[col] = np.minimum.reduceat(values.astype(float), starts)
+        elif col == 'volume':
+            columns[col] = np.add.reduceat(values.astype(float), starts)
+        else:
+            columns[col] = values[ends]
+    index = pd.DatetimeIndex(keys[starts].astype('datetime64[s]'), name=df.index.name)
+    return pd.DataFrame(columns, index=index)
@@ -0,0 +1,218 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Rows hashed per fingerprint: the newest TAIL_ROWS plus SAMPLE_ROWS spread
+# over the rest, so a lookup costs the same for 1k or 1M candles.
+TAIL_ROWS = 256
+SAMPLE_ROWS = 256
+
+def fingerprint(kind, df, params=None, symbol=None, interval=None):
+    """Content address of ``kind`` computed on ``df`` with ``params``.
+
+    Covers the length, the last candle time and the values of the newest
+    TAIL_ROWS rows (the open candle keeps changing in place), plus an evenly
+    spaced sample of older rows, so API histories that end on the same
+    candle but start elsewhere still get different keys. Older rows are not
+    all read, which keeps a cache hit far cheaper than the computation.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((kind, symbol, interval, sorted((params or {}).items()),
+                   list(map(str, df.columns)), len(df))).encode())
+    if len(df):
+        h.update(repr(df.index[-1]).encode())
+        head = len(df) - TAIL_ROWS
+        if head > 0:
+            rows = np.unique(np.linspace(0, head - 1, min(head, SAMPLE_ROWS)).astype(np.int64))
+            h.update(pd.util.hash_pandas_object(df.iloc[rows], index=True).to_numpy().tobytes())
+        h.update(pd.util.hash_pandas_object(df.iloc[-TAIL_ROWS:], index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def _copy(value):
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value.copy() if hasattr(value, 'copy') else value
+
+def _nbytes(value):
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    return 0
+
+class FrameCache:
+    """Size-bounded LRU of derived frames (indicators, signals, features).
+
+    Entries are keyed by ``fingerprint`` so identical candles sent by
+    different callers share one computation. Values are copied on the way
+    in and out, so callers may mutate what they get back. With
+    ``disk_dir`` every entry is also pickled there and memory misses fall
+    back to it; the directory is pruned oldest-first past ``disk_max_bytes``
+    (down to 90% of it). Its size is tracked in memory between prunes, so a
+    write does not list the directory.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, disk_dir=None, disk_max_bytes=2 * 1024 ** 3):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._disk_bytes = None  # unknown until the first write scans the directory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compute_seconds = 0.0
+        self.by_kind = {}
+
+    def _count(self, kind, field):
+        counts = self.by_kind.setdefault(kind, {'hits': 0, 'misses': 0})
+        counts[field] += 1
+
+    def get_or_compute(self, kind, df, params, compute, symbol=None, interval=None):
+        key = fingerprint(kind, df, params, symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._count(kind, 'hits')
+                return _copy(entry[0])
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+                self._count(kind, 'hits')
+            self._insert(key, value)
+            return _copy(value)
+        t0 = time.perf_counter()
+        value = compute()
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self.misses += 1
+            self.compute_seconds += elapsed
+            self._count(kind, 'misses')
+        self._insert(key, _copy(value))
+        self._write_disk(key, value)
+        return value
+
+    def peek(self, kind, df, params, symbol=None, interval=None):
+        """The cached value for these inputs, or None. Never computes or stores."""
+        key = fingerprint(kind, df, params, symbol, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._count(kind, 'hits')
+                return _copy(entry[0])
+        value = self._read_disk(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+                self._count(kind, 'hits')
+        return value
+
+    def _insert(self, key, value):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".pkl")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            return pd.read_pickle(self._disk_path(key))
+        except Exception:
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            pd.to_pickle(value, tmp)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += size
+                scan = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+            if scan:
+                self._prune_disk()
+        except OSError as e:
+            print("Frame cache disk write failed:", e)
+
+    def _prune_disk(self):
+        # Rescanning also picks up files written by other processes.
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            files += [os.path.join(root, n) for n in names if n.endswith(".pkl")]
+        stats = []
+        for f in files:
+            try:
+                st = os.stat(f)
+            except FileNotFoundError:
+                continue
+            stats.append((st.st_mtime, st.st_size, f))
+        stats.sort()
+        total = sum(size for _, size, _ in stats)
+        if total > self.disk_max_bytes:
+            for _, size, f in stats:
+                if total <= self.disk_max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(f)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'compute_seconds_total': self.compute_seconds,
+                'by_kind': {k: dict(v) for k, v in self.by_kind.items()},
+            }
+
+# Shared by the services and the dashboard; FRAME_CACHE_DIR enables the disk tier.
+frame_cache = FrameCache(disk_dir=os.environ.get("FRAME_CACHE_DIR") or None)
@@ -1,5 +1,8 @@
+import math
+from collections import deque
 import pandas as pd
 import numpy as np
+from CryptoTrader.metrics import timed
 
 def ema(series, span):
     return series.ewm(span=span, adjust=False).mean()
@@ -23,7 +26,12 @@ def atr(df, period=14):
     tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
     return tr.rolling(period).mean()
 
-def add_indicators(df, short=9, long=21, rsi_period=14):
+@timed("add_indicators")
+def add_indicators(df, short=9, long=21, rsi_period=14, cache=None):
+    # ``cache`` (a frame_cache.FrameCache) reuses results for identical candles.
+    if cache is not None:
+        return cache.get_or_compute('indicators', df, {'short': short, 'long': long, 'rsi_period': rsi_period},
+                                    lambda: add_indicators(df, short, long, rsi_period))
     df = df.copy()
     df['close'] = df['close'].astype(float)
     df['ema_short'] = ema(df['close'], span=short)
@@ -36,3 +44,212 @@ def add_indicators(df, short=9, long=21, rsi_period=14):
     df['vol_rolling'] = df['volume'].rolling(20).mean()
     df = df.dropna()
     return df
+
+# Rows of raw history a chunk needs in front of it: sma50 is the longest window.
+CHUNK_CONTEXT = 50
+
+def add_indicators_chunk(df, state=None, short=9, long=21, rsi_period=14):
+    """add_indicators for one chunk of a longer history.
+
+    ``state`` comes from the previous chunk's call (None for the first) and
+    carries the last EMA values plus the trailing raw candles the rolling
+    windows need. Returns (indicator frame, new state); concatenating the
+    frames of consecutive chunks gives add_indicators on the whole history
+    (EMAs exactly, rolling means to float rounding).
+    """
+    if df.empty:
+        return add_indicators(df, short=short, long=long, rsi_period=rsi_period), state
+    context = max(CHUNK_CONTEXT, rsi_period + 1)
+    prefix = state['tail'] if state else df.iloc[:0]
+    full = pd.concat([prefix, df]) if len(prefix) else df.copy()
+    full['close'] = full['close'].astype(float)
+    n_prefix = len(prefix)
+    close = df['close'].astype(float)
+    ema_short = ema(close, span=short) if state is None else \
+        ema(pd.concat([pd.Series([state['ema_short']]), close], ignore_index=True), span=short).iloc[1:]
+    ema_long = ema(close, span=long) if state is None else \
+        ema(pd.concat([pd.Series([state['ema_long']]), close], ignore_index=True), span=long).iloc[1:]
+    full['ema_short'] = np.concatenate([np.full(n_prefix, np.nan), np.asarray(ema_short)])
+    full['ema_long'] = np.concatenate([np.full(n_prefix, np.nan), np.asarray(ema_long)])
+    full['sma50'] = sma(full['close'], window=50)
+    full['rsi'] = rsi(full['close'], period=rsi_period)
+    full['atr'] = atr(full, period=14)
+    full['ret_1'] = full['close'].pct_change(1)
+    full['ret_3'] = full['close'].pct_change(3)
+    full['vol_rolling'] = full['volume'].rolling(20).mean()
+    new_state = {
+        'ema_short': float(full['ema_short'].iloc[-1]),
+        'ema_long': float(full['ema_long'].iloc[-1]),
+        'tail': pd.concat([prefix, df]).iloc[-context:],
+    }
+    return full.iloc[n_prefix:].dropna(), new_state
+
+INDICATOR_COLUMNS = ['ema_short', 'ema_long', 'sma50', 'rsi', 'atr', 'ret_1', 'ret_3', 'vol_rolling']
+
+class _RollingMean:
+    # Fixed-window mean with O(1) preview of the next value. The running sum
+    # is re-summed from the window once per wrap to stop drift.
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nonzero = 0
+        self._since_resync = 0
+
+    def preview(self, x):
+        if len(self.values) + 1 < self.window:
+            return np.nan
+        outgoing = self.values[0] if len(self.values) == self.window else 0.0
+        if self.nonzero + (x != 0) - (outgoing != 0) == 0:
+            return 0.0
+        return (self.total + x - outgoing) / self.window
+
+    def push(self, x):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+            self.nonzero -= self.values[0] != 0
+        self.values.append(x)
+        self.total += x
+        self.nonzero += x != 0
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self.total = math.fsum(self.values)
+            self._since_resync = 0
+
+def _pct_change(close, prev):
+    # As pandas' pct_change: a zero previous close gives +-inf, or NaN for 0/0.
+    if prev == 0:
+        if close != close or close == 0:
+            return np.nan
+        return np.copysign(np.inf, close) * np.copysign(1.0, prev)
+    return close / prev - 1
+
+class IncrementalIndicators:
+    """Streaming equivalent of add_indicators.
+
+    ``update(candle)`` either appends a new candle or, when ``time`` equals
+    the last one, replaces the in-progress candle. Both are O(1): the state
+    of all closed candles is kept separately from the preview computed for
+    the newest one. ``get_dataframe()`` has the columns of ``add_indicators``.
+
+    State is continuous over every candle ever fed, not only the ``maxlen``
+    rows kept: EMAs carry the influence of candles that have left the
+    window, and rows whose warm-up completed earlier stay in the frame.
+    ``add_indicators`` on the retained candles alone restarts from scratch,
+    so it returns fewer rows (its warm-up is dropped) and slightly different
+    EMA/RSI values near the start of the window. The two match row for row
+    only while nothing has been evicted.
+    """
+
+    def __init__(self, short=9, long=21, rsi_period=14, maxlen=1200):
+        self.short, self.long, self.rsi_period = short, long, rsi_period
+        self._alpha_short = self._ewm_alpha(short)
+        self._alpha_long = self._ewm_alpha(long)
+        self.rows = deque(maxlen=maxlen)
+        self._last = None  # (candle, indicators) for the newest candle
+        self._ema_short = np.nan
+        self._ema_long = np.nan
+        self._closes = deque(maxlen=3)
+        self._sma50 = _RollingMean(50)
+        self._up = _RollingMean(rsi_period)
+        self._down = _RollingMean(rsi_period)
+        self._tr = _RollingMean(14)
+        self._vol = _RollingMean(20)
+
+    @staticmethod
+    def _ewm_alpha(span):
+        # Same derivation as pandas' ewm(span=...) so values match exactly.
+        com = (span - 1) / 2.0
+        return 1.0 / (1.0 + com)
+
+    @staticmethod
+    def _ewm_step(prev, x, alpha):
+        if prev != prev:
+            return x
+        if prev == x:
+            return prev
+        old_wt = 1.0 - alpha
+        return (old_wt * prev + alpha * x) / (old_wt + alpha)
+
+    def _compute(self, candle):
+        close = float(candle['close'])
+        high, low = float(candle['high']), float(candle['low'])
+        prev_close = self._closes[-1] if self._closes else np.nan
+
+        if prev_close == prev_close:
+            delta = close - prev_close
+            up, down = max(delta, 0.0), -min(delta, 0.0)
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            ret_1 = _pct_change(close, prev_close)
+        else:
+            up = down = ret_1 = np.nan
+            tr = high - low
+        ret_3 = _pct_change(close, self._closes[0]) if len(self._closes) == 3 else np.nan
+
+        ma_up = self._up.preview(up) if up == up else np.nan
+        ma_down = self._down.preview(down) if down == down else np.nan
+        if ma_up != ma_up or ma_down != ma_down or (ma_up == 0 and ma_down == 0):
+            rsi_val = np.nan
+        elif ma_down == 0:
+            rsi_val = 100.0
+        else:
+            rsi_val = 100 - (100 / (1 + ma_up / ma_down))
+
+        values = {
+            'ema_short': self._ewm_step(self._ema_short, close, self._alpha_short),
+            'ema_long': self._ewm_step(self._ema_long, close, self._alpha_long),
+            'sma50': self._sma50.preview(close),
+            'rsi': rsi_val,
+            'atr': self._tr.preview(tr),
+            'ret_1': ret_1,
+            'ret_3': ret_3,
+            'vol_rolling': self._vol.preview(float(candle['volume'])),
+        }
+        return values, (close, up, down, tr)
+
+    def _commit(self):
+        candle, values, (close, up, down, tr) = self._last
+        self._ema_short, self._ema_long = values['ema_short'], values['ema_long']
+        self._closes.append(close)
+        self._sma50.push(close)
+        if up == up:
+            self._up.push(up)
+            self._down.push(down)
+        self._tr.push(tr)
+        self._vol.push(float(candle['volume']))
+
+    def rebuild(self, candles):
+        """Reset all state and replay ``candles`` (time-ordered); used after an out-of-order fill."""
+        self.__init__(self.short, self.long, self.rsi_period, self.rows.maxlen)
+        for candle in candles:
+            self.update(candle)
+
+    def update(self, candle):
+        """Feed one candle and return its indicator values (dict).
+
+        Candles older than the newest one are ignored (None); callers that
+        store them elsewhere must ``rebuild`` to keep the rows in step.
+        """
+        if self._last is not None:
+            last_time = self._last[0]['time']
+            if candle['time'] < last_time:
+                return None
+            if candle['time'] != last_time:
+                self._commit()
+            elif self.rows:
+                self.rows.pop()
+        values, state = self._compute(candle)
+        self._last = (candle, values, state)
+        self.rows.append((candle, values))
+        return values
+
+    def get_dataframe(self, columns=('open', 'high', 'low', 'close', 'volume', 'is_closed')):
+        if not self.rows:
+            return pd.DataFrame()
+        candles, values = zip(*self.rows)
+        df = pd.DataFrame(list(candles))
+        df.index = pd.to_datetime(df['time'], unit='s').rename('dt')
+        df = df[[c for c in columns if c in df.columns]]
+        ind = pd.DataFrame(list(values), index=df.index, columns=INDICATOR_COLUMNS)
+        df = pd.concat([df, ind], axis=1)
+        return df.dropna()
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from CryptoTrader.trading.backtester import BUY, SELL, _transitions, signal_codes
+
+SIZING_RULES = ('equal_slots', 'fraction', 'fixed')
+
+def _per_symbol(value, symbols, default):
+    if value is None:
+        return [default] * len(symbols)
+    if isinstance(value, dict):
+        return [float(value.get(s, default)) for s in symbols]
+    return [float(value)] * len(symbols)
+
+def portfolio_backtest_arrays(times, close, codes, initial_balance=1000.0, sizing='equal_slots', size=None,
+                              fee=0.00075, slippage=0.0005, confidence=None, step=None):
+    """Backtest many symbols against one cash balance.
+
+    ``times``/``close``/``codes`` map symbol -> arrays (epoch seconds,
+    close prices, BUY/HOLD/SELL codes as from signal_codes). Bars are
+    aligned on a common time axis: a regular grid of ``step`` seconds when
+    given (memory stays O(bars) for hundreds of symbols), otherwise the
+    union of all timestamps.
+
+    A position opens on any bar where a symbol's signal is Buy while it is
+    flat, so an entry skipped for lack of cash is retried once cash is
+    freed, and closes in full when the signal turns Sell, like backtest().
+    Within one timestamp sells settle before buys. The cash spent on an
+    entry comes from ``sizing``:
+
+    - ``equal_slots``: cash split evenly across the symbols not held.
+    - ``fraction``: ``size`` (default 1.0) times the available cash.
+    - ``fixed``: ``size`` quote units, capped at the available cash.
+
+    The amount is multiplied by the bar's value in ``confidence`` when
+    that is given. ``fee``/``slippage`` are scalars or symbol -> value
+    dicts.
+
+    Returns (final_value, trades, equity, axis). Trades are
+    (axis row, symbol, side, price, qty) tuples. equity holds one value
+    per axis time, marked before that time's trades.
+    """
+    if sizing not in SIZING_RULES:
+        raise ValueError(f"Unknown sizing rule {sizing!r}; expected one of {SIZING_RULES}")
+    symbols = list(close)
+    fees = _per_symbol(fee, symbols, 0.00075)
+    slips = _per_symbol(slippage, symbols, 0.0005)
+    times = {s: np.asarray(times[s], dtype=np.int64) for s in symbols}
+    nonempty = [times[s] for s in symbols if len(times[s])]
+    if not nonempty:
+        return float(initial_balance), [], np.zeros(0), np.zeros(0, dtype=np.int64)
+    if step:
+        t0 = min(int(t[0]) for t in nonempty)
+        t1 = max(int(t[-1]) for t in nonempty)
+        axis = np.arange(t0, t1 + step, step, dtype=np.int64)
+        rows_of = {s: (times[s] - t0) // step for s in symbols}
+    else:
+        axis = np.unique(np.concatenate(nonempty))
+        rows_of = {s: np.searchsorted(axis, times[s]) for s in symbols}
+
+    # Only Buy bars and bars where the signal flips to Sell can trade.
+    ev_rows, ev_sym, ev_bar, ev_code, ev_price, ev_conf = [], [], [], [], [], []
+    for k, s in enumerate(symbols):
+        c = np.ascontiguousarray(codes[s], dtype=np.int8)
+        bars = np.union1d(np.flatnonzero(c == BUY), _transitions(c))
+        ev_rows.append(rows_of[s][bars])
+        ev_sym.append(np.full(len(bars), k, dtype=np.int64))
+        ev_bar.append(bars)
+        ev_code.append(c[bars])
+        ev_price.append(np.asarray(close[s], dtype=np.float64)[bars])
+        ev_conf.append(np.asarray(confidence[s], dtype=np.float64)[bars]
+                       if confidence is not None and s in confidence else np.ones(len(bars)))
+    order = np.lexsort((np.concatenate(ev_sym), np.concatenate(ev_code), np.concatenate(ev_rows)))
+    # Sorted by row, then sells (-1) before buys (+1), then symbol.
+    ev_rows, ev_sym, ev_bar, ev_code, ev_price, ev_conf = (
+        np.concatenate(a)[order] for a in (ev_rows, ev_sym, ev_bar, ev_code, ev_price, ev_conf))
+
+    cash = float(initial_balance)
+    qty = [0.0] * len(symbols)
+    n_flat = len(symbols)
+    size = (1.0 if sizing == 'fraction' else initial_balance / len(symbols)) if size is None else float(size)
+    trades, cash_after = [], []
+    fills = [[] for _ in symbols]  # per symbol: (bar, quantity held after the trade)
+    for row, k, bar, code, price, conf in zip(ev_rows.tolist(), ev_sym.tolist(), ev_bar.tolist(),
+                                              ev_code.tolist(), ev_price.tolist(), ev_conf.tolist()):
+        if code == BUY and qty[k] == 0:
+            if sizing == 'equal_slots':
+                spend = cash / n_flat
+            elif sizing == 'fraction':
+                spend = cash * size
+            else:
+                spend = min(cash, size)
+            spend *= conf
+            if not spend > 0 or not price > 0:
+                continue
+            q = (spend * (1 - fees[k])) / (price * (1 + slips[k]))
+            cash -= spend
+            qty[k] = q
+            n_flat -= 1
+            trades.append((row, symbols[k], 'BUY', price, q))
+        elif code == SELL and qty[k] > 0:
+            q = qty[k]
+            cash += q * price * (1 - fees[k]) * (1 - slips[k])
+            qty[k] = 0.0
+            n_flat += 1
+            trades.append((row, symbols[k], 'SELL', price, q))
+        else:
+            continue
+        fills[k].append((bar, qty[k]))
+        cash_after.append((row, cash))
+
+    # Cash is piecewise constant between trades, so is each holding; both
+    # are marked before the trades of their own row, like backtest().
+    trade_rows = np.fromiter((r for r, _ in cash_after), dtype=np.int64, count=len(cash_after))
+    cash_levels = np.concatenate(([float(initial_balance)], [c for _, c in cash_after]))
+    all_rows = np.arange(len(axis))
+    equity = cash_levels[np.searchsorted(trade_rows, all_rows, side='left')]
+    for k, s in enumerate(symbols):
+        if not fills[k]:
+            continue
+        fill_bars = np.fromiter((b for b, _ in fills[k]), dtype=np.int64, count=len(fills[k]))
+        levels = np.concatenate(([0.0], [q for _, q in fills[k]]))
+        sym_rows, sym_close = rows_of[s], np.asarray(close[s], dtype=np.float64)
+        bars = np.arange(len(sym_rows))
+        held_before = levels[np.searchsorted(fill_bars, bars, side='left')]
+        if len(sym_rows) == len(axis):  # the symbol has a bar on every row
+            equity += held_before * sym_close
+            continue
+        # Rows between two bars of this symbol carry the position left by
+        # the earlier bar's trade at that bar's close.
+        held_after = levels[np.searchsorted(fill_bars, bars, side='right')]
+        idx = np.searchsorted(sym_rows, all_rows, side='right') - 1
+        seen = idx >= 0
+        idx = np.where(seen, idx, 0)
+        on_bar = seen & (sym_rows[idx] == all_rows)
+        equity += np.where(seen, np.where(on_bar, held_before[idx], held_after[idx]) * sym_close[idx], 0.0)
+
+    final_value = cash + sum(qty[k] * float(np.asarray(close[s])[-1])
+                             for k, s in enumerate(symbols) if qty[k] > 0)
+    return float(final_value), trades, equity, axis
+
+def portfolio_backtest(frames, initial_balance=1000.0, sizing='equal_slots', size=None,
+                       fee=0.00075, slippage=0.0005, use_confidence=False):
+    """portfolio_backtest_arrays for {symbol: DataFrame} with a DatetimeIndex,
+    ``close`` and ``Recommendation`` (and ``Confidence`` if ``use_confidence``).
+
+    Returns (final_value, trades, equity Series); trades carry timestamps.
+    """
+    times, close, codes, conf = {}, {}, {}, {}
+    for symbol, df in frames.items():
+        times[symbol] = df.index.values.astype('datetime64[s]').astype('int64')
+        close[symbol] = df['close'].to_numpy(dtype=float)
+        codes[symbol] = signal_codes(df)
+        if use_confidence and 'Confidence' in df.columns:
+            conf[symbol] = df['Confidence'].to_numpy(dtype=float)
+    final_value, trades, equity, axis = portfolio_backtest_arrays(
+        times, close, codes, initial_balance=initial_balance, sizing=sizing, size=size,
+        fee=fee, slippage=slippage, confidence=conf if use_confidence else None)
+    index = pd.DatetimeIndex(axis.astype('datetime64[s]'), name='dt')
+    trades = [(index[row], symbol, side, price, qty) for row, symbol, side, price, qty in trades]
+    return final_value, trades, pd.Series(equity, index=index)
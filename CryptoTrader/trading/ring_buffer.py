@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+CANDLE_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume', 'is_closed')
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+class CandleRingBuffer:
+    """Preallocated columnar store for the newest ``maxlen`` candles.
+
+    Each column is allocated twice as long as ``maxlen`` and every write goes
+    to slot ``p`` and its mirror ``p + maxlen``, so the live window is always
+    one contiguous slice and reads never have to stitch two halves together.
+    Candles stay sorted by time: a candle with the newest time replaces the
+    last one, newer candles are appended, and older ones are inserted only if
+    their time is not stored yet (the first copy wins, as with
+    ``drop_duplicates``).
+    """
+
+    def __init__(self, maxlen=1200):
+        self.maxlen = int(maxlen)
+        # One row per float field so each column is contiguous and a candle is
+        # written with a single assignment.
+        self._prices = np.zeros((len(PRICE_FIELDS), 2 * self.maxlen))
+        self._cols = {f: self._prices[j] for j, f in enumerate(PRICE_FIELDS)}
+        self._cols['time'] = np.zeros(2 * self.maxlen, dtype=np.int64)
+        self._cols['is_closed'] = np.zeros(2 * self.maxlen, dtype=np.bool_)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def _slot(self, i):
+        return (self._start + i) % self.maxlen
+
+    def _write(self, slot, candle):
+        values = [candle['open'], candle['high'], candle['low'], candle['close'], candle['volume']]
+        mirror = slot + self.maxlen
+        self._prices[:, slot] = self._prices[:, mirror] = values
+        self._cols['time'][slot] = self._cols['time'][mirror] = candle['time']
+        self._cols['is_closed'][slot] = self._cols['is_closed'][mirror] = candle['is_closed']
+
+    def _read(self, slot):
+        return {f: self._cols[f][slot].item() for f in CANDLE_FIELDS}
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("candle index out of range")
+        return self._read(self._slot(i))
+
+    def __setitem__(self, i, candle):
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("candle index out of range")
+        self._write(self._slot(i), candle)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+    def append(self, candle):
+        if self._size == self.maxlen:
+            self._start = (self._start + 1) % self.maxlen
+            self._size -= 1
+        self._write(self._slot(self._size), candle)
+        self._size += 1
+
+    def upsert(self, candle):
+        """Store ``candle`` keeping time order. Returns False if it was dropped."""
+        t = int(candle['time'])
+        if not self._size:
+            self.append(candle)
+            return True
+        last = int(self._cols['time'][self._slot(self._size - 1)])
+        if t == last:
+            self._write(self._slot(self._size - 1), candle)
+        elif t > last:
+            self.append(candle)
+        else:
+            return self._insert(t, candle)
+        return True
+
+    def _insert(self, t, candle):
+        times = self.column('time')
+        pos = int(np.searchsorted(times, t))
+        if times[pos] == t:
+            return False
+        if self._size == self.maxlen:
+            if pos == 0:
+                return False
+            # Drop the oldest candle to make room; everything before pos moves left.
+            self._start = (self._start + 1) % self.maxlen
+            self._size -= 1
+            pos -= 1
+        # Shift the tail one slot to the right (rare: only out-of-order fills).
+        for i in range(self._size, pos, -1):
+            self._write(self._slot(i), self._read(self._slot(i - 1)))
+        self._write(self._slot(pos), candle)
+        self._size += 1
+        return True
+
+    def column(self, name):
+        """Zero-copy view of one column in time order."""
+        return self._cols[name][self._start:self._start + self._size]
+
+    def last_time(self):
+        return int(self.column('time')[-1]) if self._size else None
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def to_dataframe(self):
+        if not self._size:
+            return pd.DataFrame()
+        index = pd.DatetimeIndex(self.column('time').astype('datetime64[s]'), name='dt')
+        return pd.DataFrame({f: self.column(f) for f in CANDLE_FIELDS if f != 'time'},
+                            index=index, copy=True)
@@ -0,0 +1,185 @@
+import ast
+import numpy as np
+import pandas as pd
+from CryptoTrader.trading.indicators import atr, ema, rsi, sma
+from CryptoTrader.trading.strategy import rule_signals_from_arrays
+
+CANDLE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# name -> fn(candles, **params) -> Series. Candles arrive with close already float.
+INDICATORS = {
+    'ema': lambda df, span: ema(df['close'], span=span),
+    'sma': lambda df, window: sma(df['close'], window=window),
+    'rsi': lambda df, period=14: rsi(df['close'], period=period),
+    'atr': lambda df, period=14: atr(df, period=period),
+    'pct_change': lambda df, periods=1: df['close'].pct_change(periods),
+    'volume_mean': lambda df, window=20: df['volume'].rolling(window).mean(),
+}
+
+# Names usable inside rule expressions besides the strategy's own columns.
+_EXPR_NAMESPACE = {'np': np, 'abs': np.abs, 'where': np.where, 'minimum': np.minimum,
+                   'maximum': np.maximum, 'clip': np.clip, '__builtins__': {}}
+
+def _canonical(spec):
+    name, params = spec
+    return name + "(" + ",".join(f"{k}={v}" for k, v in sorted(params.items())) + ")"
+
+def _compile(expr, label, names):
+    # Checked before compiling: only ``names`` and public np.<attr> may appear,
+    # so a typo or an attribute walk fails here instead of at eval time.
+    if expr is None or callable(expr):
+        return expr
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"{label}: invalid expression {expr!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id not in names:
+            raise ValueError(f"{label}: unknown name {node.id!r} in {expr!r}")
+        if isinstance(node, ast.Attribute) and not (
+                isinstance(node.value, ast.Name) and node.value.id == 'np' and not node.attr.startswith('_')):
+            raise ValueError(f"{label}: attribute access is not allowed in {expr!r}")
+    return compile(tree, f"<{label}>", "eval")
+
+class Strategy:
+    """A named signal rule and the indicators it needs.
+
+    ``indicators`` maps the column names the rule uses to
+    (indicator, params) pairs from INDICATORS, e.g.
+    ``{'fast': ('ema', {'span': 9})}``. The rule is either ``buy``/``sell``
+    (plus optional ``confidence``/``risk``) given as numpy expressions over
+    those columns and the candle columns (strings are compiled once), or a
+    ``signals`` callable taking the column dict and returning
+    (recommendations, confidences, risks) arrays. Expressions that do not
+    parse or use other names raise ValueError here, before any evaluation.
+    """
+
+    def __init__(self, name, indicators, buy=None, sell=None, confidence=None, risk=None,
+                 signals=None, description=""):
+        if signals is None and (buy is None or sell is None):
+            raise ValueError(f"Strategy {name} needs buy and sell rules or a signals function")
+        unknown = {spec[0] for spec in indicators.values()} - set(INDICATORS)
+        if unknown:
+            raise ValueError(f"Strategy {name} uses unknown indicators: {sorted(unknown)}")
+        self.name = name
+        self.indicators = {col: (ind, dict(params)) for col, (ind, params) in indicators.items()}
+        self.description = description
+        self._signals = signals
+        names = set(self.indicators) | set(CANDLE_COLUMNS) | set(_EXPR_NAMESPACE) - {'__builtins__'}
+        self._buy = _compile(buy, f"{name}.buy", names)
+        self._sell = _compile(sell, f"{name}.sell", names)
+        self._confidence = _compile(confidence, f"{name}.confidence", names)
+        self._risk = _compile(risk, f"{name}.risk", names)
+
+    def _eval(self, expr, cols):
+        if callable(expr):
+            return expr(cols)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return eval(expr, _EXPR_NAMESPACE, cols)
+
+    def evaluate(self, cols):
+        """(recommendations, confidences, risks) for column arrays ``cols``."""
+        if self._signals is not None:
+            return self._signals(cols)
+        n = len(cols['close'])
+        buy = np.broadcast_to(np.asarray(self._eval(self._buy, cols), dtype=bool), n)
+        sell = ~buy & np.broadcast_to(np.asarray(self._eval(self._sell, cols), dtype=bool), n)
+        active = buy | sell
+        recs = np.full(n, "Hold", dtype=object)
+        recs[buy] = "Buy"
+        recs[sell] = "Sell"
+        conf = 0.5 if self._confidence is None else self._eval(self._confidence, cols)
+        risk = 0.5 if self._risk is None else self._eval(self._risk, cols)
+        confs = np.where(active, np.clip(np.broadcast_to(conf, n), 0.0, 1.0), 0.25)
+        risks = np.where(active, np.clip(np.broadcast_to(risk, n), 0.05, 1.0), 0.5)
+        return recs, confs, risks
+
+    def describe(self):
+        return {"name": self.name, "description": self.description,
+                "indicators": {col: {"indicator": ind, "params": params}
+                               for col, (ind, params) in self.indicators.items()}}
+
+STRATEGIES = {}
+
+def register_strategy(strategy):
+    STRATEGIES[strategy.name] = strategy
+    return strategy
+
+def get_strategies(names=None):
+    """Strategy objects for ``names`` (all registered ones when None)."""
+    if names is None:
+        return list(STRATEGIES.values())
+    missing = [n for n in names if n not in STRATEGIES]
+    if missing:
+        raise KeyError(f"Unknown strategies: {missing}")
+    return [STRATEGIES[n] for n in names]
+
+def compute_indicators(df, strategies, cache=None):
+    """Candles plus the union of the strategies' indicators, one column per
+    distinct (indicator, params), so shared indicators are computed once."""
+    specs = {}
+    for strat in strategies:
+        for spec in strat.indicators.values():
+            specs[_canonical(spec)] = spec
+    if cache is not None:
+        return cache.get_or_compute('strategy_indicators', df, {'specs': sorted(specs)},
+                                    lambda: compute_indicators(df, strategies))
+    candles = df[[c for c in CANDLE_COLUMNS if c in df.columns]].copy()
+    candles['close'] = candles['close'].astype(float)
+    # Built as one dict so the frame is assembled once, not column by column.
+    columns = {c: candles[c] for c in candles.columns}
+    for key, (name, params) in specs.items():
+        columns[key] = INDICATORS[name](candles, **params)
+    return pd.DataFrame(columns, index=candles.index)
+
+def apply_strategy(strategy, ind):
+    """Signal frame for one strategy over ``compute_indicators`` output.
+
+    Holds the candle columns, the strategy's own indicator columns and
+    Recommendation/Confidence/Risk, starting at the first row where all of
+    its indicators are defined (like add_indicators' dropna).
+    """
+    cols = {c: ind[c].to_numpy() for c in CANDLE_COLUMNS if c in ind.columns}
+    for col, spec in strategy.indicators.items():
+        cols[col] = ind[_canonical(spec)].to_numpy(dtype=float)
+    keep = np.ones(len(ind), dtype=bool)
+    for col in strategy.indicators:
+        keep &= ~np.isnan(cols[col])
+    if not keep.all():
+        cols = {c: a[keep] for c, a in cols.items()}
+    recs, confs, risks = strategy.evaluate(cols)
+    cols.update(Recommendation=recs, Confidence=confs, Risk=risks)
+    return pd.DataFrame(cols, index=ind.index[keep])
+
+def run_strategies(df, names=None, cache=None):
+    """{strategy name: signal frame} for every requested strategy on ``df``."""
+    strategies = get_strategies(names)
+    ind = compute_indicators(df, strategies, cache=cache)
+    return {s.name: apply_strategy(s, ind) for s in strategies}
+
+# ----------------- Built-in strategies -----------------
+
+register_strategy(Strategy(
+    'ema_rsi',
+    {'ema_short': ('ema', {'span': 9}), 'ema_long': ('ema', {'span': 21}), 'rsi': ('rsi', {'period': 14})},
+    signals=lambda c: rule_signals_from_arrays(c['ema_short'], c['ema_long'], c['rsi'], c['close']),
+    description="EMA 9/21 trend filtered by RSI 14 (the default rule in strategy.py).",
+))
+
+register_strategy(Strategy(
+    'rsi_reversion',
+    {'rsi': ('rsi', {'period': 14})},
+    buy="rsi < 30", sell="rsi > 70",
+    confidence="0.5 + abs(rsi - 50) / 100",
+    description="Buy oversold, sell overbought on RSI 14.",
+))
+
+register_strategy(Strategy(
+    'sma_trend',
+    {'sma_fast': ('sma', {'window': 20}), 'sma_slow': ('sma', {'window': 50}), 'atr': ('atr', {'period': 14})},
+    buy="(sma_fast > sma_slow) & (close > sma_fast)",
+    sell="(sma_fast < sma_slow) & (close < sma_fast)",
+    confidence="0.4 + 20 * abs(sma_fast - sma_slow) / close",
+    risk="0.3 + 50 * atr / close",
+    description="SMA 20/50 trend with price confirmation; risk scales with ATR.",
+))
@@ -1,4 +1,5 @@
 import numpy as np
+from CryptoTrader.metrics import timed
 
 def rule_signal_from_row(row):
     try:
@@ -21,7 +22,62 @@ def rule_signal_from_row(row):
         return "Sell", float(conf), float(risk)
     return "Hold", 0.25, 0.5
 
-def add_signals(df):
+def rule_signals_from_arrays(ema_short, ema_long, rsi, close):
+    # Column-wise version of rule_signal_from_row. The comparisons mirror
+    # Python's min()/max() so NaN propagates exactly like the row version.
+    ema_short = np.asarray(ema_short, dtype=float)
+    ema_long = np.asarray(ema_long, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    recs = np.full(n, "Hold", dtype=object)
+    confs = np.full(n, 0.25)
+    risks = np.full(n, 0.5)
+
+    valid = ~(np.isnan(ema_short) | np.isnan(ema_long) | np.isnan(rsi))
+    buy = valid & (ema_short > ema_long) & (rsi < 70)
+    sell = valid & ~buy & (ema_short < ema_long) & (rsi > 30)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap = np.where(close != 0, np.abs(ema_short - ema_long) / close, 0.0)
+        buy_conf = 0.25 + 3.0 * gap + (70 - rsi) / 200
+        sell_conf = 0.25 + 3.0 * gap + (rsi - 30) / 200
+        risk = 0.5 - gap * 3
+    conf = np.where(buy, buy_conf, sell_conf)
+    conf = np.where(conf < 1.0, conf, 1.0)
+    risk = np.where(risk > 0.05, risk, 0.05)
+
+    active = buy | sell
+    recs[buy] = "Buy"
+    recs[sell] = "Sell"
+    confs[active] = conf[active]
+    risks[active] = risk[active]
+    confs[~valid] = 0.2
+    return recs, confs, risks
+
+@timed("add_signals")
+def add_signals(df, cache=None):
+    if cache is not None:
+        return cache.get_or_compute('signals', df, None, lambda: add_signals(df))
+    df = df.copy()
+    if not {'ema_short', 'ema_long', 'rsi'}.issubset(df.columns):
+        df['Recommendation'] = "Hold"
+        df['Confidence'] = 0.2
+        df['Risk'] = 0.5
+        return df
+    recs, confs, risks = rule_signals_from_arrays(
+        df['ema_short'].to_numpy(dtype=float),
+        df['ema_long'].to_numpy(dtype=float),
+        df['rsi'].to_numpy(dtype=float),
+        df['close'].to_numpy(dtype=float),
+    )
+    df['Recommendation'] = recs
+    df['Confidence'] = confs
+    df['Risk'] = risks
+    return df
+
+def add_signals_rowwise(df):
+    # Reference implementation kept for parity checks and benchmarks.
     df = df.copy()
     recs, confs, risks = [], [], []
     for _, r in df.iterrows():
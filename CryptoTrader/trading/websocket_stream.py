@@ -1,24 +1,57 @@
 import websocket, json, threading, time, requests
-from collections import deque
 import pandas as pd
+from CryptoTrader.metrics import metrics, record_message
+from CryptoTrader.trading.indicators import IncrementalIndicators
+from CryptoTrader.trading.ring_buffer import CandleRingBuffer
 
 BINANCE_REST_KLINES = "https://api.binance.com/api/v3/klines"
+BINANCE_WS_BASE = "wss://stream.binance.com:9443"
+REST_PAGE_LIMIT = 1000
+_INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def interval_seconds(interval):
+    return int(interval[:-1]) * _INTERVAL_UNITS[interval[-1]]
+
+def parse_kline(k):
+    return {
+        "time": int(k["t"])//1000,
+        "open": float(k["o"]),
+        "high": float(k["h"]),
+        "low": float(k["l"]),
+        "close": float(k["c"]),
+        "volume": float(k["v"]),
+        "is_closed": bool(k["x"])
+    }
+
+def _record_message(symbol, t0, candle, ingest, event_ms):
+    # t0 is taken before json.loads, so the first interval is the parse.
+    t1 = time.perf_counter()
+    values = ingest(candle)
+    record_message(symbol, t1 - t0, time.perf_counter() - t1, event_ms)
+    return values
 
 class KlineCollector:
-    def __init__(self, symbol="BTCUSDT", interval="1m", maxlen=1200):
+    def __init__(self, symbol="BTCUSDT", interval="1m", maxlen=1200,
+                 ws_base=BINANCE_WS_BASE, rest_url=BINANCE_REST_KLINES, candle_store=None):
         self.symbol = symbol.lower()
         self.interval = interval
-        self.url = f"wss://stream.binance.com:9443/ws/{self.symbol}@kline_{self.interval}"
+        self.url = f"{ws_base}/ws/{self.symbol}@kline_{self.interval}"
+        self.rest_url = rest_url
+        self.candle_store = candle_store
         self._ws = None
         self._thread = None
         self.running = False
-        self.candles = deque(maxlen=maxlen)
+        self.candles = CandleRingBuffer(maxlen=maxlen)
+        self.indicators = IncrementalIndicators(maxlen=maxlen)
         self._lock = threading.Lock()
+        metrics.allow_symbols(symbol)
 
     def _seed_from_rest(self, limit=1000):
+        if self.candle_store is not None:
+            return self._seed_from_store(limit)
         try:
             params = {"symbol": self.symbol.upper(), "interval": self.interval, "limit": limit}
-            resp = requests.get(BINANCE_REST_KLINES, params=params, timeout=10)
+            resp = requests.get(self.rest_url, params=params, timeout=10)
             resp.raise_for_status()
             data = resp.json()
             for row in data:
@@ -32,31 +65,44 @@ class KlineCollector:
                     "volume": float(row[5]),
                     "is_closed": True
                 }
-                with self._lock:
-                    self.candles.append(candle)
+                self._ingest(candle)
         except Exception as e:
             print("REST seed failed:", e)
 
+    def _seed_from_store(self, limit):
+        # Sync only the candles missing from the local store, then seed from disk.
+        try:
+            self.candle_store.sync(self.symbol, self.interval, initial_limit=limit)
+        except Exception as e:
+            print("Candle store sync failed:", e)
+        df = self.candle_store.read(self.symbol, self.interval, limit=limit)
+        times = df.index.values.astype('datetime64[s]').astype('int64')
+        for t, o, h, l, c, v in zip(times.tolist(), *(df[f].tolist() for f in ('open', 'high', 'low', 'close', 'volume'))):
+            self._ingest({"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v, "is_closed": True})
+
+    def _ingest(self, candle):
+        # Returns the candle's indicator values, or None if it was dropped or
+        # filled in behind the newest candle.
+        with self._lock:
+            last = self.candles.last_time()
+            if not self.candles.upsert(candle):
+                return None
+            if last is not None and candle['time'] < last:
+                # A late candle went into the middle of the buffer; the
+                # incremental state only moves forward, so replay the window.
+                self.indicators.rebuild(self.candles)
+                return None
+            return self.indicators.update(candle)
+
     def _on_message(self, ws, message):
         try:
+            t0 = time.perf_counter()
             msg = json.loads(message)
             k = msg.get("k", {})
             if not k:
                 return
-            candle = {
-                "time": int(k["t"])//1000,
-                "open": float(k["o"]),
-                "high": float(k["h"]),
-                "low": float(k["l"]),
-                "close": float(k["c"]),
-                "volume": float(k["v"]),
-                "is_closed": bool(k["x"])
-            }
-            with self._lock:
-                if self.candles and self.candles[-1]["time"] == candle["time"]:
-                    self.candles[-1] = candle
-                else:
-                    self.candles.append(candle)
+            candle = parse_kline(k)
+            _record_message(self.symbol.upper(), t0, candle, self._ingest, msg.get("E"))
         except Exception as e:
             print("on_message error:", e)
 
@@ -97,13 +143,121 @@ class KlineCollector:
         self.running = False
 
     def get_dataframe(self):
-        import pandas as pd
+        # The ring buffer is already deduplicated and time-ordered; this is a single copy.
+        with metrics.timer("get_dataframe", self.symbol.upper()), self._lock:
+            return self.candles.to_dataframe()
+
+    def get_indicator_dataframe(self):
+        # Indicators over every candle seen, kept up to date per message (see IncrementalIndicators).
+        with metrics.timer("get_indicator_dataframe", self.symbol.upper()), self._lock:
+            return self.indicators.get_dataframe()
+
+class MultiKlineCollector:
+    """Many symbols over one Binance combined-stream connection.
+
+    Each symbol keeps its own buffers in an unstarted ``KlineCollector``
+    (``collectors[SYMBOL]``); messages from the single socket are routed to
+    them by the ``s`` field, so one thread serves every symbol.
+    """
+
+    def __init__(self, symbols=("BTCUSDT",), interval="1m", maxlen=1200,
+                 ws_base=BINANCE_WS_BASE, rest_url=BINANCE_REST_KLINES, candle_store=None):
+        self.interval = interval
+        self.maxlen = maxlen
+        self.ws_base = ws_base
+        self.rest_url = rest_url
+        self.candle_store = candle_store
+        self.collectors = {}
+        self._ws = None
+        self._thread = None
+        self._req_id = 0
+        self.running = False
+        self._lock = threading.Lock()
+        self.add_symbols(symbols, seed=False)
+
+    def _stream_name(self, symbol):
+        return f"{symbol.lower()}@kline_{self.interval}"
+
+    @property
+    def url(self):
+        streams = "/".join(self._stream_name(s) for s in self.collectors)
+        return f"{self.ws_base}/stream?streams={streams}"
+
+    def add_symbols(self, symbols, seed=True):
+        new = []
         with self._lock:
-            df = pd.DataFrame(list(self.candles))
-        if df.empty:
-            return pd.DataFrame()
-        df = df.drop_duplicates(subset=['time']).sort_values('time')
-        df['dt'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('dt', inplace=True)
-        df = df[['open','high','low','close','volume','is_closed']].astype({'open':float,'high':float,'low':float,'close':float,'volume':float,'is_closed':bool})
-        return df
+            for sym in symbols:
+                sym = sym.upper()
+                if sym not in self.collectors:
+                    self.collectors[sym] = KlineCollector(sym, self.interval, self.maxlen,
+                                                          ws_base=self.ws_base, rest_url=self.rest_url,
+                                                          candle_store=self.candle_store)
+                    new.append(sym)
+        if new and seed:
+            for sym in new:
+                self.collectors[sym]._seed_from_rest(limit=self.maxlen)
+        if new and self.running and self._ws is not None:
+            self._req_id += 1
+            self._ws.send(json.dumps({"method": "SUBSCRIBE", "id": self._req_id,
+                                      "params": [self._stream_name(s) for s in new]}))
+        return new
+
+    def _on_message(self, ws, message):
+        try:
+            t0 = time.perf_counter()
+            msg = json.loads(message)
+            data = msg.get("data", msg)
+            k = data.get("k") if isinstance(data, dict) else None
+            if not k:
+                return
+            symbol = (data.get("s") or k.get("s", "")).upper()
+            coll = self.collectors.get(symbol)
+            if coll is not None:
+                _record_message(symbol, t0, parse_kline(k), coll._ingest, data.get("E"))
+        except Exception as e:
+            print("on_message error:", e)
+
+    def _on_error(self, ws, error):
+        print("WebSocket error:", error)
+
+    def _on_close(self, ws, close_status_code, close_msg):
+        print("WebSocket closed:", close_status_code, close_msg)
+        self.running = False
+
+    def _on_open(self, ws):
+        print("WebSocket opened for", len(self.collectors), "symbols", self.interval)
+
+    def _run(self):
+        self._ws = websocket.WebSocketApp(self.url,
+            on_open=self._on_open,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_close=self._on_close)
+        self._ws.run_forever()
+
+    def start(self, seed=True):
+        if self.running:
+            return
+        if seed:
+            for coll in self.collectors.values():
+                coll._seed_from_rest(limit=self.maxlen)
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        time.sleep(0.1)
+
+    def stop(self):
+        if self._ws:
+            try:
+                self._ws.close()
+            except:
+                pass
+        self.running = False
+
+    def get_dataframe(self, symbol):
+        coll = self.collectors.get(symbol.upper())
+        return coll.get_dataframe() if coll is not None else pd.DataFrame()
+
+    def get_indicator_dataframe(self, symbol):
+        coll = self.collectors.get(symbol.upper())
+        return coll.get_indicator_dataframe() if coll is not None else pd.DataFrame()
@@ -0,0 +1,72 @@
+"""Bytes and build time per refresh: full Plotly figure vs incremental chart payloads.
+
+For each range of 1m candles, "figure" is what the dashboard sent before
+(a make_subplots figure over the whole range, serialised every refresh);
+"initial" is the first /chart response (OHLC buckets capped at
+--max-points) and "delta" the steady-state poll after one candle update.
+Without plotly installed the figure column is the JSON of the same trace
+arrays, which understates the real figure (no layout or template).
+
+    python -m benchmarks.bench_chart [--ranges 300,1440,4320,10080,43200] [--max-points 1500]
+"""
+import argparse, json, time
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.services.chart_service import chart_payload
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.strategy import add_signals
+
+def _figure_json(plot_df):
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+    except ImportError:
+        x = plot_df.index.astype(str).tolist()
+        buys = plot_df[plot_df["Recommendation"] == "Buy"]
+        sells = plot_df[plot_df["Recommendation"] == "Sell"]
+        traces = [{"x": x, **{c: plot_df[c].tolist() for c in ("open", "high", "low", "close")}}]
+        traces += [{"x": x, "y": plot_df[c].tolist()} for c in ("ema_short", "ema_long", "rsi")]
+        traces += [{"x": buys.index.astype(str).tolist(), "y": (buys["high"] * 1.001).tolist()},
+                   {"x": sells.index.astype(str).tolist(), "y": (sells["low"] * 0.999).tolist()}]
+        return json.dumps(traces)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    fig.add_trace(go.Candlestick(x=plot_df.index, open=plot_df["open"], high=plot_df["high"],
+                                 low=plot_df["low"], close=plot_df["close"], name="Candles"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["ema_short"], mode="lines", name="EMA short"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["ema_long"], mode="lines", name="EMA long"), row=1, col=1)
+    buys = plot_df[plot_df["Recommendation"] == "Buy"]
+    sells = plot_df[plot_df["Recommendation"] == "Sell"]
+    fig.add_trace(go.Scatter(x=buys.index, y=buys["high"] * 1.001, mode="markers", name="Rule-Buy"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=sells.index, y=sells["low"] * 0.999, mode="markers", name="Rule-Sell"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["rsi"], mode="lines", name="RSI"), row=2, col=1)
+    fig.add_hline(y=70, line_dash="dash", row=2, col=1)
+    fig.add_hline(y=30, line_dash="dash", row=2, col=1)
+    fig.update_layout(height=750, xaxis_rangeslider_visible=False)
+    return fig.to_json()
+
+def _timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat * 1000
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--ranges', default='300,1440,4320,10080,43200')
+    ap.add_argument('--max-points', type=int, default=1500)
+    ap.add_argument('--repeat', type=int, default=5)
+    args = ap.parse_args()
+    for n in [int(v) for v in args.ranges.split(',')]:
+        ind = add_indicators(make_ohlcv(n + 60)).tail(n)
+        prev = ind.iloc[:-1]
+        figure, fig_ms = _timed(lambda: _figure_json(add_signals(ind)), args.repeat)
+        initial = json.dumps(chart_payload(prev, 60, max_points=args.max_points))
+        first = json.loads(initial)
+        delta, delta_ms = _timed(lambda: json.dumps(chart_payload(ind, 60, since=first["time"][-1],
+                                                                  bucket=first["bucket"])), args.repeat)
+        _, initial_ms = _timed(lambda: json.dumps(chart_payload(prev, 60, max_points=args.max_points)), args.repeat)
+        print(f"{n:>6} candles  figure {len(figure) / 1024:9.1f} KB {fig_ms:7.1f} ms/refresh | "
+              f"initial {len(initial) / 1024:7.1f} KB {initial_ms:6.1f} ms ({len(first['time'])} buckets of "
+              f"{first['bucket']}s) | delta {len(delta):5d} B {delta_ms:5.2f} ms/refresh")
+
+if __name__ == '__main__':
+    main()
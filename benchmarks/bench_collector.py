@@ -0,0 +1,82 @@
+"""Deque-of-dicts vs ring-buffer candle storage in KlineCollector.
+
+Feeds the same kline messages through both stores and reports ingest time
+per message, get_dataframe() latency and retained memory.
+
+    python -m benchmarks.bench_collector [--maxlen 2000] [--messages 20000]
+"""
+import argparse, json, time, tracemalloc
+from collections import deque
+import numpy as np
+import pandas as pd
+from CryptoTrader.trading.ring_buffer import CandleRingBuffer
+
+class DequeCandleStore:
+    # The storage KlineCollector used before the ring buffer.
+    def __init__(self, maxlen):
+        self.candles = deque(maxlen=maxlen)
+
+    def upsert(self, candle):
+        if self.candles and self.candles[-1]["time"] == candle["time"]:
+            self.candles[-1] = candle
+        else:
+            self.candles.append(candle)
+
+    def to_dataframe(self):
+        df = pd.DataFrame(list(self.candles))
+        if df.empty:
+            return pd.DataFrame()
+        df = df.drop_duplicates(subset=['time']).sort_values('time')
+        df['dt'] = pd.to_datetime(df['time'], unit='s')
+        df.set_index('dt', inplace=True)
+        return df[['open','high','low','close','volume','is_closed']].astype(
+            {'open':float,'high':float,'low':float,'close':float,'volume':float,'is_closed':bool})
+
+def make_messages(n, updates_per_candle=4, seed=0):
+    rng = np.random.default_rng(seed)
+    price = 30000.0
+    t0 = 1_700_000_000_000
+    out = []
+    for i in range(n):
+        candle_t = t0 + (i // updates_per_candle) * 60_000
+        price *= 1 + rng.normal(0, 0.0005)
+        closed = i % updates_per_candle == updates_per_candle - 1
+        out.append(json.dumps({"e": "kline", "k": {
+            "t": candle_t, "o": f"{price:.2f}", "h": f"{price * 1.001:.2f}", "l": f"{price * 0.999:.2f}",
+            "c": f"{price:.2f}", "v": f"{rng.gamma(2, 5):.4f}", "x": closed}}))
+    return out
+
+def parse(message):
+    k = json.loads(message)["k"]
+    return {"time": int(k["t"]) // 1000, "open": float(k["o"]), "high": float(k["h"]),
+            "low": float(k["l"]), "close": float(k["c"]), "volume": float(k["v"]), "is_closed": bool(k["x"])}
+
+def run(make_store, messages, reads):
+    tracemalloc.start()
+    store = make_store()
+    t0 = time.perf_counter()
+    for m in messages:
+        store.upsert(parse(m))
+    ingest = time.perf_counter() - t0
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    for _ in range(reads):
+        df = store.to_dataframe()
+    read = (time.perf_counter() - t0) / reads
+    return ingest / len(messages), read, retained, df
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--maxlen', type=int, default=2000)
+    ap.add_argument('--messages', type=int, default=20000)
+    ap.add_argument('--reads', type=int, default=50)
+    args = ap.parse_args()
+    messages = make_messages(args.messages)
+    for name, make_store in [('deque', DequeCandleStore), ('ring', CandleRingBuffer)]:
+        per_msg, read, retained, df = run(lambda: make_store(args.maxlen), messages, args.reads)
+        print(f"{name:>6}: ingest {per_msg * 1e6:7.2f}us/msg  get_dataframe {read * 1e3:7.3f}ms  "
+              f"memory {retained / 1024:8.1f}KiB  rows {len(df)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Dashboard CPU vs viewer count: per-session recompute vs the shared engine.
+
+Streams live candles from the fake exchange into a LiveEngine and
+simulates N viewers rerunning once per --refresh seconds. In ``session``
+mode every rerun redoes what the dashboard used to (signals and the
+200-candle backtest on the collector's frame); in ``engine`` mode a rerun
+only reads the latest snapshot. Reports process CPU use and reruns
+served per second. Chart building is left out of both.
+
+    python -m benchmarks.bench_engine [--viewers 1,10,50,200] [--symbols 3] [--seconds 5]
+"""
+import argparse, threading, time
+from benchmarks.fake_exchange import FakeExchange
+from CryptoTrader.services.live_engine import LiveEngine
+from CryptoTrader.trading.backtester import backtest
+from CryptoTrader.trading.strategy import add_signals
+
+def _session_rerun(engine, symbol):
+    df_sig = add_signals(engine.streams["1m"].get_indicator_dataframe(symbol))
+    last = df_sig.iloc[-1]
+    backtest(df_sig.tail(200))
+    return last
+
+def _engine_rerun(engine, symbol):
+    snap = engine.snapshot(symbol)
+    return snap["last"], snap["backtest"]["final_value"], snap["frame"]
+
+def _measure(engine, symbols, viewers, rerun, seconds, refresh):
+    stop = threading.Event()
+    served = [0]
+
+    def viewer_loop():
+        # All viewers from one thread, like reruns queued on a busy server.
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            for i in range(viewers):
+                rerun(engine, symbols[i % len(symbols)])
+                served[0] += 1
+            stop.wait(max(0.0, refresh - (time.perf_counter() - t0)))
+
+    thread = threading.Thread(target=viewer_loop, daemon=True)
+    cpu0, wall0, computes0 = time.process_time(), time.perf_counter(), engine.computes
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    wall = time.perf_counter() - wall0
+    return (time.process_time() - cpu0) / wall, served[0] / wall, (engine.computes - computes0) / wall
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--viewers', default='1,10,50,200')
+    ap.add_argument('--symbols', type=int, default=3)
+    ap.add_argument('--rate', type=float, default=4.0, help='kline updates per second per symbol')
+    ap.add_argument('--seconds', type=float, default=5.0)
+    ap.add_argument('--refresh', type=float, default=1.0)
+    args = ap.parse_args()
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    with FakeExchange(messages_per_stream=10 ** 9, rate=args.rate, close_when_done=False) as ex:
+        engine = LiveEngine(ws_base=ex.ws_base, rest_url=ex.rest_url)
+        engine.start(symbols)
+        while any(engine.snapshot(s) is None for s in symbols):
+            time.sleep(0.1)
+        for n in [int(v) for v in args.viewers.split(',')]:
+            for mode, rerun in (('session', _session_rerun), ('engine', _engine_rerun)):
+                cpu, reruns, computes = _measure(engine, symbols, n, rerun, args.seconds, args.refresh)
+                print(f"{n:>5} viewers {mode:>8}: CPU {cpu * 100:6.1f}%  reruns/s {reruns:9.1f} "
+                      f"(wanted {n / args.refresh:.0f})  snapshot computes/s {computes:5.1f}")
+        engine.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Pickled sklearn forests vs compact array exports.
+
+Trains one forest, publishes it for ``--symbols`` symbols and compares
+cold load time, resident size and single-row latency, checking that both
+give identical probabilities.
+
+    python -m benchmarks.bench_inference [--symbols 20] [--trees 200]
+"""
+import argparse, tempfile, time
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from CryptoTrader.ml.compact_forest import CompactForest
+from CryptoTrader.ml.model_registry import ModelRegistry
+from CryptoTrader.ml.train_and_predict_auto import FEATURE_COLS, build_features
+from benchmarks.synthetic import make_ohlcv
+
+def _best(fn, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--symbols', type=int, default=20)
+    ap.add_argument('--trees', type=int, default=200)
+    args = ap.parse_args()
+    X, y, _ = build_features(make_ohlcv(1600))
+    clf = RandomForestClassifier(n_estimators=args.trees, n_jobs=-1, random_state=42).fit(X, y)
+    row = X[FEATURE_COLS].tail(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(tmp)
+        symbols = [f"SYM{i}" for i in range(args.symbols)]
+        for sym in symbols:
+            registry.publish(sym, clf)
+        t0 = time.perf_counter()
+        pickled = [joblib.load(registry.current_path(s)) for s in symbols]
+        t_pickle = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        compact = [CompactForest.load(registry.compact_path(s)) for s in symbols]
+        t_compact = time.perf_counter() - t0
+        assert np.array_equal(pickled[0].predict_proba(X), compact[0].predict_proba(X))
+        size_pickle = sum(e.tree_.__getstate__()['nodes'].nbytes + e.tree_.value.nbytes
+                          for e in pickled[0].estimators_)
+        print(f"cold load of {args.symbols} models: pickle {t_pickle * 1e3:8.1f} ms  compact {t_compact * 1e3:8.1f} ms")
+        print(f"tree arrays per model: sklearn {size_pickle / 2**20:6.2f} MiB  "
+              f"compact {compact[0].nbytes / 2**20:6.2f} MiB (memory-mapped, shared)")
+        t_sk = _best(lambda: pickled[0].predict_proba(row))
+        values = row.to_numpy()
+        t_cf = _best(lambda: compact[0].predict_proba(values), repeat=200)
+        print(f"single row predict_proba: sklearn {t_sk * 1e6:9.1f} us  compact {t_cf * 1e6:9.1f} us")
+
+if __name__ == '__main__':
+    main()
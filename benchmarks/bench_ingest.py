@@ -0,0 +1,44 @@
+"""JSON vs columnar (npz / Arrow IPC) request bodies for the API.
+
+Reports payload size and the time to get from request bytes to a
+DataFrame, the way each endpoint does it.
+
+    python -m benchmarks.bench_ingest [--sizes 1000,10000,100000]
+"""
+import argparse, json, time
+import pandas as pd
+from CryptoTrader.api import PredictionRequest
+from CryptoTrader.services.columnar import ARROW_MEDIA_TYPE, NPZ_MEDIA_TYPE, decode_frame, encode_frame
+from benchmarks.synthetic import make_ohlcv
+
+def _best(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _decode_json(body):
+    return pd.DataFrame(PredictionRequest(**json.loads(body)).data)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='1000,10000,100000')
+    args = ap.parse_args()
+    for n in [int(s) for s in args.sizes.split(',')]:
+        df = make_ohlcv(n).reset_index(drop=True)
+        bodies = {'json': json.dumps({'symbol': 'BTCUSDT', 'data': df.to_dict(orient='list')}).encode(),
+                  'npz': encode_frame(df, NPZ_MEDIA_TYPE)}
+        decoders = {'json': _decode_json, 'npz': lambda b: decode_frame(b, NPZ_MEDIA_TYPE)}
+        try:
+            bodies['arrow'] = encode_frame(df, ARROW_MEDIA_TYPE)
+            decoders['arrow'] = lambda b: decode_frame(b, ARROW_MEDIA_TYPE)
+        except ValueError:
+            pass  # pyarrow not installed
+        for name, body in bodies.items():
+            t = _best(lambda: decoders[name](body))
+            print(f"{n:>8} rows  {name:>5}: {len(body) / 1024:10.1f} KiB  decode {t * 1e3:9.3f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Cost of the always-on instrumentation.
+
+Times a bare histogram observation, a @timed call around a no-op, and the
+instrumented hot paths (kline message handling, add_indicators,
+add_signals) with metrics enabled and disabled.
+
+    python -m benchmarks.bench_metrics [--calls 200000]
+"""
+import argparse, json, time
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.metrics import metrics, timed
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.strategy import add_signals
+from CryptoTrader.trading.websocket_stream import KlineCollector
+
+def _per_call(fn, calls):
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - t0) / calls * 1e6
+
+def _messages(n):
+    start = 1_700_000_000_000
+    return [json.dumps({"e": "kline", "E": start + i * 15_000, "s": "BTCUSDT",
+                        "k": {"t": start + (i // 4) * 60_000, "o": "1", "h": "2", "l": "0.5",
+                              "c": str(1 + i % 7 / 10), "v": "3", "x": i % 4 == 3}})
+            for i in range(n)]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--calls', type=int, default=200_000)
+    args = ap.parse_args()
+
+    noop = timed("noop")(lambda: None)
+    print(f"histogram observe      {_per_call(lambda: metrics.observe('bench', 0.001, stage='x'), args.calls):6.2f} us")
+    print(f"@timed no-op call      {_per_call(noop, args.calls):6.2f} us")
+    print(f"bare no-op call        {_per_call(lambda: None, args.calls):6.2f} us")
+
+    df = make_ohlcv(1200)
+    ind = add_indicators(df)
+    messages = _messages(20_000)
+    for enabled in (False, True):
+        metrics.enabled = enabled
+        coll = KlineCollector("BTCUSDT", maxlen=1200)
+        t0 = time.perf_counter()
+        for m in messages:
+            coll._on_message(None, m)
+        msg_us = (time.perf_counter() - t0) / len(messages) * 1e6
+        ind_us = _per_call(lambda: add_indicators(df), 50)
+        sig_us = _per_call(lambda: add_signals(ind), 200)
+        print(f"metrics {'on ' if enabled else 'off'}: message {msg_us:6.2f} us  add_indicators {ind_us:8.1f} us  "
+              f"add_signals {sig_us:7.1f} us")
+    metrics.enabled = True
+
+if __name__ == '__main__':
+    main()
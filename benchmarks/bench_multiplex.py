@@ -0,0 +1,100 @@
+"""Per-symbol KlineCollector sockets vs one MultiKlineCollector connection.
+
+Streams the same number of kline updates per symbol from a local fake
+exchange and reports messages/sec and the threads each design needs.
+
+    python -m benchmarks.bench_multiplex [--symbols 50] [--messages 400]
+"""
+import argparse, threading, time
+from benchmarks.fake_exchange import FakeExchange
+from CryptoTrader.trading.websocket_stream import KlineCollector, MultiKlineCollector
+
+def _count_ingest(collectors, counter, lock):
+    for coll in collectors:
+        ingest = coll._ingest
+        def counted(candle, ingest=ingest):
+            ingest(candle)
+            with lock:
+                counter[0] += 1
+        coll._ingest = counted
+
+class _ThreadSampler:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.001)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def _wait(counter, expected, timeout):
+    deadline = time.perf_counter() + timeout
+    while counter[0] < expected and time.perf_counter() < deadline:
+        time.sleep(0.005)
+
+def run_per_symbol(ex, symbols, maxlen, expected, timeout):
+    colls = [KlineCollector(s, maxlen=maxlen, ws_base=ex.ws_base, rest_url=ex.rest_url) for s in symbols]
+    counter, lock = [0], threading.Lock()
+    _count_ingest(colls, counter, lock)
+    for c in colls:
+        c._seed_from_rest(limit=maxlen)
+    base = counter[0]
+    threads_before = threading.active_count() + 1
+    with _ThreadSampler() as sampler:
+        t0 = time.perf_counter()
+        for c in colls:
+            c._seed_from_rest = lambda limit: None
+            c.start()
+        _wait(counter, base + expected, timeout)
+        elapsed = time.perf_counter() - t0
+    for c in colls:
+        c.stop()
+    return counter[0] - base, elapsed, sampler.peak - threads_before
+
+def run_multiplexed(ex, symbols, maxlen, expected, timeout):
+    multi = MultiKlineCollector(symbols, maxlen=maxlen, ws_base=ex.ws_base, rest_url=ex.rest_url)
+    counter, lock = [0], threading.Lock()
+    _count_ingest(multi.collectors.values(), counter, lock)
+    for c in multi.collectors.values():
+        c._seed_from_rest(limit=maxlen)
+    base = counter[0]
+    threads_before = threading.active_count() + 1
+    with _ThreadSampler() as sampler:
+        t0 = time.perf_counter()
+        multi.start(seed=False)
+        _wait(counter, base + expected, timeout)
+        elapsed = time.perf_counter() - t0
+    multi.stop()
+    return counter[0] - base, elapsed, sampler.peak - threads_before
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--symbols', type=int, default=50)
+    ap.add_argument('--messages', type=int, default=400, help='updates per symbol')
+    ap.add_argument('--maxlen', type=int, default=500)
+    ap.add_argument('--rate', type=float, default=0.0,
+                    help='updates/sec per stream; set e.g. 100 to keep sockets open concurrently')
+    ap.add_argument('--timeout', type=float, default=120.0)
+    args = ap.parse_args()
+    symbols = [f"SYM{i:03d}USDT" for i in range(args.symbols)]
+    expected = args.symbols * args.messages
+    for name, runner in [('per-symbol', run_per_symbol), ('multiplexed', run_multiplexed)]:
+        with FakeExchange(messages_per_stream=args.messages, rate=args.rate) as ex:
+            got, elapsed, client_threads = runner(ex, symbols, args.maxlen, expected, args.timeout)
+        # Server-side handler threads live in this process too; the client
+        # cost is one websocket thread per connection.
+        print(f"{name:>12}: {got}/{expected} msgs in {elapsed:6.2f}s  {got / elapsed:9.0f} msg/s  "
+              f"connections {ex.connections}  extra threads (client+server) {client_threads}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Full refits vs warm-start (rolling forest) retrains.
+
+Replays synthetic candles into a local candle store and retrains every
+``--every`` candles, the way the dashboard does. Each model is scored on
+the candles that arrive before the next retrain.
+
+    python -m benchmarks.bench_retrain [--retrains 20] [--every 30] [--window 1500]
+"""
+import argparse, tempfile, time
+import numpy as np
+from CryptoTrader.ml.train_and_predict_auto import FEATURE_COLS, build_features, train_model_for_symbol
+from CryptoTrader.ml.model_registry import ModelRegistry
+from CryptoTrader.trading.candle_store import CandleStore
+from benchmarks.synthetic import make_ohlcv
+
+class _ReplayStore(CandleStore):
+    # Candles are written by the benchmark; no exchange to sync from.
+    def sync(self, symbol, interval, initial_limit=1500, max_pages=None):
+        return 0
+
+def _columns(df):
+    cols = {f: df[f].to_numpy() for f in ('open', 'high', 'low', 'close', 'volume')}
+    cols['time'] = df.index.values.astype('datetime64[s]').astype('int64')
+    return cols
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--retrains', type=int, default=20)
+    ap.add_argument('--every', type=int, default=30)
+    ap.add_argument('--window', type=int, default=1500)
+    args = ap.parse_args()
+    total = args.window + (args.retrains + 1) * args.every
+    candles = make_ohlcv(total)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _ReplayStore(f"{tmp}/candles")
+        store.write('BTCUSDT', '1m', _columns(candles.iloc[:args.window]))
+        dirs = {'full': f"{tmp}/full", 'incremental': f"{tmp}/incremental"}
+        for d in dirs.values():
+            train_model_for_symbol('BTCUSDT', '1m', d, store=store)
+        times = {m: [] for m in dirs}
+        hits = {m: [] for m in dirs}
+        for r in range(args.retrains):
+            end = args.window + (r + 1) * args.every
+            store.write('BTCUSDT', '1m', _columns(candles.iloc[end - args.every:end]))
+            for mode, d in dirs.items():
+                t0 = time.perf_counter()
+                path, err = train_model_for_symbol('BTCUSDT', '1m', d, store=store,
+                                                   incremental=mode == 'incremental')
+                times[mode].append(time.perf_counter() - t0)
+                assert err is None, err
+            # Score on the next batch of candles (with enough history for the features).
+            X, y, _ = build_features(candles.iloc[end - 200:end + args.every + 1])
+            X, y = X.iloc[-args.every:], y.iloc[-args.every:]
+            for mode, d in dirs.items():
+                hits[mode].append((ModelRegistry(d).load('BTCUSDT').predict(X[FEATURE_COLS]) == y).mean())
+        for mode in dirs:
+            t = np.array(times[mode])
+            print(f"{mode:>11}: retrain mean {t.mean() * 1e3:8.1f} ms  p95 {np.percentile(t, 95) * 1e3:8.1f} ms"
+                  f"  next-{args.every} accuracy {np.mean(hits[mode]):.3f}")
+        print(f"speedup x{np.mean(times['full']) / np.mean(times['incremental']):.1f}")
+
+if __name__ == '__main__':
+    main()
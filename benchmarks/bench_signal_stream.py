@@ -0,0 +1,106 @@
+"""Load test for the /ws/signals push stream.
+
+Starts the fake exchange and the API (uvicorn, separate process) with its
+collectors pointed at the fake, then connects a growing number of
+websocket subscribers. For each stage it reports delivery latency (fake
+exchange send time to subscriber receive) and the share of rows that
+reached subscribers. The first stage over --max-p99-ms or under 99%
+delivery is reported as saturation. The subscribers run in this process,
+so they compete with the fake exchange for one core.
+
+    python -m benchmarks.bench_signal_stream [--subscribers 1,10,100,500] [--rate 20] [--symbols BTCUSDT]
+"""
+import argparse, asyncio, json, os, socket, subprocess, sys, time
+import numpy as np
+import requests
+import websockets
+from benchmarks.fake_exchange import FakeExchange
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_api(port, ex, symbols):
+    env = dict(os.environ, STREAM_SYMBOLS=symbols, STREAM_WS_BASE=ex.ws_base, STREAM_REST_URL=ex.rest_url)
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "CryptoTrader.api:app", "--port", str(port),
+                             "--log-level", "warning"], env=env)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("API did not start")
+
+async def _client(url, duration, ready, out):
+    async with websockets.connect(url, max_queue=None) as ws:
+        ready.append(1)
+        latencies, seqs = [], []
+        end, live = None, False
+        while True:
+            timeout = 5.0 if end is None else max(0.0, end - time.time())
+            try:
+                message = await asyncio.wait_for(ws.recv(), timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            row = json.loads(message)
+            if row["type"] == "snapshot_end":
+                live = True
+                continue
+            if not live:
+                continue  # recent rows replayed on subscribe
+            if end is None:
+                end = time.time() + duration
+            latencies.append(time.time() * 1000 - row["event_time"])
+            seqs.append(row["seq"])
+        out.append((latencies, seqs))
+
+async def _stage(url, n, duration):
+    ready, out = [], []
+    tasks = []
+    for i in range(n):
+        tasks.append(asyncio.create_task(_client(url, duration, ready, out)))
+        if i % 50 == 49:
+            await asyncio.sleep(0.05)  # stagger the handshakes
+    await asyncio.gather(*tasks, return_exceptions=True)
+    latencies = np.concatenate([np.asarray(l) for l, _ in out if l]) if out else np.zeros(0)
+    expected = sum(s[-1] - s[0] + 1 for _, s in out if s)
+    received = sum(len(s) for _, s in out)
+    return len(out), latencies, received / expected if expected else 0.0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--subscribers', default='1,10,100,500')
+    ap.add_argument('--symbols', default='BTCUSDT')
+    ap.add_argument('--rate', type=float, default=20.0, help='fake exchange updates per second per stream')
+    ap.add_argument('--duration', type=float, default=5.0)
+    ap.add_argument('--max-p99-ms', type=float, default=250.0)
+    args = ap.parse_args()
+    with FakeExchange(messages_per_stream=10 ** 9, rate=args.rate, close_when_done=False) as ex:
+        port = _free_port()
+        proc = _start_api(port, ex, args.symbols)
+        url = f"ws://127.0.0.1:{port}/ws/signals?symbols={args.symbols}"
+        saturated = None
+        try:
+            for n in [int(v) for v in args.subscribers.split(',')]:
+                connected, lat, delivered = asyncio.run(_stage(url, n, args.duration))
+                if len(lat) == 0:
+                    print(f"{n:>6} subscribers: no rows received ({connected} connected)")
+                    saturated = saturated or n
+                    continue
+                p50, p99 = np.percentile(lat, [50, 99])
+                print(f"{n:>6} subscribers ({connected} connected): latency p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  "
+                      f"delivered {delivered * 100:6.2f}%  rows {len(lat):,}")
+                if saturated is None and (p99 > args.max_p99_ms or delivered < 0.99):
+                    saturated = n
+            print(requests.get(f"http://127.0.0.1:{port}/signals/stream/stats", timeout=5).json())
+            print(f"saturation: {saturated if saturated else 'not reached'}")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Row-by-row vs vectorized add_signals (parity is covered by tests/test_strategy.py).
+
+    python -m benchmarks.bench_signals [--sizes 1000,100000,1000000]
+"""
+import argparse, time
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.strategy import add_signals, add_signals_rowwise
+from benchmarks.synthetic import make_ohlcv
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', default='1000,100000,1000000')
+    args = ap.parse_args()
+    for n in [int(s) for s in args.sizes.split(',')]:
+        df = add_indicators(make_ohlcv(n))
+        t_vec, vec = _time(add_signals, df)
+        t_row, row = _time(add_signals_rowwise, df)
+        print(f"{n:>9} rows  rowwise {t_row:8.3f}s  vectorized {t_vec:8.4f}s  speedup x{t_row / t_vec:,.0f}")
+
+if __name__ == '__main__':
+    main()
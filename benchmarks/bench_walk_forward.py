@@ -0,0 +1,28 @@
+"""Walk-forward evaluation of the ML model over synthetic history.
+
+    python -m benchmarks.bench_walk_forward [--rows 30000] [--test-size 100] [--trees 200] [--workers N]
+"""
+import argparse, time
+from CryptoTrader.ml.walk_forward import summarize_folds, walk_forward
+from benchmarks.synthetic import make_ohlcv
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--rows', type=int, default=30000)
+    ap.add_argument('--train-size', type=int, default=1500)
+    ap.add_argument('--test-size', type=int, default=100)
+    ap.add_argument('--trees', type=int, default=200)
+    ap.add_argument('--workers', type=int, default=None)
+    args = ap.parse_args()
+    df = make_ohlcv(args.rows)
+    t0 = time.perf_counter()
+    folds = walk_forward(df, train_size=args.train_size, test_size=args.test_size,
+                         n_estimators=args.trees, max_workers=args.workers)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(folds)} folds over {args.rows} rows in {elapsed:.1f}s "
+          f"({elapsed / max(len(folds), 1) * 1e3:.0f} ms/fold)")
+    for k, v in summarize_folds(folds).items():
+        print(f"  {k}: {v}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""Local stand-in for the Binance kline REST and websocket endpoints.
+
+One port serves both ``GET /api/v3/klines`` and websocket upgrades on
+``/ws/<stream>`` and ``/stream?streams=a/b/...``. Prices are a pure function
+of (symbol, candle open time), so REST history and streamed candles agree
+and gaps can be checked exactly.
+
+    with FakeExchange(messages_per_stream=1000) as ex:
+        coll = KlineCollector("BTCUSDT", ws_base=ex.ws_base, rest_url=ex.rest_url)
+"""
+import base64, hashlib, json, math, socket, socketserver, struct, threading, time, zlib
+from urllib.parse import parse_qs, urlparse
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+INTERVAL_MS = {"1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000}
+
+def kline_values(symbol, open_ms):
+    seed = zlib.crc32(symbol.upper().encode())
+    minute = open_ms // 60_000
+    base = 100.0 + seed % 50_000
+    wobble = (zlib.crc32(f"{seed}:{minute}".encode()) % 1000) / 1000.0 - 0.5
+    close = base * (1 + 0.02 * math.sin(minute / 30.0) + 0.002 * wobble)
+    open_ = base * (1 + 0.02 * math.sin((minute - 1) / 30.0))
+    high = max(open_, close) * 1.001
+    low = min(open_, close) * 0.999
+    volume = 1.0 + (seed + minute) % 97
+    return open_, high, low, close, volume
+
+def rest_row(symbol, open_ms, interval_ms):
+    o, h, l, c, v = kline_values(symbol, open_ms)
+    return [open_ms, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}",
+            open_ms + interval_ms - 1, "0", 0, "0", "0", "0"]
+
+def kline_event(symbol, interval, open_ms, interval_ms, closed, event_ms=None):
+    o, h, l, c, v = kline_values(symbol, open_ms)
+    return {"e": "kline", "E": event_ms or int(time.time() * 1000), "s": symbol.upper(),
+            "k": {"t": open_ms, "T": open_ms + interval_ms - 1, "s": symbol.upper(), "i": interval,
+                  "o": f"{o:.8f}", "h": f"{h:.8f}", "l": f"{l:.8f}", "c": f"{c:.8f}",
+                  "v": f"{v:.8f}", "x": closed}}
+
+def _encode_frame(payload, opcode=0x1):
+    header = bytes([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header += bytes([n])
+    elif n < 1 << 16:
+        header += bytes([126]) + struct.pack(">H", n)
+    else:
+        header += bytes([127]) + struct.pack(">Q", n)
+    return header + payload
+
+def _read_exact(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("client went away")
+        buf += chunk
+    return buf
+
+def _read_frame(sock):
+    b1, b2 = _read_exact(sock, 2)
+    opcode, n = b1 & 0x0F, b2 & 0x7F
+    if n == 126:
+        n = struct.unpack(">H", _read_exact(sock, 2))[0]
+    elif n == 127:
+        n = struct.unpack(">Q", _read_exact(sock, 8))[0]
+    mask = _read_exact(sock, 4) if b2 & 0x80 else b"\0\0\0\0"
+    data = bytes(b ^ mask[i % 4] for i, b in enumerate(_read_exact(sock, n)))
+    return opcode, data
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        ex = self.server.exchange
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        head = request.split(b"\r\n\r\n", 1)[0].decode()
+        lines = head.split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+        if headers.get("upgrade", "").lower() == "websocket":
+            self._websocket(ex, path, headers)
+        else:
+            self._rest(ex, path)
+
+    def _rest(self, ex, path):
+        url = urlparse(path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path != "/api/v3/klines":
+            body, status = b'{"msg": "not found"}', "404 Not Found"
+        elif ex.listed is not None and q.get("symbol", "").upper() not in ex.listed:
+            body, status = b'{"code": -1121, "msg": "Invalid symbol."}', "400 Bad Request"
+        else:
+            ex.rest_calls.append(q)
+            body, status = json.dumps(ex.klines(q["symbol"], q.get("interval", "1m"),
+                                                start_ms=int(q["startTime"]) if "startTime" in q else None,
+                                                end_ms=int(q["endTime"]) if "endTime" in q else None,
+                                                limit=int(q.get("limit", 500)))).encode(), "200 OK"
+        self.request.sendall(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+
+    def _websocket(self, ex, path, headers):
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest()).decode()
+        self.request.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                              f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        url = urlparse(path)
+        combined = url.path == "/stream"
+        if combined:
+            streams = parse_qs(url.query).get("streams", [""])[0].split("/")
+        else:
+            streams = [url.path.rsplit("/", 1)[-1]]
+        streams = [s for s in streams if s]
+        lock = threading.Lock()
+        send_lock = self._send_lock = threading.Lock()
+        closed = threading.Event()
+
+        def reader():
+            try:
+                while not closed.is_set():
+                    opcode, data = _read_frame(self.request)
+                    if opcode == 0x8:
+                        with send_lock:
+                            self.request.sendall(_encode_frame(data[:2], opcode=0x8))
+                        break
+                    if opcode == 0x1:
+                        msg = json.loads(data)
+                        if msg.get("method") == "SUBSCRIBE":
+                            with lock:
+                                streams.extend(s for s in msg.get("params", []) if s not in streams)
+                            self._send(json.dumps({"result": None, "id": msg.get("id")}))
+            except (ConnectionError, OSError, ValueError):
+                pass
+            closed.set()
+
+        threading.Thread(target=reader, daemon=True).start()
+        ex.connections += 1
+        try:
+            for step in ex.schedule():
+                if closed.is_set():
+                    return
+                with lock:
+                    current = list(streams)
+                for stream in current:
+                    symbol, kind = stream.split("@", 1)
+                    interval = kind.split("_", 1)[1]
+                    event = kline_event(symbol, interval, *step(INTERVAL_MS[interval]))
+                    payload = {"stream": stream, "data": event} if combined else event
+                    self._send(json.dumps(payload))
+                if ex.rate:
+                    time.sleep(1.0 / ex.rate)
+            if ex.close_when_done:
+                with send_lock:
+                    self.request.sendall(_encode_frame(b"\x03\xe8", opcode=0x8))
+            else:
+                closed.wait()
+        except OSError:
+            pass
+        finally:
+            closed.set()
+
+    def _send(self, text):
+        with self._send_lock:
+            self.request.sendall(_encode_frame(text.encode()))
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class FakeExchange:
+    """Serve deterministic klines on 127.0.0.1.
+
+    ``messages_per_stream`` updates are pushed for every subscribed stream,
+    ``updates_per_candle`` per candle (the last one closed), ``rate`` steps
+    per second (0 = as fast as possible). Each new connection resumes at the
+    exchange clock plus ``gap_candles_on_reconnect``, which lets reconnect
+    tests see a hole in the stream. With ``listed``, REST answers 400
+    "Invalid symbol." for any other symbol, as Binance does.
+    """
+
+    def __init__(self, messages_per_stream=100, updates_per_candle=4, rate=0.0,
+                 start_ms=1_700_000_040_000, close_when_done=True, gap_candles_on_reconnect=0, listed=None):
+        self.messages_per_stream = messages_per_stream
+        self.updates_per_candle = updates_per_candle
+        self.rate = rate
+        self.close_when_done = close_when_done
+        self.gap_candles_on_reconnect = gap_candles_on_reconnect
+        self.listed = {s.upper() for s in listed} if listed is not None else None
+        self.candle_index = 0
+        self.start_ms = start_ms - start_ms % 60_000
+        self.connections = 0
+        self.rest_calls = []
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.exchange = self
+        self.port = self._server.server_address[1]
+        self.ws_base = f"ws://127.0.0.1:{self.port}"
+        self.rest_url = f"http://127.0.0.1:{self.port}/api/v3/klines"
+        self._thread = None
+
+    def schedule(self):
+        if self.connections > 1:
+            # Candles in the gap closed while nobody was connected.
+            self.candle_index += self.gap_candles_on_reconnect
+        idx = self.candle_index
+        for i in range(self.messages_per_stream):
+            closed = i % self.updates_per_candle == self.updates_per_candle - 1
+            yield lambda interval_ms, idx=idx, closed=closed: (self.start_ms + idx * interval_ms, interval_ms, closed)
+            if closed:
+                idx += 1
+                self.candle_index = max(self.candle_index, idx)
+
+    def klines(self, symbol, interval="1m", start_ms=None, end_ms=None, limit=500):
+        step = INTERVAL_MS[interval]
+        # Only candles that closed before the current stream position exist.
+        last_closed = self.start_ms + (self.candle_index - 1) * step
+        if end_ms is not None:
+            last_closed = min(last_closed, end_ms - (end_ms - self.start_ms) % step)
+        limit = min(int(limit), 1000)
+        if start_ms is not None:
+            first = start_ms + (-(start_ms - self.start_ms)) % step
+            times = range(first, last_closed + 1, step)[:limit]
+        else:
+            times = range(last_closed - (limit - 1) * step, last_closed + 1, step)
+        return [rest_row(symbol, t, step) for t in times]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
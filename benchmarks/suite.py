@@ -0,0 +1,338 @@
+"""Benchmark suite for the trading hot paths, with JSON results and baseline checks.
+
+Runs every case over synthetic data (fixed seeds) for the sizes of a
+profile, times each one with a warm-up call and repeated runs (garbage
+collection paused), and writes the results plus machine and library
+versions as JSON. With --baseline each case is compared to a saved run
+and the process exits with status 1 if any got slower than --threshold.
+
+    python -m benchmarks.suite [--profile quick|default|full] [--cases indicators,backtest]
+                               [--out results.json] [--baseline benchmarks/baseline.json]
+                               [--save-baseline benchmarks/baseline.json]
+    python -m benchmarks.suite compare NEW.json BASELINE.json [--threshold 0.15]
+
+Profiles: quick (1k-10k bars, 1-10 symbols), default (up to 1M bars and 50
+symbols), full (up to 10M bars and 500 symbols; needs several GB of RAM).
+"""
+import argparse, gc, json, os, platform, statistics, subprocess, sys, tempfile, time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import kline_messages, make_ohlcv, make_universe
+
+PROFILES = {
+    'quick': {'bars': [1_000, 10_000], 'symbols': [1, 10]},
+    'default': {'bars': [1_000, 100_000, 1_000_000], 'symbols': [1, 50]},
+    'full': {'bars': [1_000, 100_000, 1_000_000, 10_000_000], 'symbols': [1, 50, 500]},
+}
+# Bars per symbol for multi-symbol cases, capped so symbols x bars stays near 5M rows.
+MULTI_SYMBOL_ROWS = 5_000_000
+MULTI_SYMBOL_BARS = 10_000
+
+CASES = {}
+
+def case(name, over):
+    """Register ``fn(**params) -> callable``; ``over`` is 'bars', 'symbols' or None.
+
+    Setup happens in fn; only the returned callable is timed. It may
+    return a dict of extra numbers (e.g. a rate) to store with the result.
+    """
+    def register(fn):
+        CASES[name] = (fn, over)
+        return fn
+    return register
+
+def _signal_frame(df):
+    from CryptoTrader.trading.indicators import add_indicators
+    from CryptoTrader.trading.strategy import add_signals
+    return add_signals(add_indicators(df))
+
+@case('indicators', 'bars')
+def _indicators(bars):
+    from CryptoTrader.trading.indicators import add_indicators
+    df = make_ohlcv(bars)
+    return lambda: add_indicators(df)
+
+@case('signals', 'bars')
+def _signals(bars):
+    from CryptoTrader.trading.indicators import add_indicators
+    from CryptoTrader.trading.strategy import add_signals
+    ind = add_indicators(make_ohlcv(bars))
+    return lambda: add_signals(ind)
+
+@case('strategies', 'bars')
+def _strategies(bars):
+    from CryptoTrader.trading.strategies import run_strategies
+    df = make_ohlcv(bars)
+    return lambda: run_strategies(df)
+
+@case('backtest', 'bars')
+def _backtest(bars):
+    from CryptoTrader.trading.backtester import backtest
+    df = _signal_frame(make_ohlcv(bars))
+    return lambda: backtest(df)
+
+@case('features', 'bars')
+def _features(bars):
+    from CryptoTrader.ml.train_and_predict_auto import build_features
+    df = make_ohlcv(bars)
+    return lambda: build_features(df)
+
+@case('collector_ingest', 'bars')
+def _collector_ingest(bars):
+    # One message per bar, capped: the rate is what matters here.
+    from CryptoTrader.trading.websocket_stream import KlineCollector
+    messages = kline_messages("BTCUSDT", min(bars, 200_000))
+
+    def run():
+        coll = KlineCollector("BTCUSDT", maxlen=1200)
+        for m in messages:
+            coll._on_message(None, m)
+        return {'messages': len(messages)}
+    return run
+
+@case('portfolio', 'symbols')
+def _portfolio(symbols):
+    from CryptoTrader.trading.backtester import signal_codes
+    from CryptoTrader.trading.portfolio import portfolio_backtest_arrays
+    bars = min(MULTI_SYMBOL_BARS * 10, MULTI_SYMBOL_ROWS // symbols)
+    times, close, codes = {}, {}, {}
+    for sym, df in make_universe(symbols, bars).items():
+        sig = _signal_frame(df)
+        times[sym] = sig.index.values.astype('datetime64[s]').astype('int64')
+        close[sym] = sig['close'].to_numpy(dtype=float)
+        codes[sym] = signal_codes(sig)
+    return lambda: portfolio_backtest_arrays(times, close, codes, step=60)
+
+@case('signals_batch', 'symbols')
+def _signals_batch(symbols):
+    from CryptoTrader.services.signals_service import compute_strategy_signals
+    frames = make_universe(symbols, min(MULTI_SYMBOL_BARS, MULTI_SYMBOL_ROWS // symbols))
+    return lambda: compute_strategy_signals(frames)
+
+def _small_forest(trees=100):
+    from sklearn.ensemble import RandomForestClassifier
+    from CryptoTrader.ml.train_and_predict_auto import build_features
+    X, y, _ = build_features(make_ohlcv(5_000))
+    return RandomForestClassifier(n_estimators=trees, random_state=0, n_jobs=1).fit(X, y), X
+
+@case('model_load', None)
+def _model_load():
+    import joblib
+    from CryptoTrader.ml.compact_forest import CompactForest, export_forest
+    clf, _ = _small_forest()
+    tmp = tempfile.mkdtemp()
+    pkl, forest = os.path.join(tmp, "model.pkl"), os.path.join(tmp, "model.forest")
+    joblib.dump(clf, pkl)
+    export_forest(clf, forest)
+
+    def run():
+        t0 = time.perf_counter()
+        joblib.load(pkl)
+        t1 = time.perf_counter()
+        CompactForest.load(forest)
+        return {'pickle_seconds': t1 - t0, 'compact_seconds': time.perf_counter() - t1}
+    return run
+
+@case('predict', 'symbols')
+def _predict(symbols):
+    # One feature row per symbol, the way predict_many scores the latest candles.
+    from CryptoTrader.ml.compact_forest import CompactForest
+    from CryptoTrader.services.prediction_service import _predict_rows
+    clf, X = _small_forest()
+    compact = CompactForest.from_sklearn(clf)
+    rows = X.iloc[np.arange(symbols) % len(X)]
+
+    def run():
+        t0 = time.perf_counter()
+        _predict_rows(clf, rows)
+        t1 = time.perf_counter()
+        _predict_rows(compact, rows)
+        return {'sklearn_seconds': t1 - t0, 'compact_seconds': time.perf_counter() - t1}
+    return run
+
+@contextmanager
+def _in_dir(path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+@case('api', None)
+def _api():
+    # Endpoint latency in-process through the FastAPI test client (1000-bar bodies), cold and warm.
+    import joblib
+    from fastapi.testclient import TestClient
+    from CryptoTrader.api import app
+    from CryptoTrader.services.model_cache import compact_cache, model_cache
+    from CryptoTrader.trading.frame_cache import frame_cache
+    clf, _ = _small_forest()
+    workdir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(workdir, "models"))
+    joblib.dump(clf, os.path.join(workdir, "models", "model_BENCHUSDT.pkl"))
+    df = make_ohlcv(1_000)
+    body = {"symbol": "BENCHUSDT", "data": {c: df[c].tolist() for c in df.columns}}
+    client = TestClient(app)
+
+    def call(method, path):
+        response = client.post(path, json=body) if method == 'post' else client.get(path)
+        response.raise_for_status()
+
+    def run():
+        # The services share process-wide frame and model caches, so every call
+        # after the first would be a cache hit. Each endpoint is timed cold
+        # (caches emptied, as for a new history or model) and then warm.
+        out = {}
+        with _in_dir(workdir):
+            for name, method, path in (('root', 'get', '/'), ('signals', 'post', '/signals'),
+                                       ('backtest', 'post', '/backtest'), ('predict', 'post', '/predict')):
+                frame_cache.clear()
+                model_cache.invalidate()
+                compact_cache.invalidate()
+                t0 = time.perf_counter()
+                call(method, path)
+                t1 = time.perf_counter()
+                call(method, path)
+                out[f'{name}_seconds'] = t1 - t0
+                out[f'{name}_warm_seconds'] = time.perf_counter() - t1
+        return out
+    return run
+
+def _time(fn, min_time, max_repeat):
+    fn()  # warm-up: imports, caches, allocator
+    seconds, extras = [], []
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        while len(seconds) < 3 or (time.perf_counter() - start < min_time and len(seconds) < max_repeat):
+            t0 = time.perf_counter()
+            extra = fn()
+            seconds.append(time.perf_counter() - t0)
+            # Extra numbers only; cases that return their computed result are ignored here.
+            if isinstance(extra, dict) and all(isinstance(v, (int, float)) for v in extra.values()):
+                extras.append(extra)
+    finally:
+        gc.enable()
+    # Extra numbers are medians over the runs, like the headline time.
+    extra = {k: statistics.median(e[k] for e in extras) for k in extras[0]} if extras else {}
+    return seconds, extra
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=10).stdout.strip() or None
+    except OSError:
+        return None
+
+def _environment():
+    import sklearn
+    return {
+        'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine(),
+        'cpu_count': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__,
+        'sklearn': sklearn.__version__, 'git': _git_revision(),
+        'threads': {k: os.environ.get(k) for k in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')},
+    }
+
+def result_key(result):
+    return result['case'] + json.dumps(result['params'], sort_keys=True)
+
+def run_suite(profile='quick', cases=None, min_time=0.5, max_repeat=50):
+    sizes = PROFILES[profile]
+    results = []
+    for name, (fn, over) in CASES.items():
+        if cases and name not in cases:
+            continue
+        for value in (sizes[over] if over else [None]):
+            params = {over: value} if over else {}
+            label = f"{name} {over}={value:,}" if over else name
+            try:
+                seconds, extra = _time(fn(**params), min_time, max_repeat)
+            except MemoryError:
+                print(f"{label:<32} skipped: out of memory")
+                continue
+            result = {'case': name, 'params': params, 'repeat': len(seconds), 'seconds': seconds,
+                      'best': min(seconds), 'median': statistics.median(seconds), 'extra': extra}
+            results.append(result)
+            print(f"{label:<32} median {result['median'] * 1000:10.3f} ms  best {result['best'] * 1000:10.3f} ms"
+                  f"  ({len(seconds)} runs)")
+    return {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'profile': profile,
+            'environment': _environment(), 'results': results}
+
+def compare(current, baseline, threshold=0.15, noise_floor=0.0002):
+    """(regressions, rows) comparing medians of cases present in both runs.
+
+    A case regresses when it is more than ``threshold`` slower and the
+    difference is above ``noise_floor`` seconds.
+    """
+    base = {result_key(r): r for r in baseline['results']}
+    rows, regressions = [], []
+    for r in current['results']:
+        b = base.get(result_key(r))
+        if b is None:
+            continue
+        ratio = r['median'] / b['median'] if b['median'] else float('inf')
+        row = {'key': result_key(r), 'baseline': b['median'], 'current': r['median'], 'ratio': ratio}
+        rows.append(row)
+        if ratio > 1 + threshold and r['median'] - b['median'] > noise_floor:
+            regressions.append(row)
+    return regressions, rows
+
+def _report(current, baseline, threshold):
+    if current['environment'].get('platform') != baseline['environment'].get('platform'):
+        print("warning: baseline was recorded on a different platform")
+    regressions, rows = compare(current, baseline, threshold)
+    for row in rows:
+        flag = "  REGRESSION" if row in regressions else ""
+        print(f"{row['key']:<48} {row['baseline'] * 1000:10.3f} -> {row['current'] * 1000:10.3f} ms"
+              f"  x{row['ratio']:.2f}{flag}")
+    print(f"{len(regressions)} regression(s) over {threshold:.0%} in {len(rows)} compared cases")
+    return 1 if regressions else 0
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1)
+    print("wrote", path)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['compare']:
+        ap = argparse.ArgumentParser(prog='benchmarks.suite compare')
+        ap.add_argument('current')
+        ap.add_argument('baseline')
+        ap.add_argument('--threshold', type=float, default=0.15)
+        args = ap.parse_args(argv[1:])
+        return _report(_load(args.current), _load(args.baseline), args.threshold)
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    ap.add_argument('--cases', default=None, help=f"comma-separated subset of: {', '.join(CASES)}")
+    ap.add_argument('--min-time', type=float, default=0.5, help='seconds of repeated runs per case (min 3 runs)')
+    ap.add_argument('--out', default=None, help='results JSON (default benchmarks/results/<time>.json)')
+    ap.add_argument('--baseline', default=None)
+    ap.add_argument('--save-baseline', default=None)
+    ap.add_argument('--threshold', type=float, default=0.15)
+    args = ap.parse_args(argv)
+    cases = [c.strip() for c in args.cases.split(',')] if args.cases else None
+    unknown = set(cases or ()) - set(CASES)
+    if unknown:
+        ap.error(f"unknown cases: {sorted(unknown)}")
+
+    current = run_suite(args.profile, cases, min_time=args.min_time)
+    out = args.out or os.path.join('benchmarks', 'results', time.strftime('%Y%m%d-%H%M%S') + '.json')
+    _write(out, current)
+    if args.save_baseline:
+        _write(args.save_baseline, current)
+    if args.baseline:
+        return _report(current, _load(args.baseline), args.threshold)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
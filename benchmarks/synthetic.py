@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+def make_ohlcv(n, seed=0, start_price=30000.0, freq='1min', start='2024-01-01'):
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(0, 0.001, n)
+    close = start_price * np.exp(np.cumsum(rets))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0008, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.gamma(2.0, 5.0, n)
+    index = pd.date_range(start, periods=n, freq=freq)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low,
+                         'close': close, 'volume': volume}, index=index)
+
+def make_universe(n_symbols, n, seed=0, freq='1min', start='2024-01-01'):
+    """{symbol: OHLCV frame} for ``n_symbols`` independent random walks on one time axis."""
+    return {f"SYM{i:03d}USDT": make_ohlcv(n, seed=seed + i, start_price=10.0 * (1 + i % 97), freq=freq, start=start)
+            for i in range(n_symbols)}
+
+def kline_messages(symbol, n, updates_per_candle=4, seed=0, start_ms=1_700_000_000_000):
+    """``n`` Binance kline websocket messages (JSON strings), ``updates_per_candle`` per 1m candle."""
+    import json
+    rng = np.random.default_rng(seed)
+    close = 30000.0 * np.exp(np.cumsum(rng.normal(0, 0.0003, n)))
+    messages = []
+    for i, c in enumerate(close.tolist()):
+        open_ms = start_ms + (i // updates_per_candle) * 60_000
+        messages.append(json.dumps({
+            "e": "kline", "E": open_ms + (i % updates_per_candle + 1) * 60_000 // updates_per_candle,
+            "s": symbol, "k": {"t": open_ms, "s": symbol, "i": "1m", "o": f"{c:.2f}", "h": f"{c * 1.001:.2f}",
+                               "l": f"{c * 0.999:.2f}", "c": f"{c:.2f}", "v": "1.5",
+                               "x": i % updates_per_candle == updates_per_candle - 1}}))
+    return messages
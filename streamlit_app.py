@@ -1,37 +1,46 @@
 import streamlit as st
-import time, os, threading
+import hmac, time, os
+import requests
 import pandas as pd
+import streamlit.components.v1 as components
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from CryptoTrader.trading.websocket_stream import KlineCollector
-from CryptoTrader.trading.indicators import add_indicators
-from CryptoTrader.trading.strategy import add_signals
-from CryptoTrader.trading.backtester import backtest
-from CryptoTrader.ml.train_and_predict_auto import train_in_background, build_features
-import joblib
+from CryptoTrader.trading.candle_store import CandleStore
+from CryptoTrader.services.live_engine import get_engine
+from CryptoTrader.metrics import metrics
+from CryptoTrader.profiler import profile_for, profiler_enabled
 from chatbot import chatbot_ui  # <-- Import your chatbot module
 
 # ----------------- Initialization -----------------
+rerun_started = time.perf_counter()
 st.set_page_config(layout="wide", page_title="Crypto Trader + Chatbot")
 st.title("📊 Crypto Trader — Auto-download & Auto-train + 🤖 Chatbot")
 
-# Initialize session state
-if "collectors" not in st.session_state:
-    st.session_state.collectors = {}
-if "models_status" not in st.session_state:
-    st.session_state.models_status = {}
-
-training_results = {}
-training_lock = threading.Lock()
+candle_store = CandleStore()  # shared on-disk history for seeding and training
+CHART_API_URL = os.environ.get("CHART_API_URL", "http://127.0.0.1:8000")
+# Streams are shared by every viewer; only sessions that enter this token may stop them.
+ADMIN_TOKEN = os.environ.get("DASHBOARD_ADMIN_TOKEN", "")
 
 # ----------------- Sidebar -----------------
 with st.sidebar:
     st.header("⚙️ Settings")
     symbols_input = st.text_input("Symbols (comma-separated)", value="BTCUSDT,ETHUSDT,BNBUSDT")
     interval = st.selectbox("Interval", ["1m", "3m", "5m", "15m"], index=0)
-    max_candles = st.number_input("Max candles per symbol", min_value=200, max_value=2000, value=1200)
+    max_candles = st.number_input("Max candles per symbol", min_value=200, max_value=2000, value=1200,
+                                  help="Buffer size of an interval's stream when it is first started; "
+                                       "a running stream keeps its size")
     retrain_minutes = st.number_input("Retrain every N minutes", min_value=0, max_value=240, value=30,
                                       help="0 = no periodic retrain")
+    chart_mode = st.radio("Chart", ["Incremental (API)", "Full figure"], index=1,
+                          help="Incremental: the chart loads once from the FastAPI backend at CHART_API_URL and "
+                               "then fetches only new or changed candles. That backend runs its own stream at "
+                               "its STREAM_INTERVAL. Full figure: rebuilt and resent on every refresh.")
+    chart_history = st.number_input("Chart history (candles)", min_value=0, max_value=20160, value=0,
+                                    help="Older candles from the local candle store, downsampled server-side")
+    is_admin = False
+    if ADMIN_TOKEN:
+        token = st.text_input("Admin token", type="password", help="Needed to stop the shared streams")
+        is_admin = hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
     
     
 # ----------------- Chatbot Sidebar -----------------
@@ -46,131 +55,124 @@ if not symbols:
     st.stop()
 
 # ----------------- Stream Controls -----------------
+# Collectors, models and computed snapshots live in one engine per server
+# process; every browser session reads from it. Starting only adds symbols
+# or an interval, so it never disturbs other viewers.
+engine = get_engine(candle_store)
 col1, col2 = st.columns(2)
 with col1:
     if st.button("▶️ Start All Streams"):
-        for sym in symbols:
-            if sym not in st.session_state.collectors:
-                coll = KlineCollector(symbol=sym, interval=interval, maxlen=int(max_candles))
-                coll.start()
-                st.session_state.collectors[sym] = coll
+        stream = engine.start(symbols, interval=interval, maxlen=int(max_candles))
         st.success("✅ Streams started. Models will auto-train in background.")
+        if stream.maxlen != int(max_candles):
+            st.info(f"ℹ️ The {interval} stream was already running and keeps {stream.maxlen} candles per symbol.")
 
 with col2:
-    if st.button("⏹ Stop All Streams"):
-        for sym, coll in list(st.session_state.collectors.items()):
-            try:
-                coll.stop()
-            except:
-                pass
-        st.session_state.collectors = {}
-        st.success("🛑 Streams stopped.")
+    if is_admin and st.button("⏹ Stop All Streams"):
+        try:
+            engine.stop()
+            st.success("🛑 Streams stopped for all viewers.")
+        except RuntimeError as e:
+            st.error(f"❌ Could not stop streams: {e}")
 
 # ----------------- Symbol Selection -----------------
 view_symbol = st.selectbox("📈 Symbol to view", symbols)
-collector = st.session_state.collectors.get(view_symbol)
-if collector is None:
+if not engine.collecting(view_symbol, interval):
     st.info("ℹ️ Start streams first, then select a symbol to view.")
     st.stop()
 
 # ----------------- Training Handling -----------------
-model_path = os.path.join("models", f"model_{view_symbol}.pkl")
-if view_symbol not in st.session_state.models_status:
-    st.session_state.models_status[view_symbol] = {"status": "not_started", "last_trained": None}
-
-def training_callback(sym, path, err):
-    with training_lock:
-        training_results[sym] = {
-            "last_trained": path if path else None,
-            "status": "ready" if path else f"error: {err}",
-            "last_trained_ts": time.time()
-        }
-
-if st.session_state.models_status[view_symbol]["status"] == "not_started":
-    st.session_state.models_status[view_symbol]["status"] = "training"
-    train_in_background(view_symbol, interval=interval, callback=training_callback)
-
-if retrain_minutes > 0:
-    last_ts = st.session_state.models_status[view_symbol].get("last_trained_ts", 0)
-    if time.time() - last_ts > retrain_minutes * 60:
-        st.session_state.models_status[view_symbol]["status"] = "retraining"
-        train_in_background(view_symbol, interval=interval, callback=training_callback)
-
-with training_lock:
-    for sym, result in training_results.items():
-        if sym not in st.session_state.models_status:
-            st.session_state.models_status[sym] = {}
-        st.session_state.models_status[sym].update(result)
-    training_results.clear()
-
-# ----------------- Data Fetch -----------------
-df = collector.get_dataframe()
-if df.empty:
+engine.ensure_model(view_symbol, interval=interval, retrain_minutes=retrain_minutes)
+
+# ----------------- Snapshot -----------------
+snap = engine.snapshot(view_symbol, interval)
+if snap is None:
     st.info("⌛ Waiting for candles...")
     st.stop()
 
-df_ind = add_indicators(df)
-df_sig = add_signals(df_ind)
-
-# ----------------- ML Prediction -----------------
-ml_status = st.session_state.models_status[view_symbol]["status"]
-ml_text = ml_status
-ml_pred, ml_proba = None, None
-
-if os.path.exists(model_path):
-    try:
-        model = joblib.load(model_path)
-        X, _, _ = build_features(df)
-        if not X.empty:
-            pred = model.predict(X.tail(1))[0]
-            proba = model.predict_proba(X.tail(1))[0][1] if hasattr(model, "predict_proba") else None
-            ml_pred = "Buy" if int(pred) == 1 else "Sell"
-            ml_proba = float(proba) if proba is not None else None
-            ml_text = f"{ml_pred} (p={ml_proba:.2f})"
-    except Exception as e:
-        ml_text = f"prediction error: {e}"
-
 # ----------------- Plotly Chart -----------------
-plot_df = df_sig.tail(300)
-fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
-fig.add_trace(go.Candlestick(x=plot_df.index, open=plot_df["open"], high=plot_df["high"],
-                             low=plot_df["low"], close=plot_df["close"], name="Candles"), row=1, col=1)
-fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["ema_short"], mode="lines", name="EMA short"), row=1, col=1)
-fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["ema_long"], mode="lines", name="EMA long"), row=1, col=1)
-
-buys = plot_df[plot_df["Recommendation"] == "Buy"]
-sells = plot_df[plot_df["Recommendation"] == "Sell"]
-if not buys.empty:
-    fig.add_trace(go.Scatter(x=buys.index, y=buys["high"] * 1.001, mode="markers",
-                             marker_symbol="triangle-up", marker_size=10, name="Rule-Buy"), row=1, col=1)
-if not sells.empty:
-    fig.add_trace(go.Scatter(x=sells.index, y=sells["low"] * 0.999, mode="markers",
-                             marker_symbol="triangle-down", marker_size=10, name="Rule-Sell"), row=1, col=1)
-
-fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["rsi"], mode="lines", name="RSI"), row=2, col=1)
-fig.add_hline(y=70, line_dash="dash", row=2, col=1)
-fig.add_hline(y=30, line_dash="dash", row=2, col=1)
-
-fig.update_layout(height=750, margin=dict(l=10, r=10, t=40, b=10), xaxis_rangeslider_visible=False)
-st.plotly_chart(fig, use_container_width=True)
+@st.cache_resource(max_entries=64)
+def build_chart(symbol, version, _plot_df):
+    # Built once per snapshot version and shared by all sessions.
+    plot_df = _plot_df
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25], vertical_spacing=0.03)
+    fig.add_trace(go.Candlestick(x=plot_df.index, open=plot_df["open"], high=plot_df["high"],
+                                 low=plot_df["low"], close=plot_df["close"], name="Candles"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["ema_short"], mode="lines", name="EMA short"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["ema_long"], mode="lines", name="EMA long"), row=1, col=1)
+
+    buys = plot_df[plot_df["Recommendation"] == "Buy"]
+    sells = plot_df[plot_df["Recommendation"] == "Sell"]
+    if not buys.empty:
+        fig.add_trace(go.Scatter(x=buys.index, y=buys["high"] * 1.001, mode="markers",
+                                 marker_symbol="triangle-up", marker_size=10, name="Rule-Buy"), row=1, col=1)
+    if not sells.empty:
+        fig.add_trace(go.Scatter(x=sells.index, y=sells["low"] * 0.999, mode="markers",
+                                 marker_symbol="triangle-down", marker_size=10, name="Rule-Sell"), row=1, col=1)
+
+    fig.add_trace(go.Scatter(x=plot_df.index, y=plot_df["rsi"], mode="lines", name="RSI"), row=2, col=1)
+    fig.add_hline(y=70, line_dash="dash", row=2, col=1)
+    fig.add_hline(y=30, line_dash="dash", row=2, col=1)
+
+    fig.update_layout(height=750, margin=dict(l=10, r=10, t=40, b=10), xaxis_rangeslider_visible=False)
+    return fig
+
+@st.cache_data(ttl=30, show_spinner=False)
+def chart_api_problem(symbol, interval):
+    # None when the chart API serves this symbol at this interval, else why not.
+    try:
+        resp = requests.get(f"{CHART_API_URL}/chart/{symbol}",
+                            params={"interval": interval, "max_points": 2}, timeout=3)
+    except requests.RequestException as e:
+        return f"chart API at {CHART_API_URL} is unreachable ({e.__class__.__name__})"
+    if resp.status_code != 200:
+        try:
+            return resp.json().get("detail", f"HTTP {resp.status_code}")
+        except ValueError:
+            return f"HTTP {resp.status_code}"
+    return None
+
+chart_problem = chart_api_problem(view_symbol, interval) if chart_mode == "Incremental (API)" else None
+if chart_problem:
+    st.warning(f"⚠️ Incremental chart unavailable: {chart_problem}. Showing the full figure.")
+if chart_mode == "Incremental (API)" and not chart_problem:
+    # Same URL on every rerun, so the browser keeps the iframe and its data.
+    components.iframe(f"{CHART_API_URL}/chart/{view_symbol}/view?interval={interval}"
+                      f"&history={int(chart_history)}", height=760)
+else:
+    st.plotly_chart(build_chart(view_symbol, snap["version"], snap["frame"]), use_container_width=True)
 
 # ----------------- Sidebar Info -----------------
+ml_text = snap["ml"]["text"]
 st.sidebar.subheader("🤖 Model status")
 st.sidebar.write(f"{view_symbol}: {ml_text}")
 st.sidebar.markdown("---")
 
-last = df_sig.iloc[-1]
+last = snap["last"]
 st.sidebar.subheader("📌 Latest")
 st.sidebar.write(f"Time: {last.name}")
 st.sidebar.write(f"Rule: {last.Recommendation} | Conf: {last.Confidence:.2f} | Risk: {last.Risk:.2f}")
 st.sidebar.write(f"ML: {ml_text}")
 
 # ----------------- Quick Backtest -----------------
-df_bt = df_sig.tail(200)
-final_val, trades, equity = backtest(df_bt)
-st.subheader("📊 Quick Strategy Performance (last 200 candles)")
-st.write(f"Final portfolio value (start 1000): {final_val:.2f} USDT | Trades: {len(trades)}")
-st.line_chart(equity)
+bt = snap["backtest"]
+st.subheader(f"📊 Quick Strategy Performance (last {engine.backtest_rows} candles)")
+st.write(f"Final portfolio value (start 1000): {bt['final_value']:.2f} USDT | Trades: {bt['trades']}")
+st.line_chart(bt["equity"])
+
+# ----------------- Performance -----------------
+with st.sidebar.expander("⏱ Performance"):
+    # Process-wide: covers the engine worker and every session, not just this tab.
+    stages = pd.DataFrame(metrics.summary())
+    if not stages.empty:
+        st.dataframe(stages.round(3), hide_index=True)
+    lag = pd.DataFrame(metrics.summary("signal_lag_seconds"))
+    if not lag.empty:
+        st.caption("Exchange event → signal lag")
+        st.dataframe(lag.round(3), hide_index=True)
+    if profiler_enabled() and st.button("Profile 5s"):
+        st.table(pd.DataFrame(profile_for(5.0).top(15), columns=["frame", "samples"]))
+metrics.observe_stage("streamlit_rerun", time.perf_counter() - rerun_started, view_symbol)
 
 # ----------------- Auto Refresh -----------------
 if st.checkbox("🔄 Auto refresh (1s)", value=True):
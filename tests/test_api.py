@@ -0,0 +1,78 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from benchmarks.fake_exchange import FakeExchange
+from CryptoTrader.services import signal_stream
+from CryptoTrader.services.signal_stream import SignalHub
+from tests.test_collector import _wait
+
+LISTED = {"BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT"}
+
+@pytest.fixture
+def client():
+    # A quiet exchange: REST history for seeding, a socket that sends nothing.
+    with FakeExchange(messages_per_stream=0, close_when_done=False, listed=LISTED) as ex:
+        signal_stream._hub = SignalHub(maxlen=200, ws_base=ex.ws_base, rest_url=ex.rest_url, max_symbols=3)
+        from CryptoTrader.api import app
+        with TestClient(app) as c:
+            yield c
+        signal_stream._hub = None
+
+@pytest.mark.parametrize("symbols", ["", " , "])
+def test_ws_rejects_blank_symbols(client, symbols):
+    with pytest.raises(WebSocketDisconnect) as e:
+        with client.websocket_connect(f"/ws/signals?symbols={symbols}") as ws:
+            ws.receive_text()
+    assert e.value.code == 1008
+
+def test_ws_unsubscribes_when_a_quiet_client_leaves(client):
+    hub = signal_stream.get_hub()
+    with client.websocket_connect("/ws/signals?symbols=btcusdt") as ws:
+        messages = []
+        while not messages or messages[-1]["type"] != "snapshot_end":
+            messages.append(json.loads(ws.receive_text()))
+        assert messages[0]["type"] == "row" and messages[-1]["symbol"] == "BTCUSDT"
+        assert hub.stats()["subscribers"] == {"BTCUSDT": 1}
+    assert _wait(lambda: hub.stats()["subscribers"] == {"BTCUSDT": 0}, timeout=5)
+
+def test_sse_rejects_blank_symbols(client):
+    assert client.get("/signals/stream?symbols=,").status_code == 422
+
+def test_chart_refuses_an_interval_the_stream_does_not_run(client):
+    resp = client.get("/chart/BTCUSDT?interval=5m")
+    assert resp.status_code == 409 and "STREAM_INTERVAL=5m" in resp.json()["detail"]
+    resp = client.get("/chart/BTCUSDT?interval=1m&max_points=50")
+    assert resp.status_code == 200
+    assert resp.json()["bucket"] >= 60 and 0 < len(resp.json()["time"]) <= 50
+
+@pytest.mark.parametrize("symbol", ["NOPEUSDT", "BTC%22USDT", "BTC%5CUSDT"])
+def test_chart_refuses_unknown_or_malformed_symbols(client, symbol):
+    resp = client.get(f"/chart/{symbol}")
+    assert resp.status_code == 422
+    assert signal_stream.get_hub().stats()["symbols"] == []
+
+def test_stream_routes_refuse_unknown_symbols_and_cap_the_total(client):
+    assert client.get("/signals/stream?symbols=BTCUSDT,NOPEUSDT").status_code == 422
+    with pytest.raises(WebSocketDisconnect) as e:
+        with client.websocket_connect("/ws/signals?symbols=NOPEUSDT") as ws:
+            ws.receive_text()
+    assert e.value.code == 1008
+    for symbol in ["BTCUSDT", "ETHUSDT", "SOLUSDT"]:
+        assert client.get(f"/chart/{symbol}?max_points=10").status_code == 200
+    resp = client.get("/chart/XRPUSDT")
+    assert resp.status_code == 422 and "At most 3" in resp.json()["detail"]
+    assert signal_stream.get_hub().stats()["symbols"] == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+
+def test_allowed_symbols_limit_what_clients_can_add():
+    hub = SignalHub(["BTCUSDT"], allowed=["ETHUSDT"])
+    assert hub.allowed == {"BTCUSDT", "ETHUSDT"}
+    with pytest.raises(ValueError, match="not allowed: SOLUSDT"):
+        asyncio.run(hub.track(["SOLUSDT"]))
+
+@pytest.mark.parametrize("seconds, interval_ms", [(-5, 5), (0.05, 0), (0.05, -1)])
+def test_profile_clamps_its_arguments(client, monkeypatch, seconds, interval_ms):
+    monkeypatch.setenv("PROFILER_ENABLED", "1")
+    resp = client.get(f"/debug/profile?seconds={seconds}&interval_ms={interval_ms}")
+    assert resp.status_code == 200
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.fake_exchange import FakeExchange, kline_values
+from CryptoTrader.trading.async_stream import AsyncKlineCollector
+from tests.test_collector import _wait
+
+def _closes(df):
+    open_ms = (df.index - pd.Timestamp(0)) // pd.Timedelta('1ms')
+    return [kline_values("BTCUSDT", int(t))[3] for t in open_ms]
+
+# 40 updates end on a closed candle; 42 leave the last candle half-built when the socket drops.
+@pytest.mark.parametrize("messages", [40, 42])
+def test_reconnect_backfills_skipped_candles(messages):
+    gap = 5
+    with FakeExchange(messages_per_stream=messages, updates_per_candle=4, gap_candles_on_reconnect=gap) as ex:
+        coll = AsyncKlineCollector(["BTCUSDT"], maxlen=500, ws_base=ex.ws_base, rest_url=ex.rest_url,
+                                   backoff_initial=0.05, backoff_max=0.1)
+        seen = []
+        coll.listeners.append(lambda symbol, candle, values, event_ms: seen.append(candle["time"]))
+        coll.start(seed=False)
+        try:
+            assert _wait(lambda: coll.reconnects >= 2)
+        finally:
+            coll.stop()
+        backfills = [q for q in ex.rest_calls if "startTime" in q]
+
+    df = coll.get_dataframe("BTCUSDT")
+    steps = np.diff((df.index - pd.Timestamp(0)) // pd.Timedelta('1s'))
+    assert (steps == 60).all()
+    assert df['is_closed'].iloc[:-1].all()
+    np.testing.assert_allclose(df['close'], _closes(df), rtol=1e-8)
+    assert len(df) >= 2 * (messages // 4) + gap
+    assert coll.backfilled >= gap
+    # The first stream stopped at candle messages // 4: closed candles resume after it, a
+    # half-built one (42 updates) is refetched from its own open time. Either way it is the first REST row.
+    assert int(backfills[0]["startTime"]) == ex.start_ms + (messages // 4) * 60_000
+    assert int(backfills[0]["endTime"]) == ex.start_ms + (messages // 4 + gap - 1) * 60_000
+    assert set(seen) <= set((df.index - pd.Timestamp(0)) // pd.Timedelta('1s'))
+
+def test_backoff_keeps_retrying_and_stops_cleanly():
+    coll = AsyncKlineCollector(["BTCUSDT"], ws_base="ws://127.0.0.1:9", rest_url="http://127.0.0.1:9/api/v3/klines",
+                               backoff_initial=0.01, backoff_max=0.02)
+    coll.start(seed=False)
+    try:
+        assert _wait(lambda: coll.reconnects >= 3, timeout=5)
+    finally:
+        coll.stop()
+    assert not coll.running
+    assert coll.get_dataframe("BTCUSDT").empty
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading.backtester import backtest, backtest_rowwise, backtest_stream, sweep
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.strategy import add_signals
+
+def _assert_same(got, want):
+    assert got[0] == pytest.approx(want[0], rel=1e-12)
+    assert len(got[1]) == len(want[1])
+    for g, w in zip(got[1], want[1]):
+        assert g[:2] == w[:2] and g[2:] == pytest.approx(w[2:], rel=1e-12)
+    np.testing.assert_allclose(got[2].to_numpy(), want[2].to_numpy(), rtol=1e-12)
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_kernel_matches_rowwise(seed):
+    df = add_signals(add_indicators(make_ohlcv(3000, seed=seed)))
+    _assert_same(backtest(df), backtest_rowwise(df))
+
+def _frame(close, recs):
+    index = pd.date_range("2024-01-01", periods=len(close), freq="1min")
+    return pd.DataFrame({"close": close, "Recommendation": recs}, index=index)
+
+@pytest.mark.parametrize("close, recs", [
+    # A negative price gives a negative fill, which sends the kernel back to every signal bar.
+    ([-10.0, 11.0, 12.0, 11.0, 9.0], ["Buy", "Buy", "Sell", "Buy", "Sell"]),
+    # A zero balance buys nothing, so a repeated Buy must be retried.
+    ([10.0, 11.0, 12.0, 11.0], ["Hold", "Buy", "Buy", "Sell"]),
+    ([10.0, np.nan, 12.0, 11.0], ["Buy", "Sell", "Sell", "Hold"]),
+    ([10.0, 11.0, 12.0], ["Hold", "Hold", "Hold"]),
+])
+def test_kernel_matches_rowwise_on_edge_fills(close, recs):
+    df = _frame(close, recs)
+    for balance in (1000.0, 0.0):
+        got, want = backtest(df, initial_balance=balance), backtest_rowwise(df, initial_balance=balance)
+        assert (got[0] == pytest.approx(want[0])) or (np.isnan(got[0]) and np.isnan(want[0]))
+        assert [t[:2] for t in got[1]] == [t[:2] for t in want[1]]
+        np.testing.assert_allclose(got[2].to_numpy(), want[2].to_numpy())
+
+def test_sweep_matches_serial_runs():
+    df = make_ohlcv(1500, seed=4)
+    grid = {"short": [5, 9], "long": [21, 30], "fee": [0.0, 0.001]}
+    parallel = sweep(df, grid, max_workers=2)
+    assert sweep(df, grid, max_workers=1).equals(parallel)
+    assert len(parallel) == 8
+    for row in parallel.itertuples():
+        df_sig = add_signals(add_indicators(df, short=row.short, long=row.long, rsi_period=row.rsi_period))
+        final_value, trades, _ = backtest(df_sig, fee=row.fee, slippage=row.slippage)
+        assert row.final_value == pytest.approx(final_value, rel=1e-12)
+        assert row.trades == len(trades)
+
+def _chunks(df, size):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 30, 60, 100, 1000])
+def test_stream_matches_one_shot_backtest(chunk_size):
+    df = make_ohlcv(400, seed=5)
+    _assert_same(backtest_stream(_chunks(df, chunk_size)), backtest(add_signals(add_indicators(df))))
+
+def test_stream_writes_the_equity_curve_to_a_file(tmp_path):
+    df = make_ohlcv(1000, seed=5)
+    want = backtest(add_signals(add_indicators(df)))
+    equity_file = tmp_path / "equity.f64"
+    final_value, trades, equity = backtest_stream(_chunks(df, 60), equity_file=str(equity_file))
+    assert equity is None and final_value == pytest.approx(want[0], rel=1e-12) and len(trades) == len(want[1])
+    np.testing.assert_allclose(np.fromfile(equity_file, dtype=np.float64), want[2].to_numpy(), rtol=1e-12)
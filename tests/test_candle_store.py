@@ -0,0 +1,94 @@
+import multiprocessing
+import threading
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.fake_exchange import FakeExchange, kline_values
+from CryptoTrader.trading.candle_store import CandleStore
+
+def _times(df):
+    return ((df.index - pd.Timestamp(0)) // pd.Timedelta('1s')).to_numpy()
+
+def _cols(times):
+    times = np.asarray(times, dtype=np.int64)
+    return {'time': times, 'open': times * 1.0, 'high': times + 1.0, 'low': times - 1.0,
+            'close': times + 0.5, 'volume': np.ones(len(times))}
+
+def test_sync_fills_empty_store_then_appends_only_new_candles(tmp_path):
+    with FakeExchange() as ex:
+        store = CandleStore(str(tmp_path), rest_url=ex.rest_url)
+        assert store.sync("BTCUSDT", "1m", initial_limit=1500) == 1500
+        df = store.read("BTCUSDT", "1m")
+        assert len(df) == 1500 and (np.diff(_times(df)) == 60).all()
+        assert _times(df)[-1] * 1000 == ex.start_ms - 60_000
+        closes = [kline_values("BTCUSDT", int(t) * 1000)[3] for t in _times(df)]
+        np.testing.assert_allclose(df['close'], closes, rtol=1e-8)
+
+        ex.candle_index += 30
+        calls = len(ex.rest_calls)
+        assert store.sync("BTCUSDT", "1m") == 30
+        assert int(ex.rest_calls[calls]["startTime"]) == ex.start_ms
+        assert store.sync("BTCUSDT", "1m") == 0
+    df = store.read("BTCUSDT", "1m")
+    assert len(df) == 1530 and (np.diff(_times(df)) == 60).all()
+
+def test_write_dedupes_and_merges_out_of_order_across_months(tmp_path):
+    store = CandleStore(str(tmp_path))
+    jan_end = int(pd.Timestamp("2024-01-31 23:50").timestamp())
+    times = jan_end + 60 * np.arange(20)  # spans January and February
+    assert store.write("BTCUSDT", "1m", _cols(times[10:])) == 10
+    assert store.write("BTCUSDT", "1m", _cols(times[:15])) == 10
+    assert store.write("BTCUSDT", "1m", _cols(times)) == 0
+    assert store.partitions("BTCUSDT", "1m") == ["2024-01", "2024-02"]
+    df = store.read("BTCUSDT", "1m")
+    np.testing.assert_array_equal(_times(df), times)
+    np.testing.assert_array_equal(df['close'], times + 0.5)
+
+def _write_repeatedly(root, times, rounds):
+    store = CandleStore(root)
+    for i in range(rounds):
+        store.write("BTCUSDT", "1m", _cols(times[: len(times) * (i + 1) // rounds]))
+
+def test_concurrent_processes_do_not_duplicate_candles(tmp_path):
+    times = 1_700_000_040 + 60 * np.arange(2000)
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_write_repeatedly, args=(str(tmp_path), times, 40)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    df = CandleStore(str(tmp_path)).read("BTCUSDT", "1m")
+    np.testing.assert_array_equal(_times(df), times)
+
+def test_reads_never_see_a_month_being_rewritten(tmp_path):
+    store = CandleStore(str(tmp_path))
+    times = int(pd.Timestamp("2024-03-01").timestamp()) + 60 * np.arange(3000)
+    store.write("BTCUSDT", "1m", _cols(times))
+    stop = threading.Event()
+
+    def rewrite():
+        # An old candle forces the month through _rewrite every time.
+        while not stop.is_set():
+            store.write("BTCUSDT", "1m", _cols(times[:1]))
+
+    writer = threading.Thread(target=rewrite)
+    writer.start()
+    try:
+        seen = set()
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            seen.add(len(store.read("BTCUSDT", "1m")))
+            seen.add(len(store.read("BTCUSDT", "1m", limit=100)) * 30)
+            seen.add(sum(len(c) for c in store.iter_chunks("BTCUSDT", "1m", chunk_size=1000)))
+            assert store.last_time("BTCUSDT", "1m") == times[-1]
+    finally:
+        stop.set()
+        writer.join()
+    assert seen == {3000}
+
+def test_reads_of_a_missing_series_create_nothing(tmp_path):
+    store = CandleStore(str(tmp_path / "store"))
+    assert store.read("NOPE", "1m").empty and store.last_time("NOPE", "1m") is None
+    assert list(store.iter_chunks("NOPE", "1m")) == []
+    assert not (tmp_path / "store").exists()
@@ -0,0 +1,57 @@
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.fake_exchange import FakeExchange, kline_values
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.websocket_stream import KlineCollector, MultiKlineCollector
+from tests.test_indicators import candles
+
+def test_late_candle_rebuilds_indicators():
+    df = make_ohlcv(120)
+    rows = candles(df)
+    coll = KlineCollector("BTCUSDT", maxlen=500)
+    late = rows.pop(80)
+    for c in rows:
+        coll._ingest(c)
+    assert coll._ingest(late) is None
+
+    stored = coll.get_dataframe()
+    ind = coll.get_indicator_dataframe()
+    assert stored.index.is_monotonic_increasing and len(stored) == 120
+    assert ind.index.equals(stored.index[len(stored) - len(ind):])
+    np.testing.assert_allclose(ind['ema_long'], add_indicators(df)['ema_long'])
+
+def test_late_candle_already_stored_is_dropped():
+    rows = candles(make_ohlcv(60))
+    coll = KlineCollector("BTCUSDT", maxlen=500)
+    for c in rows:
+        coll._ingest(c)
+    before = coll.get_indicator_dataframe()
+    assert coll._ingest(dict(rows[10], close=1.0)) is None
+    assert coll.get_dataframe()['close'].iloc[10] == rows[10]['close']
+    assert coll.get_indicator_dataframe().equals(before)
+
+def _wait(predicate, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_multi_collector_routes_interleaved_symbols():
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+    with FakeExchange(messages_per_stream=40, updates_per_candle=4) as ex:
+        multi = MultiKlineCollector(symbols, maxlen=100, ws_base=ex.ws_base, rest_url=ex.rest_url)
+        multi.start(seed=False)
+        assert _wait(lambda: not multi.running)
+        multi.stop()
+    for sym in symbols:
+        df = multi.get_dataframe(sym)
+        assert len(df) == 10
+        assert df.index.is_monotonic_increasing and df['is_closed'].all()
+        open_ms = (df.index - pd.Timestamp(0)) // pd.Timedelta('1ms')
+        expected = [kline_values(sym, int(t))[3] for t in open_ms]
+        np.testing.assert_allclose(df['close'], expected, rtol=1e-8)
+    assert multi.get_dataframe("XRPUSDT").empty
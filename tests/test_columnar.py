@@ -0,0 +1,115 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.services import prediction_service
+from CryptoTrader.services.columnar import (ARROW_MEDIA_TYPE, NPZ_MEDIA_TYPE, UnsupportedMediaType,
+                                            decode_frame, encode_frame, negotiate)
+
+pa = pytest.importorskip("pyarrow")
+
+FORMATS = [NPZ_MEDIA_TYPE, ARROW_MEDIA_TYPE]
+
+@pytest.fixture
+def client():
+    from CryptoTrader.api import app
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def frame():
+    return make_ohlcv(300, seed=3).reset_index(drop=True)
+
+def _json(df, symbol="BTCUSDT"):
+    return {"symbol": symbol, "data": {c: df[c].tolist() for c in df.columns}}
+
+def _post(client, path, df, media_type, accept=None, symbol="BTCUSDT"):
+    headers = {"content-type": media_type}
+    if accept:
+        headers["accept"] = accept
+    return client.post(f"{path}?symbol={symbol}", content=encode_frame(df, media_type), headers=headers)
+
+@pytest.mark.parametrize("media_type", FORMATS)
+def test_decode_round_trips_columns(frame, media_type):
+    got = decode_frame(encode_frame(frame, media_type), media_type)
+    pd.testing.assert_frame_equal(got, frame)
+
+@pytest.mark.parametrize("accept, want", [
+    (None, None),
+    ("application/json", None),
+    ("application/json, application/x-npz;q=0.9", NPZ_MEDIA_TYPE),
+    ("Application/Vnd.Apache.Arrow.Stream", ARROW_MEDIA_TYPE),
+    ("text/html, */*", None),
+])
+def test_negotiate_picks_the_first_binary_type(accept, want):
+    assert negotiate(accept) == want
+
+@pytest.mark.parametrize("media_type", FORMATS)
+def test_signals_accept_and_return_columnar_bodies(client, frame, media_type):
+    want = client.post("/signals", json=_json(frame)).json()
+    resp = _post(client, "/signals", frame, media_type, accept=media_type)
+    assert resp.status_code == 200 and resp.headers["content-type"] == media_type
+    got = decode_frame(resp.content, media_type)
+    assert got["Recommendation"].tolist() == [r["Recommendation"] for r in want]
+    np.testing.assert_allclose(got["close"], [r["close"] for r in want])
+    assert _post(client, "/signals", frame, media_type).json() == want
+
+@pytest.mark.parametrize("media_type", FORMATS)
+def test_backtest_accepts_and_returns_columnar_bodies(client, frame, media_type):
+    want = client.post("/backtest", json=_json(frame)).json()
+    resp = _post(client, "/backtest", frame, media_type, accept=media_type)
+    assert resp.status_code == 200 and resp.headers["content-type"] == media_type
+    if media_type == NPZ_MEDIA_TYPE:
+        with np.load(io.BytesIO(resp.content)) as npz:
+            curve, final = npz["equity_curve"], float(npz["final_value"])
+    else:
+        table = pa.ipc.open_stream(resp.content).read_all()
+        curve, final = table.column("equity_curve").to_numpy(), float(table.schema.metadata[b"final_value"])
+    np.testing.assert_allclose(curve, want["equity_curve"])
+    assert final == pytest.approx(want["final_value"])
+
+@pytest.mark.parametrize("media_type", FORMATS)
+def test_predict_accepts_columnar_bodies(client, frame, media_type, monkeypatch):
+    from sklearn.ensemble import RandomForestClassifier
+    from CryptoTrader.ml.train_and_predict_auto import build_features
+    X, y, _ = build_features(frame)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    monkeypatch.setattr(prediction_service, "load_model", lambda symbol: model)
+    want = client.post("/predict", json=_json(frame)).json()
+    assert "prediction" in want
+    assert _post(client, "/predict", frame, media_type).json() == want
+
+@pytest.mark.parametrize("media_type, body", [
+    (NPZ_MEDIA_TYPE, b""),
+    (NPZ_MEDIA_TYPE, b"PK\x03\x04garbage"),
+    (NPZ_MEDIA_TYPE, b"not an archive"),
+    (ARROW_MEDIA_TYPE, b""),
+    (ARROW_MEDIA_TYPE, b"\xff\xff\xff\xffgarbage"),
+])
+def test_malformed_columnar_bodies_are_400(client, media_type, body):
+    for path in ["/signals", "/backtest", "/predict"]:
+        resp = client.post(f"{path}?symbol=BTCUSDT", content=body, headers={"content-type": media_type})
+        assert resp.status_code == 400, (path, resp.text)
+
+def test_npz_with_a_single_array_is_400(client):
+    buf = io.BytesIO()
+    np.save(buf, np.arange(3))
+    resp = client.post("/signals", content=buf.getvalue(), headers={"content-type": NPZ_MEDIA_TYPE})
+    assert resp.status_code == 400
+
+@pytest.mark.parametrize("body, status", [(b"[1,2]", 422), (b'"text"', 422), (b"{bad json", 400)])
+def test_malformed_json_bodies_are_rejected(client, body, status):
+    for path in ["/signals", "/backtest", "/predict"]:
+        resp = client.post(path, content=body, headers={"content-type": "application/json"})
+        assert resp.status_code == status, (path, resp.text)
+
+def test_unknown_media_types_are_415(client, frame):
+    for content_type in ["application/x-parquet", "text/csv"]:
+        resp = client.post("/signals", content=b"a,b", headers={"content-type": content_type})
+        assert resp.status_code == 415
+    with pytest.raises(UnsupportedMediaType):
+        decode_frame(b"", "application/x-parquet")
+    with pytest.raises(UnsupportedMediaType):
+        encode_frame(frame, "text/csv")
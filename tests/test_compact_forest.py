@@ -0,0 +1,75 @@
+import mmap as mmap_module
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from CryptoTrader.ml.compact_forest import CompactForest, export_forest
+
+def _data(n=600, n_features=6, nan_fraction=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] * X[:, 3] + rng.normal(0, 0.5, n) > 0).astype(int)
+    if nan_fraction:
+        X[rng.random(X.shape) < nan_fraction] = np.nan
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(n_features)]), y
+
+FORESTS = [
+    lambda: RandomForestClassifier(n_estimators=25, random_state=0),
+    lambda: RandomForestClassifier(n_estimators=10, max_depth=4, min_samples_leaf=5, random_state=1),
+    lambda: ExtraTreesClassifier(n_estimators=25, random_state=0),
+]
+
+@pytest.mark.parametrize("make", FORESTS)
+def test_predict_proba_matches_sklearn_bit_for_bit(make):
+    X, y = _data()
+    forest = make().fit(X, y)
+    compact = CompactForest.from_sklearn(forest)
+    X_test, _ = _data(n=300, seed=1)
+    np.testing.assert_array_equal(compact.predict_proba(X_test), forest.predict_proba(X_test))
+    np.testing.assert_array_equal(compact.predict(X_test), forest.predict(X_test))
+    # A single row, as the live predict path sends, both 2-d and 1-d.
+    row = X_test.iloc[[7]]
+    np.testing.assert_array_equal(compact.predict_proba(row), forest.predict_proba(row))
+    np.testing.assert_array_equal(compact.predict_proba(row.to_numpy()[0]), forest.predict_proba(row))
+
+@pytest.mark.parametrize("make", FORESTS)
+def test_nan_features_follow_the_learned_missing_branch(make):
+    X, y = _data(nan_fraction=0.1)
+    try:
+        forest = make().fit(X, y)
+    except ValueError:
+        pytest.skip("this sklearn version does not fit this forest on missing values")
+    compact = CompactForest.from_sklearn(forest)
+    X_test, _ = _data(n=300, nan_fraction=0.2, seed=2)
+    np.testing.assert_array_equal(compact.predict_proba(X_test), forest.predict_proba(X_test))
+    row = X_test[X_test.isna().any(axis=1)].iloc[[0]]
+    np.testing.assert_array_equal(compact.predict_proba(row), forest.predict_proba(row))
+
+def _mapped(arr):
+    while arr is not None:
+        if isinstance(arr, (np.memmap, mmap_module.mmap)):
+            return True
+        arr = getattr(arr, "base", None)
+    return False
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_saved_file_loads_memory_mapped(tmp_path, mmap):
+    X, y = _data()
+    forest = RandomForestClassifier(n_estimators=15, random_state=0).fit(X, y)
+    path = tmp_path / "model.forest"
+    export_forest(forest, str(path))
+    loaded = CompactForest.load(str(path), mmap=mmap)
+    assert all(_mapped(getattr(loaded, name)) == mmap for name in ("feature", "threshold", "proba"))
+    assert list(loaded.feature_names_in_) == list(X.columns)
+    assert loaded.classes_.tolist() == forest.classes_.tolist() and loaded.n_features_in_ == X.shape[1]
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"not a forest")
+    with pytest.raises(ValueError):
+        CompactForest.load(str(path))
+
+def test_export_needs_a_fitted_forest():
+    with pytest.raises(TypeError):
+        CompactForest.from_sklearn(RandomForestClassifier())
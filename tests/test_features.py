@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.ml.train_and_predict_auto import FEATURE_COLS, build_features, build_latest_features
+from CryptoTrader.trading.frame_cache import FrameCache
+from CryptoTrader.trading.indicators import add_indicators
+
+@pytest.mark.parametrize("n", [60, 500, 3000])
+def test_latest_features_match_build_features(n):
+    df = make_ohlcv(n + 1, seed=n)
+    X, _, _ = build_features(df)
+    # build_features drops the newest candle (it has no target yet), so its last row is df.iloc[-2].
+    latest = build_latest_features(df.iloc[:-1])
+    assert list(latest.columns) == FEATURE_COLS
+    assert latest.index[0] == X.index[-1]
+    np.testing.assert_allclose(latest.iloc[0].to_numpy(), X.iloc[-1].to_numpy(), rtol=1e-9)
+
+def test_latest_features_keep_the_newest_candle():
+    df = make_ohlcv(400)
+    latest = build_latest_features(df)
+    want = add_indicators(df)[FEATURE_COLS].iloc[-1]
+    assert latest.index[0] == df.index[-1]
+    np.testing.assert_allclose(latest.iloc[0].to_numpy(), want.to_numpy(), rtol=1e-9)
+
+def test_latest_features_need_a_full_window():
+    assert build_latest_features(make_ohlcv(49)).empty
+    assert list(build_latest_features(make_ohlcv(49)).columns) == FEATURE_COLS
+
+def test_latest_features_read_a_cached_indicator_frame():
+    df = make_ohlcv(400)
+    cache = FrameCache()
+    assert build_latest_features(df, cache=cache).equals(build_latest_features(df))
+    assert cache.stats()['entries'] == 0  # the latest-row path does not fill the cache
+
+    add_indicators(df, cache=cache)
+    hits = cache.stats()['hits']
+    cached = build_latest_features(df, cache=cache)
+    assert cache.stats()['hits'] == hits + 1
+    np.testing.assert_allclose(cached.to_numpy(), build_latest_features(df).to_numpy(), rtol=1e-9)
+
+def test_build_features_shares_the_indicator_entry():
+    df = make_ohlcv(400)
+    cache = FrameCache()
+    X, y, _ = build_features(df, cache=cache)
+    assert cache.stats()['by_kind'] == {'features': {'hits': 0, 'misses': 1},
+                                        'indicators': {'hits': 0, 'misses': 1}}
+    add_indicators(df, cache=cache)
+    assert cache.stats()['by_kind']['indicators']['hits'] == 1
+    X2, y2, _ = build_features(df)
+    assert X.equals(X2) and y.equals(y2)
@@ -0,0 +1,51 @@
+import os
+import pandas as pd
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading import frame_cache as frame_cache_module
+from CryptoTrader.trading.frame_cache import SAMPLE_ROWS, TAIL_ROWS, FrameCache, fingerprint
+
+def test_fingerprint_reads_a_bounded_number_of_rows(monkeypatch):
+    hashed = []
+    real = pd.util.hash_pandas_object
+    monkeypatch.setattr(pd.util, "hash_pandas_object", lambda obj, **kw: hashed.append(len(obj)) or real(obj, **kw))
+    fingerprint("indicators", make_ohlcv(200_000), {})
+    assert sum(hashed) <= TAIL_ROWS + SAMPLE_ROWS
+
+def test_fingerprint_tracks_the_open_candle_and_the_start_of_history():
+    df = make_ohlcv(5000)
+    key = fingerprint("indicators", df, {"span": 9})
+    changed = df.copy()
+    changed.iloc[-1, changed.columns.get_loc("close")] += 1.0  # open candle updated in place
+    assert fingerprint("indicators", changed, {"span": 9}) != key
+    # Same last candle, history starting elsewhere.
+    assert fingerprint("indicators", df.iloc[1:], {"span": 9}) != key
+    assert fingerprint("indicators", pd.concat([make_ohlcv(5000, seed=1).iloc[:100], df.iloc[100:]]),
+                       {"span": 9}) != key
+    assert fingerprint("indicators", df, {"span": 10}) != key
+    assert fingerprint("indicators", df, {"span": 9}, symbol="BTCUSDT") != key
+    assert fingerprint("indicators", df.copy(), {"span": 9}) == key
+
+def test_disk_writes_do_not_rescan_until_the_limit(tmp_path, monkeypatch):
+    scans = []
+    real_walk = os.walk
+    monkeypatch.setattr(frame_cache_module.os, "walk", lambda path: scans.append(path) or real_walk(path))
+    cache = FrameCache(disk_dir=str(tmp_path), disk_max_bytes=10**9)
+    for i in range(20):
+        cache.get_or_compute("indicators", make_ohlcv(50, seed=i), {}, lambda: make_ohlcv(50))
+    assert len(scans) == 1  # the first write learns the directory size
+
+def test_disk_is_pruned_oldest_first_below_the_limit(tmp_path):
+    pd.to_pickle(make_ohlcv(200), tmp_path / "probe.pkl")
+    size = os.path.getsize(tmp_path / "probe.pkl")
+    disk_dir = tmp_path / "cache"
+    cache = FrameCache(disk_dir=str(disk_dir), disk_max_bytes=size * 5)
+    frames = [make_ohlcv(50, seed=i) for i in range(12)]
+    for df in frames:
+        cache.get_or_compute("indicators", df, {}, lambda: make_ohlcv(200))
+    files = [os.path.join(r, n) for r, _, names in os.walk(disk_dir) for n in names]
+    total = sum(os.path.getsize(f) for f in files)
+    assert total <= size * 5 and len(files) >= 3
+    cache.clear()
+    hits = cache.stats()["disk_hits"]
+    cache.get_or_compute("indicators", frames[-1], {}, lambda: make_ohlcv(200))
+    assert cache.stats()["disk_hits"] == hits + 1  # the newest entry survived
@@ -0,0 +1,50 @@
+import numpy as np
+from benchmarks.fake_exchange import FakeExchange
+from CryptoTrader.ml.model_registry import ModelRegistry
+from CryptoTrader.ml.train_and_predict_auto import train_model_for_symbol
+from CryptoTrader.trading.candle_store import CandleStore
+
+N_TREES, WINDOW = 20, 600
+
+def _train(store, model_dir, n_estimators=N_TREES):
+    path, err = train_model_for_symbol("BTCUSDT", "1m", model_dir, store=store, n_jobs=1, incremental=True,
+                                       n_estimators=n_estimators, window=WINDOW, recent_rows=200)
+    assert err is None
+    registry = ModelRegistry(model_dir)
+    return path, registry.load("BTCUSDT"), registry.metadata("BTCUSDT")
+
+def _same_tree(a, b):
+    return (a.tree_.node_count == b.tree_.node_count
+            and np.array_equal(a.tree_.threshold, b.tree_.threshold)
+            and np.array_equal(a.tree_.feature, b.tree_.feature))
+
+def test_warm_start_replaces_the_oldest_trees(tmp_path):
+    model_dir = str(tmp_path / "models")
+    with FakeExchange() as ex:
+        store = CandleStore(str(tmp_path / "candles"), rest_url=ex.rest_url)
+        # No previous model: a cold start falls back to a full fit.
+        _, first, meta = _train(store, model_dir)
+        assert meta["mode"] == "full" and len(first.estimators_) == N_TREES
+
+        ex.candle_index += 60
+        _, second, meta = _train(store, model_dir)
+        n_new = meta["trees_replaced"]
+        assert meta["mode"] == "incremental" and meta["new_rows"] == 60
+        assert n_new == int(np.ceil(N_TREES * 60 / WINDOW)) == 2
+        assert second.n_estimators == len(second.estimators_) == N_TREES and not second.warm_start
+        # The oldest n_new trees are gone; the rest keep their order and the new ones go last.
+        assert all(_same_tree(a, b) for a, b in zip(second.estimators_[:-n_new], first.estimators_[n_new:]))
+        assert not any(_same_tree(a, b) for a in second.estimators_[-n_new:] for b in first.estimators_)
+
+        # Nothing new: the current model is kept.
+        path, _, meta_again = _train(store, model_dir)
+        assert meta_again["version"] == meta["version"] and path == ModelRegistry(model_dir).current_path("BTCUSDT")
+
+def test_incompatible_previous_model_gets_a_full_fit(tmp_path):
+    model_dir = str(tmp_path / "models")
+    with FakeExchange() as ex:
+        store = CandleStore(str(tmp_path / "candles"), rest_url=ex.rest_url)
+        _train(store, model_dir, n_estimators=10)
+        ex.candle_index += 60
+        _, model, meta = _train(store, model_dir)
+        assert meta["mode"] == "full" and len(model.estimators_) == N_TREES
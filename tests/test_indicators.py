@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading.indicators import IncrementalIndicators, add_indicators
+
+def candles(df):
+    times = (df.index - pd.Timestamp(0)) // pd.Timedelta('1s')
+    return [{'time': int(t), 'open': r.open, 'high': r.high, 'low': r.low, 'close': r.close,
+             'volume': r.volume, 'is_closed': True} for t, r in zip(times, df.itertuples())]
+
+def _feed(df, maxlen):
+    inc = IncrementalIndicators(maxlen=maxlen)
+    for c in candles(df):
+        inc.update(c)
+    return inc
+
+def test_matches_add_indicators_before_eviction():
+    df = make_ohlcv(400)
+    got = _feed(df, maxlen=1200).get_dataframe()
+    want = add_indicators(df)
+    assert len(got) == len(want)
+    np.testing.assert_allclose(got['ema_long'], want['ema_long'])
+    np.testing.assert_allclose(got['rsi'], want['rsi'], rtol=1e-9)
+
+def test_state_is_continuous_after_eviction():
+    df = make_ohlcv(400)
+    got = _feed(df, maxlen=200).get_dataframe()
+    restarted = add_indicators(df.tail(200))
+    # Every retained row keeps its values; add_indicators on the window drops its own warm-up.
+    assert len(got) == 200 and len(restarted) < 200
+    full = add_indicators(df).tail(200)
+    np.testing.assert_allclose(got['ema_long'], full['ema_long'])
+
+def test_in_progress_candle_is_replaced():
+    df = make_ohlcv(100)
+    rows = candles(df)
+    inc = IncrementalIndicators()
+    for c in rows[:-1]:
+        inc.update(c)
+    inc.update(dict(rows[-1], close=rows[-1]['close'] * 2, is_closed=False))
+    inc.update(rows[-1])
+    np.testing.assert_allclose(inc.get_dataframe()['ema_short'], add_indicators(df)['ema_short'])
+
+def test_zero_previous_close_matches_pct_change():
+    df = make_ohlcv(120)
+    df.iloc[60:64, df.columns.get_loc('close')] = [0.0, 0.0, 25000.0, 0.0]
+    df.iloc[89:91, df.columns.get_loc('close')] = [0.0, -1.0]  # bad ticks, including a negative close
+    got = _feed(df, maxlen=1200).get_dataframe()
+    assert np.isinf(got['ret_1']).sum() == 3  # every nonzero close right after a zero one
+    for col, periods in (('ret_1', 1), ('ret_3', 3)):
+        want = df['close'].pct_change(periods).loc[got.index]
+        np.testing.assert_array_equal(got[col].to_numpy(), want.to_numpy())
@@ -0,0 +1,52 @@
+from benchmarks.fake_exchange import FakeExchange
+from CryptoTrader.services.live_engine import LiveEngine
+from tests.test_collector import _wait
+
+def test_sessions_add_to_streams_without_restarting_them(tmp_path):
+    with FakeExchange(messages_per_stream=10 ** 6, rate=20, close_when_done=False) as ex:
+        engine = LiveEngine(model_dir=str(tmp_path), ws_base=ex.ws_base, rest_url=ex.rest_url)
+        try:
+            first = engine.start(["BTCUSDT"], interval="1m", maxlen=200)
+            assert _wait(lambda: engine.snapshot("BTCUSDT") is not None)
+
+            # Another viewer: other symbol and buffer size, same interval.
+            assert engine.start(["ETHUSDT"], interval="1m", maxlen=500) is first
+            assert first.maxlen == 200
+            assert _wait(lambda: engine.snapshot("ETHUSDT") is not None)
+            assert engine.snapshot("BTCUSDT") is not None
+
+            # And another interval: its own stream, the 1m one keeps running.
+            engine.start(["BTCUSDT"], interval="3m")
+            assert _wait(lambda: engine.snapshot("BTCUSDT", "3m") is not None)
+            assert engine.streams["1m"] is first and engine.collecting("ETHUSDT", "1m")
+            assert not engine.collecting("ETHUSDT", "3m")
+
+            engine.stop("3m")
+            assert engine.snapshot("BTCUSDT", "3m") is None and engine.snapshot("BTCUSDT") is not None
+            assert engine.stats()["streams"] == {"1m": {"symbols": ["BTCUSDT", "ETHUSDT"], "maxlen": 200}}
+        finally:
+            engine.stop()
+    assert not engine.running and engine.snapshot("BTCUSDT") is None
+
+def test_models_are_tracked_per_symbol_and_interval(tmp_path, monkeypatch):
+    from CryptoTrader.services import live_engine
+    submitted = []
+    monkeypatch.setattr(live_engine, "train_in_background",
+                        lambda symbol, **kw: submitted.append((symbol, kw["interval"], kw["model_dir"], kw["callback"])))
+    engine = LiveEngine(model_dir=str(tmp_path))
+    engine.ensure_model("btcusdt", "1m")
+    engine.ensure_model("BTCUSDT", "3m")
+    engine.ensure_model("BTCUSDT", "1m")  # already training: not submitted again
+    assert [(s, i, d) for s, i, d, _ in submitted] == [("BTCUSDT", "1m", str(tmp_path)),
+                                                     ("BTCUSDT", "3m", str(tmp_path / "3m"))]
+
+    submitted[0][3]("BTCUSDT", str(tmp_path / "model_BTCUSDT.pkl"), None)
+    assert engine.models[("BTCUSDT", "1m")]["status"] == "ready"
+    assert engine.models[("BTCUSDT", "3m")]["status"] == "training"
+
+    # Each interval keeps its own retrain schedule.
+    engine.models[("BTCUSDT", "1m")]["last_trained_ts"] = 0
+    engine.ensure_model("BTCUSDT", "1m", retrain_minutes=1)
+    engine.ensure_model("BTCUSDT", "3m", retrain_minutes=1)
+    assert [(s, i) for s, i, _, _ in submitted[2:]] == [("BTCUSDT", "1m")]
+    assert engine.models[("BTCUSDT", "1m")]["status"] == "retraining"
@@ -0,0 +1,29 @@
+from CryptoTrader.metrics import Metrics, _label_text, metrics, observe_lag, symbol_label, timed
+from CryptoTrader.trading.websocket_stream import KlineCollector
+
+def test_label_values_are_escaped():
+    text = _label_text((("symbol", 'a\\b"c\nd'),))
+    assert text == '{symbol="a\\\\b\\"c\\nd"}'
+
+def test_unknown_symbols_share_one_series():
+    m = Metrics()
+    m.allow_symbols("btcusdt")
+    for symbol in ["BTCUSDT", "NOPE1", "NOPE2", 'X"\n']:
+        m.observe_stage("predict", 0.001, symbol)
+    labels = {dict(k)["symbol"] for k in m.histograms["stage_seconds"]}
+    assert labels == {"BTCUSDT", "other"}
+
+def test_collected_symbols_get_their_own_label():
+    KlineCollector("ADAUSDT")
+
+    @timed("test_stage")
+    def work():
+        pass
+
+    for symbol in ["ADAUSDT", "ZZZUSDT"]:
+        with symbol_label(symbol):
+            work()
+        observe_lag("test_lag_seconds", 1, symbol)
+    stage = {dict(k)["symbol"] for k in metrics.histograms["stage_seconds"] if dict(k)["stage"] == "test_stage"}
+    lag = {dict(k)["symbol"] for k in metrics.histograms["test_lag_seconds"]}
+    assert stage == lag == {"ADAUSDT", "other"}
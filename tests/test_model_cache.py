@@ -0,0 +1,108 @@
+import os
+import threading
+from CryptoTrader.services.model_cache import ModelCache
+
+class _Loader:
+    """Reads the file as the "model" and counts loads."""
+
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, path):
+        self.loads.append(os.path.basename(path))
+        with open(path, "rb") as f:
+            return f.read()
+
+def _write(path, data, mtime_ns=None):
+    path.write_bytes(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+def test_reuses_the_model_while_the_file_is_unchanged(tmp_path):
+    loader = _Loader()
+    cache = ModelCache(loader=loader)
+    path = _write(tmp_path / "a.pkl", b"v1")
+    assert cache.get(path) == b"v1" and cache.get(path) == b"v1"
+    assert loader.loads == ["a.pkl"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_reloads_when_mtime_or_size_changes(tmp_path):
+    loader = _Loader()
+    cache = ModelCache(loader=loader)
+    path = _write(tmp_path / "a.pkl", b"v1", mtime_ns=1_000_000_000)
+    cache.get(path)
+    # Same size, new mtime.
+    _write(tmp_path / "a.pkl", b"v2", mtime_ns=2_000_000_000)
+    assert cache.get(path) == b"v2"
+    # Same mtime, new size.
+    _write(tmp_path / "a.pkl", b"v3-longer", mtime_ns=2_000_000_000)
+    assert cache.get(path) == b"v3-longer"
+    assert loader.loads == ["a.pkl"] * 3
+    assert cache.stats()["bytes"] == len(b"v3-longer")
+
+def test_verify_hash_skips_a_touched_identical_file_but_not_new_content(tmp_path):
+    loader = _Loader()
+    cache = ModelCache(loader=loader, verify_hash=True)
+    path = _write(tmp_path / "a.pkl", b"v1", mtime_ns=1_000_000_000)
+    cache.get(path)
+    _write(tmp_path / "a.pkl", b"v1", mtime_ns=2_000_000_000)
+    assert cache.get(path) == b"v1" and len(loader.loads) == 1
+    # Same size and a new mtime, but different bytes: the sha256 differs, so it reloads.
+    _write(tmp_path / "a.pkl", b"v2", mtime_ns=3_000_000_000)
+    assert cache.get(path) == b"v2" and len(loader.loads) == 2
+
+def test_deleted_file_drops_the_entry(tmp_path):
+    cache = ModelCache(loader=_Loader())
+    path = _write(tmp_path / "a.pkl", b"v1")
+    cache.get(path)
+    os.remove(path)
+    assert cache.get(path) is None
+    assert cache.stats()["models"] == 0 and cache.stats()["bytes"] == 0
+
+def test_evicts_least_recently_used_by_count(tmp_path):
+    loader = _Loader()
+    cache = ModelCache(max_models=2, loader=loader)
+    a, b, c = (_write(tmp_path / f"{n}.pkl", n.encode()) for n in "abc")
+    cache.get(a)
+    cache.get(b)
+    cache.get(a)  # b is now the least recently used
+    cache.get(c)
+    assert list(cache._entries) == [a, c]
+    assert cache.stats()["evictions"] == 1
+    cache.get(b)
+    assert list(cache._entries) == [c, b]
+    assert loader.loads == ["a.pkl", "b.pkl", "c.pkl", "b.pkl"]
+
+def test_evicts_by_bytes_but_keeps_the_newest(tmp_path):
+    cache = ModelCache(max_bytes=10, loader=_Loader())
+    a = _write(tmp_path / "a.pkl", b"x" * 6)
+    b = _write(tmp_path / "b.pkl", b"x" * 6)
+    big = _write(tmp_path / "big.pkl", b"x" * 50)
+    cache.get(a)
+    cache.get(b)
+    assert list(cache._entries) == [b] and cache.stats()["bytes"] == 6
+    cache.get(big)  # larger than the budget on its own, still kept as the only entry
+    assert list(cache._entries) == [big]
+
+def test_serves_the_old_model_while_a_reload_is_running(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def loader(path):
+        data = open(path, "rb").read()
+        if data == b"v2":
+            started.set()
+            release.wait(5)
+        return data
+
+    cache = ModelCache(loader=loader)
+    path = _write(tmp_path / "a.pkl", b"v1", mtime_ns=1_000_000_000)
+    cache.get(path)
+    _write(tmp_path / "a.pkl", b"v2", mtime_ns=2_000_000_000)
+    reloader = threading.Thread(target=cache.get, args=(path,))
+    reloader.start()
+    assert started.wait(5)
+    assert cache.get(path) == b"v1" and cache.stats()["stale_hits"] == 1
+    release.set()
+    reloader.join(5)
+    assert cache.get(path) == b"v2"
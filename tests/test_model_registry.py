@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+from CryptoTrader.ml.model_registry import ModelRegistry
+
+def _publish_many(model_dir, worker, count):
+    registry = ModelRegistry(model_dir, keep=0)
+    for i in range(count):
+        registry.publish("BTCUSDT", {"worker": worker, "i": i}, {"interval": f"{worker}m"})
+
+def test_concurrent_publishers_get_distinct_versions(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_publish_many, args=(str(tmp_path), w, 10)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+    registry = ModelRegistry(str(tmp_path), keep=0)
+    assert [v for v, _ in registry.versions("BTCUSDT")] == list(range(1, 41))
+    published = {(registry.load("BTCUSDT", v)["worker"], registry.load("BTCUSDT", v)["i"]) for v in range(1, 41)}
+    assert len(published) == 40
+    assert [m["version"] for m in registry.history("BTCUSDT")] == list(range(1, 41))
+    assert registry.load("BTCUSDT") == registry.load("BTCUSDT", 40)
+    assert not [n for n in os.listdir(tmp_path) if n.startswith(".tmp")]
+
+def test_rollback_makes_an_old_version_current(tmp_path):
+    registry = ModelRegistry(str(tmp_path), keep=3)
+    for i in range(5):
+        registry.publish("ETHUSDT", {"i": i})
+    assert [v for v, _ in registry.versions("ETHUSDT")] == [3, 4, 5]
+    assert registry.rollback("ETHUSDT", 3)["version"] == 3
+    assert registry.load("ETHUSDT") == {"i": 2}
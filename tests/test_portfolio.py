@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading.backtester import BUY, HOLD, SELL, backtest
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.portfolio import portfolio_backtest, portfolio_backtest_arrays
+from CryptoTrader.trading.strategy import add_signals
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_one_symbol_portfolio_matches_backtest(seed):
+    df = add_signals(add_indicators(make_ohlcv(2000, seed=seed)))
+    want_value, want_trades, want_equity = backtest(df)
+    value, trades, equity = portfolio_backtest({"BTCUSDT": df})
+    assert value == pytest.approx(want_value, rel=1e-12)
+    assert [(t, side, price, qty) for t, _, side, price, qty in trades] == pytest.approx(want_trades)
+    np.testing.assert_allclose(equity.to_numpy(), want_equity.to_numpy(), rtol=1e-12)
+
+def _run(codes, sizing, size=None):
+    times = {s: np.arange(len(c)) for s, c in codes.items()}
+    close = {s: np.full(len(c), 10.0) for s, c in codes.items()}
+    codes = {s: np.array(c, dtype=np.int8) for s, c in codes.items()}
+    return portfolio_backtest_arrays(times, close, codes, sizing=sizing, size=size, fee=0.0, slippage=0.0)
+
+@pytest.mark.parametrize("sizing, size", [("fraction", 1.0), ("fixed", 1000.0)])
+def test_skipped_entry_is_retried_once_cash_is_freed(sizing, size):
+    # A holds all the cash while B's signal turns Buy; A sells at row 3 and B
+    # buys in the same row (sells settle first), though its signal never flipped again.
+    _, trades, equity, _ = _run({"A": [BUY, HOLD, HOLD, SELL, HOLD, HOLD],
+                                 "B": [HOLD, BUY, BUY, BUY, BUY, SELL]}, sizing, size)
+    assert [(row, sym, side) for row, sym, side, _, _ in trades] == [
+        (0, "A", "BUY"), (3, "A", "SELL"), (3, "B", "BUY"), (5, "B", "SELL")]
+    assert trades[2][4] == pytest.approx(100.0)
+    np.testing.assert_allclose(equity, 1000.0)
@@ -0,0 +1,31 @@
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.ml.train_and_predict_auto import build_features
+from CryptoTrader.services import prediction_service
+from CryptoTrader.services.prediction_service import predict, predict_many
+
+def _model(seed):
+    X, y, _ = build_features(make_ohlcv(800, seed=seed))
+    return RandomForestClassifier(n_estimators=10, random_state=seed).fit(X, y)
+
+def test_grouped_predictions_keep_input_order_and_match_predict(monkeypatch):
+    shared, other = _model(0), _model(1)
+    models = {"AUSDT": shared, "BUSDT": other, "CUSDT": shared, "DUSDT": None, "EUSDT": shared, "FUSDT": other}
+    monkeypatch.setattr(prediction_service, "load_model", lambda symbol: models[symbol])
+    frames = {s: make_ohlcv(300, seed=10 + i) for i, s in enumerate(models)}
+    frames["EUSDT"] = frames["EUSDT"].head(20)  # too short for features
+
+    calls = []
+    real = prediction_service._predict_rows
+    monkeypatch.setattr(prediction_service, "_predict_rows", lambda model, X: calls.append(len(X)) or real(model, X))
+    results = predict_many(frames)["results"]
+    # One predict_proba call per distinct model, over all of its rows.
+    assert sorted(calls) == [2, 2]
+
+    assert list(results) == list(frames)
+    for symbol, df in frames.items():
+        want = predict(symbol, df)
+        got = {k: v for k, v in results[symbol].items() if k != "timing_ms"}
+        assert got == pytest.approx(want), symbol
+    assert "error" in results["DUSDT"] and "error" in results["EUSDT"]
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from CryptoTrader.ml.scheduler import DONE, ERROR, TrainingScheduler
+
+class _BrokenPool:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("a worker was terminated abruptly")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+class _InlinePool:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, symbol, *args):
+        self.submitted.append(symbol)
+        future = Future()
+        future.set_result((f"models/model_{symbol}.pkl", None))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+def _run_one(sched, symbol):
+    done = threading.Event()
+    results = []
+
+    def callback(symbol, path, err):
+        results.append((symbol, path, err))
+        done.set()
+
+    job_id = sched.submit(symbol, callback=callback)
+    assert done.wait(5)
+    return job_id, results
+
+def test_broken_pool_is_replaced_and_the_job_resubmitted():
+    sched = TrainingScheduler(max_workers=1, total_cores=1)
+    fresh = _InlinePool()
+    sched._new_pool = lambda: fresh
+    sched._ensure_started()
+    sched._pool = _BrokenPool()
+    job_id, results = _run_one(sched, "BTCUSDT")
+    # The job never ran on the broken pool, so it runs on the fresh one instead of failing.
+    assert results == [("BTCUSDT", "models/model_BTCUSDT.pkl", None)]
+    assert sched.status(job_id)["status"] == DONE
+    assert sched._pool is fresh and fresh.submitted == ["BTCUSDT"]
+    assert sched._running == 0 and not sched._active
+
+def test_job_fails_when_the_fresh_pool_is_broken_too():
+    sched = TrainingScheduler(max_workers=1, total_cores=1)
+    sched._new_pool = _BrokenPool
+    sched._ensure_started()
+    job_id, results = _run_one(sched, "BTCUSDT")
+    assert results == [("BTCUSDT", None, "a worker was terminated abruptly")]
+    assert sched.status(job_id)["status"] == ERROR
+    assert sched._running == 0 and not sched._active
+    # The key is free again, so a retry starts a new job instead of joining the failed one.
+    assert sched.submit("BTCUSDT") != job_id
+    sched.shutdown(wait=False)
+
+def test_default_pool_is_a_spawn_process_pool():
+    sched = TrainingScheduler(max_workers=1, total_cores=1)
+    pool = sched._new_pool()
+    assert isinstance(pool, ProcessPoolExecutor)
+    assert pool._mp_context.get_start_method() == "spawn"
+    pool.shutdown()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading.frame_cache import FrameCache
+from CryptoTrader.trading.indicators import add_indicators
+from CryptoTrader.trading.strategies import Strategy, get_strategies, run_strategies
+from CryptoTrader.trading.strategy import add_signals
+
+@pytest.mark.parametrize("n", [60, 2000])
+def test_ema_rsi_reproduces_add_signals(n):
+    df = make_ohlcv(n, seed=n)
+    want = add_signals(add_indicators(df))
+    got = run_strategies(df, ["ema_rsi"])["ema_rsi"]
+    got = got.loc[want.index]  # add_indicators drops warm-up rows the strategy keeps once defined
+    for col in ["ema_short", "ema_long", "rsi"]:
+        np.testing.assert_allclose(got[col], want[col], rtol=1e-12)
+    assert got["Recommendation"].tolist() == want["Recommendation"].tolist()
+    np.testing.assert_allclose(got["Confidence"], want["Confidence"])
+    np.testing.assert_allclose(got["Risk"], want["Risk"])
+
+def test_cached_run_matches_uncached():
+    df = make_ohlcv(500)
+    cache = FrameCache()
+    first = run_strategies(df, cache=cache)
+    again = run_strategies(df, cache=cache)
+    assert cache.stats()["hits"] == 1
+    for name, frame in run_strategies(df).items():
+        pd.testing.assert_frame_equal(first[name], frame)
+        pd.testing.assert_frame_equal(again[name], frame)
+
+def test_unknown_strategy_names_are_rejected():
+    with pytest.raises(KeyError, match="nope"):
+        get_strategies(["ema_rsi", "nope"])
+
+@pytest.mark.parametrize("buy", [
+    "rsi <",  # does not parse
+    "rsi < thirty",  # unknown name
+    "__import__('os').system('true')",
+    "rsi.__class__.__mro__",
+    "np.__builtins__",
+    "[x for x in rsi]",
+])
+def test_bad_expressions_are_rejected_before_evaluation(buy):
+    with pytest.raises(ValueError):
+        Strategy("bad", {"rsi": ("rsi", {"period": 14})}, buy=buy, sell="rsi > 70")
+
+def test_unknown_indicators_and_missing_rules_are_rejected():
+    with pytest.raises(ValueError, match="unknown indicators"):
+        Strategy("bad", {"x": ("macd", {})}, buy="x > 0", sell="x < 0")
+    with pytest.raises(ValueError, match="needs buy and sell"):
+        Strategy("bad", {"rsi": ("rsi", {})}, buy="rsi < 30")
+
+def test_expressions_use_columns_and_numpy_helpers():
+    strat = Strategy("ok", {"rsi": ("rsi", {"period": 14})}, buy="where(rsi < 30, True, False)",
+                     sell="np.greater(rsi, 70) & (close > 0)", confidence="clip(abs(rsi - 50) / 50, 0, 1)")
+    recs, confs, _ = strat.evaluate({"close": np.array([1.0, 1.0, 1.0]), "rsi": np.array([20.0, 50.0, 80.0])})
+    assert recs.tolist() == ["Buy", "Hold", "Sell"]
+    np.testing.assert_allclose(confs, [0.6, 0.25, 0.6])
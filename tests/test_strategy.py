@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.trading.indicators import add_indicators, ema, rsi
+from CryptoTrader.trading.strategy import add_signals, add_signals_rowwise
+
+def _frame(ema_short, ema_long, rsi, close):
+    return pd.DataFrame({'ema_short': ema_short, 'ema_long': ema_long, 'rsi': rsi, 'close': close})
+
+def _assert_parity(df):
+    pd.testing.assert_frame_equal(add_signals(df), add_signals_rowwise(df), check_dtype=False)
+
+def test_parity_on_indicator_frame():
+    _assert_parity(add_indicators(make_ohlcv(2000)))
+
+def test_parity_on_warmup_rows():
+    # add_indicators drops its warm-up rows, so build the columns with their leading NaNs kept.
+    df = make_ohlcv(300)
+    df['ema_short'] = ema(df['close'], span=9)
+    df['ema_long'] = ema(df['close'], span=21)
+    df['rsi'] = rsi(df['close'], period=14)
+    assert df['rsi'].isna().any()
+    out = add_signals(df)
+    assert (out.loc[df['rsi'].isna(), 'Confidence'] == 0.2).all()
+    _assert_parity(df)
+
+def test_parity_on_nan_rows():
+    nan = np.nan
+    df = _frame([nan, 1.0, 2.0, nan], [1.0, nan, 1.0, nan], [50.0, 50.0, nan, nan], [10.0] * 4)
+    out = add_signals(df)
+    assert out['Recommendation'].tolist() == ["Hold"] * 4
+    assert out['Confidence'].tolist() == [0.2] * 4
+    _assert_parity(df)
+
+def test_parity_on_zero_close():
+    df = _frame([2.0, 1.0, 1.0], [1.0, 2.0, 1.0], [50.0, 50.0, 50.0], [0.0, 0.0, 0.0])
+    out = add_signals(df)
+    assert out['Recommendation'].tolist() == ["Buy", "Sell", "Hold"]
+    _assert_parity(df)
+
+def test_parity_on_rsi_edges():
+    rsi = [29.999, 30.0, 30.001, 69.999, 70.0, 70.001]
+    up = _frame([2.0] * 6, [1.0] * 6, rsi, [100.0] * 6)
+    down = _frame([1.0] * 6, [2.0] * 6, rsi, [100.0] * 6)
+    assert add_signals(up)['Recommendation'].tolist() == ["Buy"] * 4 + ["Hold"] * 2
+    assert add_signals(down)['Recommendation'].tolist() == ["Hold"] * 2 + ["Sell"] * 4
+    _assert_parity(up)
+    _assert_parity(down)
+
+def test_missing_indicator_columns_hold():
+    out = add_signals(pd.DataFrame({'close': [1.0, 2.0]}))
+    assert out['Recommendation'].tolist() == ["Hold", "Hold"]
@@ -0,0 +1,17 @@
+from benchmarks.synthetic import make_ohlcv
+from CryptoTrader.ml.train_and_predict_auto import build_features
+from CryptoTrader.ml.walk_forward import PURGE_ROWS, make_folds, walk_forward
+
+def test_training_window_stops_before_the_test_bars_label():
+    df = make_ohlcv(700)
+    folds = walk_forward(df, train_size=300, test_size=100, n_estimators=5, max_workers=1)
+    assert len(folds) == len(make_folds(len(build_features(df)[0]), 300, 100))
+    # train_end's label compares with the next close; with the purge that bar is not a test bar.
+    gaps = (folds['test_start'] - folds['train_end']).dt.total_seconds()
+    assert (gaps == 60 * (PURGE_ROWS + 1)).all()
+
+def test_process_pool_matches_serial_run():
+    df = make_ohlcv(800)
+    serial = walk_forward(df, train_size=300, test_size=100, n_estimators=5, max_workers=1)
+    pooled = walk_forward(df, train_size=300, test_size=100, n_estimators=5, max_workers=2)
+    assert serial.equals(pooled)